@@ -0,0 +1,11 @@
+import os
+
+
+def remove_database(database_name):
+    """
+    Remove an SQLite database with its write-ahead log, so that a new
+    database with the same name doesn't pick up a stale log.
+    """
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(database_name + suffix):
+            os.remove(database_name + suffix)
@@ -0,0 +1,187 @@
+"""
+Stress test of concurrent acceptance of reservations.
+
+Fills a separate SQLite database with many overlapping pending reservations
+of a few sports grounds, then several processes accept random batches
+of them at the same time through PlaceAdminView, while other processes
+move random reservations to other hours through EditReservationView.
+Accepted reservations must not overlap in the end. Run with --no-lock
+to see double bookings which happen without locks.
+
+Usage:
+    python -m benchmarks.acceptance --processes 8 --editors 2 --rounds 50
+"""
+
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import Client
+from django.urls import reverse
+
+import argparse
+import datetime
+import multiprocessing
+import random
+import time
+
+from benchmarks import remove_database
+from boiska import locks
+from boiska.models import Reservation
+from boiska.myutils import create_place, create_sports_grounds
+
+EVENT_DATE = datetime.date(2016, 9, 23)
+
+
+def prepare_database():
+    remove_database(settings.DATABASES['default']['NAME'])
+    call_command('migrate', verbosity=0)
+
+
+def seed(sports_grounds_number, reservations_number):
+    place = create_place(place_name='Benchmark')
+    sports_grounds = create_sports_grounds(place, quantity=sports_grounds_number)
+    reservations = []
+    for _ in range(reservations_number):
+        start_hour = random.randint(8, 17)
+        reservations.append(Reservation(
+            sports_ground=random.choice(sports_grounds),
+            email='mail@site.com',
+            surname='Surname',
+            event_date=EVENT_DATE,
+            start_time=datetime.time(start_hour, random.choice((0, 30))),
+            end_time=datetime.time(start_hour + random.randint(1, 2)),
+        ))
+    Reservation.objects.bulk_create(reservations)
+    return place
+
+
+def accept_randomly(place_name, reservations_ids, rounds, batch_size, seed, lock):
+    """
+    Run in a worker process. Returns number of failed requests.
+    """
+    if not lock:
+        locks.lock_days = lambda keys: None
+    generator = random.Random(seed)
+    client = Client()
+    url = reverse('boiska:place_admin', args=[place_name])
+    failures = 0
+    for _ in range(rounds):
+        try:
+            response = client.post(url, {
+                'action': Reservation.ACCEPT,
+                'reservations': generator.sample(reservations_ids, batch_size),
+            })
+        except OperationalError:
+            # SQLite gives up waiting for the lock after its timeout
+            failures += 1
+        else:
+            if response.status_code != 200:
+                failures += 1
+    return failures
+
+
+def edit_randomly(place_name, reservations_ids, rounds, seed, lock):
+    """
+    Run in a worker process. Moves reservations without changing their
+    acceptance. Returns number of failed requests.
+    """
+    if not lock:
+        locks.lock_days = lambda keys: None
+    generator = random.Random(seed)
+    client = Client()
+    failures = 0
+    for _ in range(rounds):
+        reservation = Reservation.objects.get(
+            id=generator.choice(reservations_ids))
+        start_hour = generator.randint(8, 17)
+        data = {
+            'sports_ground': reservation.sports_ground_id,
+            'start_time': '%02d:00' % start_hour,
+            'end_time': '%02d:00' % (start_hour + 1),
+        }
+        if reservation.is_accepted:
+            data['is_accepted'] = 'on'
+        url = reverse('boiska:edit_reservation', args=[place_name, reservation.id])
+        try:
+            response = client.post(url, data)
+        except OperationalError:
+            failures += 1
+        else:
+            # 200 is the form with an overlap error
+            if response.status_code not in (200, 302):
+                failures += 1
+    return failures
+
+
+def double_bookings():
+    """
+    Pairs of accepted reservations which overlap.
+    """
+    overlapping = []
+    latest = {}
+    accepted = Reservation.objects.filter(is_accepted=True).order_by(
+        'sports_ground', 'event_date', 'start_time')
+    for reservation in accepted:
+        key = (reservation.sports_ground_id, reservation.event_date)
+        previous = latest.get(key)
+        if previous is not None and previous.end_time > reservation.start_time:
+            overlapping.append((previous, reservation))
+        if previous is None or previous.end_time < reservation.end_time:
+            latest[key] = reservation
+    return overlapping
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--editors', type=int, default=2,
+        help='Number of processes which edit reservations meanwhile.')
+    parser.add_argument('--rounds', type=int, default=50,
+        help='Number of requests sent by every process.')
+    parser.add_argument('--batch-size', type=int, default=5,
+        help='Number of reservations accepted by one request.')
+    parser.add_argument('--sports-grounds', type=int, default=3)
+    parser.add_argument('--reservations', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-lock', dest='lock', action='store_false',
+        help='Accept reservations without locking days.')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    prepare_database()
+    place = seed(args.sports_grounds, args.reservations)
+    reservations_ids = list(Reservation.objects.values_list('id', flat=True))
+    # forked processes must not share the connection of the parent
+    connection.close()
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.processes + args.editors) as pool:
+        accepting = pool.starmap_async(accept_randomly, [
+            (place.name, reservations_ids, args.rounds, args.batch_size,
+                args.seed + worker, args.lock)
+            for worker in range(args.processes)
+        ])
+        editing = pool.starmap_async(edit_randomly, [
+            (place.name, reservations_ids, args.rounds,
+                args.seed + args.processes + worker, args.lock)
+            for worker in range(args.editors)
+        ])
+        failures = accepting.get() + editing.get()
+    wall_time = time.perf_counter() - start
+    overlapping = double_bookings()
+    print('%d requests in %.2f s, %d failed' % (
+        (args.processes + args.editors) * args.rounds, wall_time, sum(failures)))
+    print('%d accepted reservations, %d double bookings' % (
+        Reservation.objects.filter(is_accepted=True).count(), len(overlapping)))
+    for first, second in overlapping[:10]:
+        print('  %s overlaps %s' % (first, second))
+    if overlapping:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
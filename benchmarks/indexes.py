@@ -0,0 +1,194 @@
+"""
+Benchmark of Reservation indexes.
+
+Fills a separate SQLite database with synthetic reservations and runs
+the most frequent reservation queries before and after migration 0017,
+which adds composite and partial indexes. Query plans and average
+latencies are printed for both cases.
+
+Usage:
+    python -m benchmarks.indexes --rows 2000000
+"""
+
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+import argparse
+import datetime
+import random
+import time
+
+from benchmarks import remove_database
+
+BEFORE_INDEXES = '0016_auto_20261018_1618'
+AFTER_INDEXES = '0017_auto_20261018_1621'
+
+
+def prepare_database():
+    remove_database(settings.DATABASES['default']['NAME'])
+    call_command('migrate', verbosity=0, interactive=False)
+    call_command('migrate', 'boiska', BEFORE_INDEXES, verbosity=0,
+        interactive=False)
+
+
+def historical_apps(migration):
+    """
+    Models as they were after a migration of boiska. Tables of the current
+    models have columns added by later migrations.
+    """
+    loader = MigrationExecutor(connection).loader
+    nodes = [('boiska', migration)] + [
+        node for node in loader.graph.leaf_nodes() if node[0] != 'boiska'
+    ]
+    return loader.project_state(nodes).apps
+
+
+def seed(apps, rows, places, sports_grounds_per_place, days, batch_size):
+    Place = apps.get_model('boiska', 'Place')
+    SportsGround = apps.get_model('boiska', 'SportsGround')
+    Reservation = apps.get_model('boiska', 'Reservation')
+    administrator = apps.get_model('auth', 'User').objects.create(
+        username='ExampleMan', password='qwerty123')
+    sports_grounds = []
+    for place_number in range(places):
+        place = Place.objects.create(
+            name='Benchmark ' + str(place_number),
+            administrator=administrator,
+            description='Example description.',
+            phone_number='123321123',
+            city='Poznań',
+            street='Nowina'
+        )
+        sports_grounds += [
+            SportsGround.objects.create(
+                place=place,
+                local_id=local_id,
+                opening_time=datetime.time(8),
+                closing_time=datetime.time(20)
+            )
+            for local_id in range(1, sports_grounds_per_place + 1)
+        ]
+    first_day = datetime.date(2016, 1, 1)
+    batch = []
+    for _ in range(rows):
+        start_hour = random.randint(8, 18)
+        batch.append(Reservation(
+            sports_ground=random.choice(sports_grounds),
+            email='mail@site.com',
+            surname='Surname',
+            event_date=first_day + datetime.timedelta(random.randrange(days)),
+            start_time=datetime.time(start_hour),
+            end_time=datetime.time(start_hour + random.randint(1, 2)),
+            is_accepted=random.random() > 0.1
+        ))
+        if len(batch) == batch_size:
+            Reservation.objects.bulk_create(batch)
+            batch = []
+    Reservation.objects.bulk_create(batch)
+    return sports_grounds, first_day
+
+
+def hot_queries(apps, sports_grounds, event_date):
+    Reservation = apps.get_model('boiska', 'Reservation')
+    place_sports_grounds = [
+        sports_ground.id for sports_ground in sports_grounds
+        if sports_ground.place_id == sports_grounds[0].place_id
+    ]
+    sports_ground = sports_grounds[0]
+    return {
+        'day timeline': Reservation.objects.filter(
+            event_date=event_date,
+            is_accepted=True,
+            sports_ground__in=place_sports_grounds
+        ).order_by('start_time'),
+        'overlap check': Reservation.objects.filter(
+            sports_ground=sports_ground,
+            event_date=event_date,
+            is_accepted=True
+        ).values_list('start_time', 'end_time'),
+        'occupancy refresh': Reservation.objects.filter(
+            sports_ground__in=[sports_ground.id],
+            event_date__in=[event_date],
+            is_accepted=True
+        ).values_list('sports_ground', 'event_date', 'start_time', 'end_time'),
+        'pending list': Reservation.objects.filter(
+            sports_ground__in=place_sports_grounds,
+            is_accepted=False
+        ).order_by('event_date')[:50],
+    }
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    if connection.vendor == 'sqlite':
+        explain = 'EXPLAIN QUERY PLAN '
+    else:
+        explain = 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(explain + sql, params)
+        return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+
+
+def measure(queries, repeat):
+    results = {}
+    for name, queryset in queries.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        elapsed = (time.perf_counter() - start) / repeat
+        results[name] = (elapsed * 1000, query_plan(queryset))
+    return results
+
+
+def print_results(title, results):
+    print(title)
+    for name, (milliseconds, plan) in results.items():
+        print('  %-18s %10.3f ms' % (name, milliseconds))
+        for line in plan:
+            print('      ' + line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--places', type=int, default=20)
+    parser.add_argument('--sports-grounds', type=int, default=10)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    prepare_database()
+    apps = historical_apps(BEFORE_INDEXES)
+    start = time.perf_counter()
+    sports_grounds, first_day = seed(
+        apps,
+        args.rows,
+        args.places,
+        args.sports_grounds,
+        args.days,
+        args.batch_size
+    )
+    print('Seeded %d reservations in %.1f s' % (
+        args.rows, time.perf_counter() - start))
+    event_date = first_day + datetime.timedelta(args.days // 2)
+    queries = hot_queries(apps, sports_grounds, event_date)
+    print_results('Without indexes:', measure(queries, args.repeat))
+    call_command('migrate', 'boiska', AFTER_INDEXES, verbosity=0,
+        interactive=False)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    print_results('With indexes:', measure(queries, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark of free time search.
+
+Generates places with many sports grounds and a week of reservations
+with generate_reservations in a separate SQLite database, then times
+search.free_slots for a single day, a week and an evening in one city.
+
+Usage:
+    python -m benchmarks.search --places 200 --sports-grounds 10
+"""
+
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import argparse
+import datetime
+import time
+
+from benchmarks import remove_database
+from boiska.models import Place, SportsGround
+from boiska.search import free_slots
+
+FIRST_DAY = datetime.date(2016, 9, 1)
+DAYS = 7
+
+
+def prepare_database(places, sports_grounds):
+    remove_database(settings.DATABASES['default']['NAME'])
+    call_command('migrate', verbosity=0)
+    call_command(
+        'generate_reservations',
+        start_date=FIRST_DAY.isoformat(),
+        end_date=(FIRST_DAY + datetime.timedelta(days=DAYS - 1)).isoformat(),
+        places=places,
+        sports_grounds=sports_grounds,
+        seed=0,
+        verbosity=0
+    )
+
+
+def searches():
+    city = Place.objects.values_list('city', flat=True).first()
+    return [
+        ('one day', {'date_from': FIRST_DAY}),
+        ('week', {
+            'date_from': FIRST_DAY,
+            'date_to': FIRST_DAY + datetime.timedelta(days=DAYS - 1),
+        }),
+        ('evening in ' + city, {
+            'date_from': FIRST_DAY,
+            'city': city,
+            'start_time': datetime.time(18),
+            'end_time': datetime.time(20),
+        }),
+    ]
+
+
+def measure(arguments, repeat):
+    list(free_slots(**arguments))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        slots = list(free_slots(**arguments))
+    wall_time = (time.perf_counter() - start) / repeat
+    with CaptureQueriesContext(connection) as queries:
+        list(free_slots(**arguments))
+    return wall_time, len(queries), len(slots)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--places', type=int, default=200)
+    parser.add_argument('--sports-grounds', type=int, default=10,
+        help='Number of sports grounds of every place.')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    prepare_database(args.places, args.sports_grounds)
+    print('%d sports grounds' % SportsGround.objects.count())
+    for name, arguments in searches():
+        wall_time, queries_number, slots_number = measure(arguments, args.repeat)
+        print('  %-28s %9.3f ms %3d queries %7d slots' % (
+            name, wall_time * 1000, queries_number, slots_number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""
+Settings used by benchmarks. They work on a separate SQLite database,
+so that running a benchmark never touches db.sqlite3.
+"""
+
+from mysite.settings import *
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'BENCHMARK_DATABASE',
+            os.path.join(BASE_DIR, 'benchmark.sqlite3')
+        ),
+    }
+}
+
+# django.test.Client sends requests to this host
+ALLOWED_HOSTS = ['testserver']
+
+# benchmarks use a single database
+BOISKA_READ_REPLICA = None
+BOISKA_SHARDS = ['default']
@@ -0,0 +1,128 @@
+"""
+Benchmark of SQLite PRAGMAs under concurrent traffic.
+
+Several processes post new reservations through PlaceDayView while others
+read days of the place, first with SQLite defaults and then with
+BOISKA_SQLITE_PRAGMAS, every time on a fresh database. Reports throughput
+and requests which failed with "database is locked".
+
+Usage:
+    python -m benchmarks.sqlite --writers 8 --readers 4 --requests 100
+"""
+
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import Client
+from django.urls import reverse
+
+import argparse
+import datetime
+import multiprocessing
+import time
+
+from benchmarks import remove_database
+from boiska import sqlite
+from boiska.myutils import create_place, create_sports_grounds
+
+EVENT_DATE = datetime.date(2016, 9, 23)
+SHOWN_PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size')
+
+
+def prepare_database(pragmas):
+    settings.BOISKA_SQLITE_PRAGMAS = pragmas
+    connection.close()
+    remove_database(settings.DATABASES['default']['NAME'])
+    call_command('migrate', verbosity=0)
+    place = create_place(place_name='Benchmark')
+    sports_grounds = create_sports_grounds(place, quantity=3)
+    shown = sqlite.current_pragmas(connection, SHOWN_PRAGMAS)
+    # forked processes must not share the connection of the parent
+    connection.close()
+    return place, sports_grounds, shown
+
+
+def send_requests(place_name, sports_ground_id, requests, write):
+    """
+    Run in a worker process. Returns (number of requests, failures, seconds).
+    """
+    client = Client()
+    url = reverse('boiska:place_day', args=[
+        place_name, EVENT_DATE.year, EVENT_DATE.month, EVENT_DATE.day])
+    failures = 0
+    start = time.perf_counter()
+    for number in range(requests):
+        try:
+            if write:
+                hour = 8 + number % 11
+                response = client.post(url, {
+                    'sports_ground': sports_ground_id,
+                    'start_time': '%02d:00' % hour,
+                    'end_time': '%02d:00' % (hour + 1),
+                    'email': 'mail@site.com',
+                    'surname': 'Surname',
+                })
+            else:
+                response = client.get(url)
+        except OperationalError:
+            failures += 1
+        else:
+            if response.status_code != 200:
+                failures += 1
+    return requests, failures, time.perf_counter() - start
+
+
+def run(args, pragmas):
+    place, sports_grounds, shown = prepare_database(pragmas)
+    jobs = [
+        (place.name, sports_grounds[worker % len(sports_grounds)].id, args.requests, True)
+        for worker in range(args.writers)
+    ] + [
+        (place.name, sports_grounds[0].id, args.requests, False)
+        for _ in range(args.readers)
+    ]
+    start = time.perf_counter()
+    with multiprocessing.Pool(len(jobs)) as pool:
+        results = pool.starmap(send_requests, jobs)
+    wall_time = time.perf_counter() - start
+    writes = results[:args.writers]
+    reads = results[args.writers:]
+    return {
+        'pragmas': shown,
+        'wall_time': wall_time,
+        'writes': sum(requests for requests, _, _ in writes),
+        'write_failures': sum(failures for _, failures, _ in writes),
+        'reads': sum(requests for requests, _, _ in reads),
+        'read_failures': sum(failures for _, failures, _ in reads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=100,
+        help='Number of requests sent by every process.')
+    args = parser.parse_args()
+
+    tuned_pragmas = settings.BOISKA_SQLITE_PRAGMAS
+    for name, pragmas in (('defaults', {}), ('tuned', tuned_pragmas)):
+        result = run(args, pragmas)
+        print('%s: %s' % (name, ', '.join(
+            '%s=%s' % item for item in sorted(result['pragmas'].items()))))
+        print('  %.2f s, %.1f writes/s (%d failed), %.1f reads/s (%d failed)' % (
+            result['wall_time'],
+            result['writes'] / result['wall_time'],
+            result['write_failures'],
+            result['reads'] / result['wall_time'],
+            result['read_failures'],
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Benchmark of boiska views.
+
+Seeds datasets of several sizes with boiska.myutils helpers into
+a separate SQLite database and requests every view with django.test.Client.
+Wall time, number of queries and peak memory allocated during a request
+are reported and saved as JSON, so that results of two commits can be
+compared.
+
+Usage:
+    python -m benchmarks.views --output before.json
+    python -m benchmarks.views --output after.json --compare before.json
+"""
+
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import argparse
+import datetime
+import json
+import random
+import subprocess
+import time
+import tracemalloc
+
+from benchmarks import remove_database
+from boiska.availability import rebuild_occupancy
+from boiska.models import Reservation
+from boiska.myutils import create_place, create_reservations, create_sports_grounds
+
+# sports grounds, reservations per sports ground per day
+DATASETS = {
+    'small': (3, 2),
+    'medium': (10, 5),
+    'large': (30, 10),
+}
+
+DAYS = 30
+FIRST_DAY = datetime.date(2016, 9, 1)
+
+
+def prepare_database():
+    remove_database(settings.DATABASES['default']['NAME'])
+    call_command('migrate', verbosity=0)
+
+
+def seed(sports_grounds_number, reservations_per_day):
+    call_command('flush', interactive=False, verbosity=0)
+    place = create_place(place_name='Benchmark')
+    for sports_ground in create_sports_grounds(place, quantity=sports_grounds_number):
+        for day in range(DAYS):
+            create_reservations(
+                sports_ground,
+                quantity=reservations_per_day,
+                date=FIRST_DAY + datetime.timedelta(days=day)
+            )
+    # half of reservations is accepted, the rest waits in the admin panel
+    reservations = Reservation.objects.all()
+    accepted_ids = list(reservations.values_list('id', flat=True)[::2])
+    reservations.filter(id__in=accepted_ids).update(is_accepted=True)
+    rebuild_occupancy()
+    return place
+
+
+def view_requests(place):
+    """
+    Requests made by the benchmark as (name, method, url, data).
+    """
+    day = FIRST_DAY + datetime.timedelta(days=DAYS // 2)
+    sports_ground = place.sports_grounds.first()
+    pending = list(Reservation.objects.filter(
+        sports_ground__place=place,
+        is_accepted=False
+    ).values_list('id', flat=True)[:50])
+    return [
+        ('PlaceView', 'get',
+            reverse('boiska:place', args=[place.name, day.year, day.month]),
+            None),
+        ('PlaceDayView', 'get',
+            reverse('boiska:place_day', args=[place.name, day.year, day.month, day.day]),
+            None),
+        ('PlaceDayView POST', 'post',
+            reverse('boiska:place_day', args=[place.name, day.year, day.month, day.day]),
+            {
+                'sports_ground': sports_ground.id,
+                'start_time': '10:00',
+                'end_time': '11:00',
+                'email': 'mail@site.com',
+                'surname': 'Surname',
+            }),
+        ('PlaceAdminView', 'get',
+            reverse('boiska:place_admin', args=[place.name]),
+            None),
+        ('PlaceAdminView POST accept', 'post',
+            reverse('boiska:place_admin', args=[place.name]),
+            {'action': Reservation.ACCEPT, 'reservations': pending}),
+        ('PlaceAdminView POST delete', 'post',
+            reverse('boiska:place_admin', args=[place.name]),
+            {'action': Reservation.DELETE, 'reservations': pending}),
+        ('EditReservationView', 'get',
+            reverse('boiska:edit_reservation', args=[place.name, pending[0]]),
+            None),
+        ('EditReservationView POST', 'post',
+            reverse('boiska:edit_reservation', args=[place.name, pending[0]]),
+            {
+                'sports_ground': sports_ground.id,
+                'start_time': '12:00',
+                'end_time': '13:00',
+                'is_accepted': True,
+            }),
+    ]
+
+
+def send(client, method, url, data):
+    """
+    Send a request and roll back everything it has changed,
+    so that every repetition sees the same data.
+    """
+    with transaction.atomic():
+        response = getattr(client, method)(url, data or {})
+        transaction.set_rollback(True)
+    if response.status_code >= 400:
+        raise RuntimeError('%s returned %d' % (url, response.status_code))
+
+
+def measure(client, method, url, data, repeat):
+    send(client, method, url, data)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        send(client, method, url, data)
+    wall_time = (time.perf_counter() - start) / repeat
+    with CaptureQueriesContext(connection) as queries:
+        send(client, method, url, data)
+    # captured queries are read from the connection lazily and the next
+    # request clears them
+    queries_number = len(queries)
+    tracemalloc.start()
+    send(client, method, url, data)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'wall_time_ms': round(wall_time * 1000, 3),
+        'queries': queries_number,
+        'peak_memory_kb': round(peak_memory / 1024, 1),
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, previous=None):
+    for dataset, views in results['datasets'].items():
+        print(dataset)
+        for view, result in views.items():
+            line = '  %-28s %9.3f ms %5d queries %9.1f kB' % (
+                view,
+                result['wall_time_ms'],
+                result['queries'],
+                result['peak_memory_kb'],
+            )
+            try:
+                old = previous['datasets'][dataset][view]
+            except (KeyError, TypeError):
+                pass
+            else:
+                line += '   (was %.3f ms, %d queries, %.1f kB)' % (
+                    old['wall_time_ms'], old['queries'], old['peak_memory_kb'])
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--datasets', nargs='+', choices=list(DATASETS),
+        default=list(DATASETS))
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Save results to this JSON file.')
+    parser.add_argument('--compare', help='JSON file with previous results.')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    prepare_database()
+    client = Client()
+    results = {
+        'commit': current_commit(),
+        'date': datetime.datetime.now().isoformat(),
+        'repeat': args.repeat,
+        'datasets': {},
+    }
+    for dataset in args.datasets:
+        place = seed(*DATASETS[dataset])
+        results['datasets'][dataset] = {
+            name: measure(client, method, url, data, args.repeat)
+            for name, method, url, data in view_requests(place)
+        }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous = json.load(previous_file)
+    print_results(results, previous)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,21 @@
 from django.contrib import admin
-from .models import Place, SportsGround, Reservation
+from .models import HoursException, Place, SportsGround, Reservation, WeeklyHours
+
+
+class WeeklyHoursInline(admin.TabularInline):
+    model = WeeklyHours
+    extra = 0
+
+
+class HoursExceptionInline(admin.TabularInline):
+    model = HoursException
+    extra = 0
+
+
+class SportsGroundAdmin(admin.ModelAdmin):
+    inlines = [WeeklyHoursInline, HoursExceptionInline]
 
 
 admin.site.register(Place)
-admin.site.register(SportsGround)
+admin.site.register(SportsGround, SportsGroundAdmin)
 admin.site.register(Reservation)
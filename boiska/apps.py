@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class BoiskaConfig(AppConfig):
     name = 'boiska'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        from . import signals
+        from .intake import check_cache
+        from .sqlite import configure_connection
+        connection_created.connect(configure_connection)
+        if settings.BOISKA_INTAKE_THREAD:
+            check_cache()
@@ -0,0 +1,100 @@
+"""
+Archival of past reservations.
+
+Accepted reservations of days older than BOISKA_ARCHIVE_AFTER_DAYS are moved
+from Reservation to ArchivedReservation, so that the table read by views
+holds only recent and future reservations. Pending reservations of days
+which have passed are expired: they are archived as not accepted, so they
+leave the admin panel.
+
+DailyOccupancy rows of archived days are kept, so calendars of past months
+don't change; rebuild_occupancy() and reports count archived reservations.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from . import routers
+from .models import ArchivedReservation, Place, Reservation, SportsGround
+
+
+# every batch is deleted with one statement, SQLite takes
+# at most 999 parameters
+BATCH_SIZE = 500
+
+FIELDS = ('sports_ground_id', 'email', 'surname', 'event_date',
+    'start_time', 'end_time', 'is_accepted')
+
+
+def archived_before(today=None):
+    """
+    Accepted reservations of days before this date may be archived.
+    """
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=settings.BOISKA_ARCHIVE_AFTER_DAYS)
+
+
+def archive_reservations(today=None, batch_size=BATCH_SIZE):
+    """
+    Archive old accepted reservations and expire pending ones of days
+    before today. Returns numbers of archived and expired reservations.
+    """
+    today = today or datetime.date.today()
+    archived = move_to_archive(
+        Reservation.objects.filter(
+            is_accepted=True,
+            event_date__lt=archived_before(today)
+        ),
+        batch_size
+    )
+    expired = move_to_archive(
+        Reservation.objects.filter(is_accepted=False, event_date__lt=today),
+        batch_size
+    )
+    return archived, expired
+
+
+def move_to_archive(reservations, batch_size):
+    """
+    Move reservations in batches, one transaction each, so that other
+    requests aren't blocked for long. Rows are deleted without signals:
+    occupancy of their days has to stay and pending reservations
+    of archived days are archived as well.
+    """
+    reservations = reservations.order_by('id').values_list('id', *FIELDS)
+    moved = 0
+    changed_sports_grounds = set()
+    database = routers.place_database()
+    while True:
+        with transaction.atomic(using=database):
+            batch = list(reservations[:batch_size])
+            if not batch:
+                break
+            archived = [
+                ArchivedReservation(**dict(zip(FIELDS, row[1:])))
+                for row in batch
+            ]
+            ArchivedReservation.objects.bulk_create(archived)
+            delete_reservations(database, [row[0] for row in batch])
+        moved += len(batch)
+        changed_sports_grounds.update(
+            reservation.sports_ground_id
+            for reservation in archived if reservation.is_accepted
+        )
+    if changed_sports_grounds:
+        # accepted reservations are shown by the day API
+        Place.objects.filter(name__in=SportsGround.objects.filter(
+            id__in=changed_sports_grounds).values('place')).touch()
+    return moved
+
+
+def delete_reservations(database, ids):
+    connection = connections[database]
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM %s WHERE %s IN (%s)' % (
+            connection.ops.quote_name(Reservation._meta.db_table),
+            connection.ops.quote_name('id'),
+            ', '.join(['%s'] * len(ids))
+        ), ids)
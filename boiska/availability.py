@@ -0,0 +1,205 @@
+import datetime
+from calendar import monthrange
+
+from django.db import transaction
+from django.db.models import Sum
+
+from . import hours, routers, slots
+from .models import (ArchivedReservation, DailyOccupancy, Place, Reservation,
+    SportsGround)
+
+
+EMPTY = 0
+BUSY = 1
+VERY_BUSY = 2
+# no sports ground of the place is open
+CLOSED = 3
+
+
+def minutes_between(start_time, end_time):
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    return end - start
+
+
+def availability_level(busy_time, total_time):
+    """
+    Map ratio of reserved time to opening time onto EMPTY, BUSY
+    and VERY_BUSY.
+    """
+    if not total_time:
+        return EMPTY
+    result = busy_time / total_time
+    if result > 0.6:
+        return VERY_BUSY
+    elif result > 0.3:
+        return BUSY
+    else:
+        return EMPTY
+
+
+def month_availability(place, year, month):
+    """
+    Availability of place's sports grounds on every day of a month.
+    Returns a dict mapping day of the month to availability level.
+    Reserved time is read from DailyOccupancy and summed per day
+    by the database, opening time of every day comes from boiska.hours.
+    """
+    first_day = datetime.date(year, month, 1)
+    last_day = datetime.date(year, month, monthrange(year, month)[1])
+    opening_hours = [
+        hours.opening_hours(*row)
+        for row in place.sports_grounds.values_list(*hours.FIELDS)
+    ]
+    booked_minutes = DailyOccupancy.objects.filter(
+        sports_ground__place=place,
+        event_date__range=(first_day, last_day)
+    ).values('event_date').annotate(
+        booked_minutes=Sum('booked_minutes')
+    ).values_list('event_date', 'booked_minutes')
+    booked_minutes = dict(booked_minutes)
+
+    availability = {}
+    for month_day in range(1, last_day.day + 1):
+        event_date = datetime.date(year, month, month_day)
+        total_minutes = sum(
+            sports_ground_hours.open_minutes(event_date)
+            for sports_ground_hours in opening_hours
+        )
+        if opening_hours and not total_minutes:
+            availability[month_day] = CLOSED
+            continue
+        busy_minutes = booked_minutes.get(event_date, 0)
+        availability[month_day] = availability_level(busy_minutes, total_minutes)
+    return availability
+
+
+def occupancy_key(reservation):
+    # event_date may still be a datetime if it was assigned by hand
+    event_date = Reservation._meta.get_field('event_date').to_python(
+        reservation.event_date
+    )
+    return (reservation.sports_ground_id, event_date)
+
+
+def occupancy_by_key(*querysets):
+    """
+    Reserved minutes and bitmap of reserved slots of accepted reservations
+    per (sports ground, date). Reservations and archived reservations
+    are counted together.
+    """
+    occupancy = {}
+    for reservations in querysets:
+        accepted = reservations.filter(is_accepted=True).values_list(
+            'sports_ground', 'event_date', 'start_time', 'end_time'
+        )
+        for sports_ground_id, event_date, start_time, end_time in accepted.iterator():
+            key = (sports_ground_id, event_date)
+            minutes, bitmap = occupancy.get(key, (0, 0))
+            occupancy[key] = (
+                minutes + minutes_between(start_time, end_time),
+                bitmap | slots.time_mask(start_time, end_time)
+            )
+    return occupancy
+
+
+def refresh_occupancy(keys):
+    """
+    Recount DailyOccupancy rows for given (sports ground id, date) pairs.
+    Rows of days without accepted reservations are removed.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    sports_grounds_ids = {sports_ground_id for sports_ground_id, _ in keys}
+    dates = {event_date for _, event_date in keys}
+    booked = occupancy_by_key(
+        Reservation.objects.filter(
+            sports_ground__in=sports_grounds_ids,
+            event_date__in=dates
+        ),
+        # a reservation may be moved to an archived day
+        ArchivedReservation.objects.filter(
+            sports_ground__in=sports_grounds_ids,
+            event_date__in=dates
+        )
+    )
+    stale_ids = []
+    new_occupancies = []
+    with transaction.atomic(using=routers.place_database()):
+        occupancies = {
+            occupancy_key(occupancy): occupancy
+            for occupancy in DailyOccupancy.objects.filter(
+                sports_ground__in=sports_grounds_ids,
+                event_date__in=dates
+            )
+        }
+        for key in keys:
+            occupancy = occupancies.get(key)
+            if key not in booked:
+                if occupancy is not None:
+                    stale_ids.append(occupancy.id)
+                continue
+            minutes, bitmap = booked[key]
+            if occupancy is None:
+                new_occupancies.append(DailyOccupancy(
+                    sports_ground_id=key[0],
+                    event_date=key[1],
+                    booked_minutes=minutes,
+                    slots=slots.to_bytes(bitmap)
+                ))
+            elif (occupancy.booked_minutes != minutes
+                    or slots.from_bytes(occupancy.slots) != bitmap):
+                occupancy.booked_minutes = minutes
+                occupancy.slots = slots.to_bytes(bitmap)
+                occupancy.save(update_fields=['booked_minutes', 'slots'])
+        DailyOccupancy.objects.filter(id__in=stale_ids).delete()
+        DailyOccupancy.objects.bulk_create(new_occupancies)
+
+
+def reservations_changed(keys):
+    """
+    Update everything derived from accepted reservations after they
+    have changed on given (sports ground id, date) pairs: occupancy
+    and revisions of places, which keys of cached calendars contain.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    refresh_occupancy(keys)
+    places = set(SportsGround.objects.filter(
+        id__in={sports_ground_id for sports_ground_id, _ in keys}
+    ).values_list('place', flat=True))
+    # after occupancy, see boiska.calendar_cache
+    Place.objects.filter(name__in=places).touch()
+
+
+def rebuild_occupancy(batch_size=1000):
+    """
+    Fill DailyOccupancy from scratch using all accepted reservations,
+    archived ones included.
+    Returns number of created rows.
+    """
+    booked = occupancy_by_key(
+        Reservation.objects.all(),
+        ArchivedReservation.objects.all()
+    )
+    occupancies = [
+        DailyOccupancy(
+            sports_ground_id=sports_ground_id,
+            event_date=event_date,
+            booked_minutes=minutes,
+            slots=slots.to_bytes(bitmap)
+        )
+        for (sports_ground_id, event_date), (minutes, bitmap) in booked.items()
+    ]
+    with transaction.atomic(using=routers.place_database()):
+        DailyOccupancy.objects.all().delete()
+        # batch_size passed to bulk_create would override the limit
+        # of query parameters of the backend, so slice the list instead
+        for start in range(0, len(occupancies), batch_size):
+            DailyOccupancy.objects.bulk_create(
+                occupancies[start:start + batch_size]
+            )
+    Place.objects.all().touch()
+    return len(occupancies)
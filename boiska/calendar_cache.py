@@ -0,0 +1,59 @@
+"""
+Cache of availability calendars of places, one entry per place and month.
+
+Every key contains the revision of the place the calendar was built at,
+and its modification time, which tells apart places recreated with
+the same name, like the ETag of the place page.
+Place.revision is raised after every change of accepted reservations,
+occupancy, sports grounds or opening hours is written, and the revision
+is read before the calendar is built, so an entry can't hold data older
+than its revision. Readers which see a newer revision don't find old
+entries, which are left to expire. Processes don't have to share the cache
+and nothing has to be removed from it; a calendar built from a lagging read
+replica is kept under the revision read from the replica.
+The cache alias is set by BOISKA_CALENDAR_CACHE, so any Django cache
+backend can be used.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+import hashlib
+
+
+def get_cache():
+    return caches[settings.BOISKA_CALENDAR_CACHE]
+
+
+def place_key(place_name):
+    # place names contain spaces and non-ASCII letters which
+    # are not allowed in memcached keys
+    return hashlib.md5(place_name.encode('utf-8')).hexdigest()
+
+
+def month_key(place, year, month):
+    return 'calendar:%s:%s:%d:%d:%d' % (
+        place_key(place.name),
+        place.modified.strftime('%Y%m%d%H%M%S%f'),
+        place.revision,
+        year,
+        month
+    )
+
+
+def get_calendar(place, year, month, build_calendar):
+    """
+    Return cached calendar of a month or build and cache it. place
+    has to be read before the calendar is built.
+    """
+    cache = get_cache()
+    key = month_key(place, year, month)
+    calendar = cache.get(key)
+    if calendar is None:
+        calendar = build_calendar()
+        cache.set(key, calendar)
+    return calendar
+
+
+def clear():
+    get_cache().clear()
@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+import threading
+
+from django.db.models import Case, F, Q, Value, When
+
+from .availability import occupancy_key
+from .intervals import IntervalIndex
+from .models import Reservation
+
+
+# every id is passed twice to the UPDATE, SQLite allows 999 parameters
+UPDATE_BATCH_SIZE = 400
+
+deferred_keys = threading.local()
+
+
+def classify(accepted, pending):
+    """
+    Classify pending reservations of one sports ground on one day.
+    Both lists contain (start, end, ...) tuples sorted by start.
+    Sweep over pending reservations in order of start time: a reservation
+    overlapping an accepted one is CONFLICTING, one starting before
+    the end of the last FREE reservation is SUPERSEDED by it, the rest
+    are FREE. FREE reservations never overlap each other, so all of them
+    can be accepted at once.
+    Returns list of conflict statuses in order of pending.
+    """
+    accepted_index = IntervalIndex(
+        (start, end) for start, end, *_ in accepted
+    )
+    claimed_end = None
+    statuses = []
+    for start, end, *_ in pending:
+        if accepted_index.overlaps(start, end):
+            statuses.append(Reservation.CONFLICTING)
+        elif claimed_end is not None and start < claimed_end:
+            statuses.append(Reservation.SUPERSEDED)
+        else:
+            statuses.append(Reservation.FREE)
+            claimed_end = end
+    return statuses
+
+
+def classify_days(keys):
+    """
+    Classify pending reservations on given (sports ground id, date) pairs.
+    Reservations of all pairs are read with one query, which asks for
+    the dates of every sports ground separately, and their statuses
+    are written with one UPDATE per UPDATE_BATCH_SIZE pending reservations,
+    so the number of queries doesn't depend on how statuses change.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    dates = {}
+    for sports_ground_id, event_date in keys:
+        dates.setdefault(sports_ground_id, set()).add(event_date)
+    days_filter = Q()
+    for sports_ground_id, event_dates in dates.items():
+        days_filter |= Q(sports_ground=sports_ground_id, event_date__in=event_dates)
+    reservations = Reservation.objects.filter(days_filter).order_by('start_time', 'id').values_list(
+        'start_time', 'end_time', 'id', 'sports_ground', 'event_date',
+        'is_accepted'
+    )
+    days = {}
+    for reservation in reservations:
+        accepted, pending = days.setdefault(reservation[3:5], ([], []))
+        if reservation[5]:
+            accepted.append(reservation)
+        else:
+            pending.append(reservation)
+    statuses = []
+    for accepted, pending in days.values():
+        statuses += zip(
+            (reservation[2] for reservation in pending),
+            classify(accepted, pending)
+        )
+    for start in range(0, len(statuses), UPDATE_BATCH_SIZE):
+        save_statuses(statuses[start:start + UPDATE_BATCH_SIZE])
+
+
+def save_statuses(statuses):
+    """
+    Save (reservation id, status) pairs with a single UPDATE.
+    """
+    ids_by_status = {}
+    for reservation_id, status in statuses:
+        ids_by_status.setdefault(status, []).append(reservation_id)
+    Reservation.objects.filter(
+        id__in=[reservation_id for reservation_id, _ in statuses]
+    ).update(conflict=Case(
+        *[
+            When(id__in=reservations_ids, then=Value(status))
+            for status, reservations_ids in ids_by_status.items()
+        ],
+        default=F('conflict')
+    ))
+
+
+def classify_all(batch_size=500):
+    """
+    Classify all pending reservations, batch_size days at a time.
+    Returns number of classified days.
+    """
+    keys = list(Reservation.objects.filter(is_accepted=False).values_list(
+        'sports_ground', 'event_date'
+    ).distinct())
+    for start in range(0, len(keys), batch_size):
+        classify_days(keys[start:start + batch_size])
+    return len(keys)
+
+
+def reclassify(reservations):
+    """
+    Classify days of given reservations again, right away or at the end
+    of the enclosing deferred() block.
+    """
+    keys = {occupancy_key(reservation) for reservation in reservations}
+    pending_keys = getattr(deferred_keys, 'keys', None)
+    if pending_keys is None:
+        classify_days(keys)
+    else:
+        pending_keys.update(keys)
+
+
+@contextmanager
+def deferred():
+    """
+    Classify days changed inside the block once, when the block ends,
+    instead of after every saved or deleted reservation.
+    """
+    if getattr(deferred_keys, 'keys', None) is not None:
+        yield
+        return
+    deferred_keys.keys = set()
+    try:
+        yield
+        keys = deferred_keys.keys
+    finally:
+        deferred_keys.keys = None
+    classify_days(keys)
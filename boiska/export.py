@@ -0,0 +1,107 @@
+"""
+Export of reservations of a place as CSV or newline-delimited JSON.
+
+Reservations are read as values() rows in chunks ordered by id, every chunk
+starting after the last id of the previous one, and written out one line
+at a time. Memory use doesn't depend on the number of exported reservations
+and the first lines can be sent before the last ones are read.
+"""
+
+from collections import OrderedDict
+import csv
+import json
+
+from .models import Reservation
+
+
+FIELDS = (
+    'id', 'sports_ground', 'event_date', 'start_time', 'end_time',
+    'surname', 'email', 'is_accepted', 'conflict',
+)
+CHUNK_SIZE = 2000
+
+
+def reservations(place, date_from=None, date_to=None, status='all'):
+    # rows are streamed after the view has returned, so the database
+    # of the place is chosen now, see boiska.shards
+    queryset = Reservation.objects.using(place._state.db).filter(
+        sports_ground__place=place
+    )
+    if date_from:
+        queryset = queryset.filter(event_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(event_date__lte=date_to)
+    if status == 'accepted':
+        queryset = queryset.filter(is_accepted=True)
+    elif status == 'pending':
+        queryset = queryset.filter(is_accepted=False)
+    return queryset
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield reservations of queryset as dictionaries with FIELDS, executing
+    one query per chunk_size reservations.
+    """
+    queryset = queryset.order_by('id').values(
+        'id', 'sports_ground__name_prefix', 'sports_ground__local_id',
+        'event_date', 'start_time', 'end_time', 'surname', 'email',
+        'is_accepted', 'conflict'
+    )
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        for row in chunk:
+            yield export_row(row)
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1]['id']
+
+
+def export_row(row):
+    return OrderedDict((
+        ('id', row['id']),
+        ('sports_ground', row['sports_ground__name_prefix'] + ' '
+            + str(row['sports_ground__local_id'])),
+        ('event_date', row['event_date'].isoformat()),
+        ('start_time', row['start_time'].strftime('%H:%M')),
+        ('end_time', row['end_time'].strftime('%H:%M')),
+        ('surname', row['surname']),
+        ('email', row['email']),
+        ('is_accepted', row['is_accepted']),
+        ('conflict', row['conflict']),
+    ))
+
+
+class Echo:
+    """
+    File-like object returning what is written to it, so that csv.writer
+    produces lines instead of writing them anywhere.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow(row.values())
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+# format: (content type, function turning rows into lines)
+FORMATS = OrderedDict((
+    ('csv', ('text/csv; charset=utf-8', csv_lines)),
+    ('ndjson', ('application/x-ndjson; charset=utf-8', ndjson_lines)),
+))
+
+
+def export_lines(queryset, export_format, chunk_size=CHUNK_SIZE):
+    lines = FORMATS[export_format][1]
+    return lines(iter_rows(queryset, chunk_size=chunk_size))
@@ -1,27 +1,54 @@
 from django import forms
 from django.core.exceptions import ValidationError
 
+import datetime
+
+from . import hours
 from .models import Place, Reservation, SportsGround
+from .slots import to_minutes
+
+
+def validate_reservation_hours(sports_ground, start_time, end_time, event_date=None):
+    """
+    Reservation has to end after it starts and fit in opening hours
+    of the sports ground on its day, see boiska.hours. Without event_date
+    only opening and closing time of the sports ground are checked.
+    """
+    if event_date is None:
+        opening_hours = hours.hours_in_minutes(
+            sports_ground.opening_time, sports_ground.closing_time)
+    else:
+        opening_hours = hours.for_sports_ground(sports_ground).on(event_date)
+    if opening_hours is None:
+        raise ValidationError('Boisko jest nieczynne w tym dniu.')
+    opening, closing = opening_hours
+    if (start_time >= end_time or to_minutes(start_time) < opening
+            or to_minutes(end_time) > closing):
+        raise ValidationError('Nieprawidłowe godziny trwania rezerwacji.')
+
 
 class ReservationForm(forms.ModelForm):
-    def __init__(self, place=None, *args, **kwargs):
+    def __init__(self, place=None, *args, event_date=None, **kwargs):
         """
         Limit sports grounds to these that belong to the particular place.
+        Hours are checked against opening hours on event_date, the date
+        of the edited reservation by default.
         """
         super(ReservationForm, self).__init__(*args, **kwargs)
+        self.event_date = event_date or self.instance.event_date
         if place is not None:
-            self.fields['sports_ground'].queryset = SportsGround.objects.filter(place=place)
+            self.fields['sports_ground'].queryset = SportsGround.objects.filter(
+                place=place
+            ).select_related('place')
     
     def clean(self):
         super(ReservationForm, self).clean()
         start_time = self.cleaned_data.get('start_time')
         end_time = self.cleaned_data.get('end_time')
-        if start_time and end_time:
-            sports_ground = self.cleaned_data['sports_ground']
-            opening_time = sports_ground.opening_time
-            closing_time = sports_ground.closing_time
-            if start_time >= end_time or start_time < opening_time or end_time > closing_time:
-                raise ValidationError('Nieprawidłowe godziny trwania rezerwacji.')
+        sports_ground = self.cleaned_data.get('sports_ground')
+        if start_time and end_time and sports_ground:
+            validate_reservation_hours(
+                sports_ground, start_time, end_time, self.event_date)
         return self.cleaned_data
 
 
@@ -57,3 +84,147 @@ class EditPlaceForm(forms.ModelForm):
     class Meta:
         model = Place
         exclude = ('name', 'administrator')
+
+
+class FreeSlotSearchForm(forms.Form):
+    """
+    Query of the free time search. Dates are required, other fields
+    narrow the search down.
+    """
+    MAX_DAYS = 31
+    MAX_LIMIT = 1000
+
+    city = forms.CharField(max_length=30, required=False)
+    date_from = forms.DateField()
+    date_to = forms.DateField(required=False)
+    start_time = forms.TimeField(required=False)
+    end_time = forms.TimeField(required=False)
+    min_duration = forms.IntegerField(min_value=1, required=False,
+        help_text='Minutes, 60 by default.')
+    limit = forms.IntegerField(min_value=1, max_value=MAX_LIMIT, required=False)
+
+    def clean(self):
+        super(FreeSlotSearchForm, self).clean()
+        date_from = self.cleaned_data.get('date_from')
+        date_to = self.cleaned_data.get('date_to') or date_from
+        if date_from and date_to:
+            if date_to < date_from:
+                raise ValidationError('Nieprawidłowy zakres dat.')
+            if (date_to - date_from).days >= self.MAX_DAYS:
+                raise ValidationError(
+                    'Można szukać najwyżej %d dni naraz.' % self.MAX_DAYS
+                )
+        start_time = self.cleaned_data.get('start_time')
+        end_time = self.cleaned_data.get('end_time')
+        if start_time and end_time and start_time >= end_time:
+            raise ValidationError('Nieprawidłowe godziny.')
+        return self.cleaned_data
+
+    def search_arguments(self):
+        """
+        Keyword arguments of search.free_slots.
+        """
+        return {
+            'date_from': self.cleaned_data['date_from'],
+            'date_to': self.cleaned_data['date_to'],
+            'city': self.cleaned_data['city'],
+            'start_time': self.cleaned_data['start_time'],
+            'end_time': self.cleaned_data['end_time'],
+            'min_duration': datetime.timedelta(
+                minutes=self.cleaned_data['min_duration'] or 60
+            ),
+        }
+
+
+class ReportForm(forms.Form):
+    """
+    Period of a utilization report. Both dates default to the season
+    of sports grounds.
+    """
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+    def clean(self):
+        super(ReportForm, self).clean()
+        date_from = self.cleaned_data.get('date_from')
+        date_to = self.cleaned_data.get('date_to')
+        if date_from and date_to and date_to < date_from:
+            raise ValidationError('Nieprawidłowy zakres dat.')
+        return self.cleaned_data
+
+
+class ExportForm(ReportForm):
+    """
+    Period, status and format of exported reservations. Without dates
+    all reservations are exported.
+    """
+    STATUS_CHOICES = (
+        ('all', 'Wszystkie'),
+        ('accepted', 'Zaakceptowane'),
+        ('pending', 'Oczekujące'),
+    )
+    FORMAT_CHOICES = (
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+    )
+    status = forms.ChoiceField(choices=STATUS_CHOICES, required=False)
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, required=False)
+
+    def clean_status(self):
+        return self.cleaned_data['status'] or 'all'
+
+    def clean_format(self):
+        return self.cleaned_data['format'] or 'csv'
+
+
+class ImportedReservationForm(forms.Form):
+    """
+    One row of an imported file. Sports grounds are given by their local
+    names and looked up in a dictionary, so validation makes no queries.
+    Use validate_row() to check many rows with one form.
+    """
+    TIME_FORMATS = ('%H:%M', '%H:%M:%S')
+
+    sports_ground = forms.CharField()
+    event_date = forms.DateField()
+    start_time = forms.TimeField(input_formats=TIME_FORMATS)
+    end_time = forms.TimeField(input_formats=TIME_FORMATS)
+    email = forms.EmailField()
+    surname = forms.CharField(max_length=40)
+    is_accepted = forms.BooleanField(required=False)
+
+    def __init__(self, sports_grounds, *args, **kwargs):
+        super(ImportedReservationForm, self).__init__(*args, **kwargs)
+        self.sports_grounds = sports_grounds
+
+    def validate_row(self, row):
+        """
+        Bind the form to another row and validate it. Creating a new form
+        for every row would copy all its fields every time.
+        """
+        self.data = row
+        self.is_bound = True
+        self._errors = None
+        return self.is_valid()
+
+    def clean_sports_ground(self):
+        name = self.cleaned_data['sports_ground']
+        if name not in self.sports_grounds:
+            raise ValidationError('Nie ma boiska o nazwie %s.' % name)
+        return self.sports_grounds[name]
+
+    def clean(self):
+        super(ImportedReservationForm, self).clean()
+        start_time = self.cleaned_data.get('start_time')
+        end_time = self.cleaned_data.get('end_time')
+        sports_ground = self.cleaned_data.get('sports_ground')
+        event_date = self.cleaned_data.get('event_date')
+        if start_time and end_time and sports_ground and event_date:
+            validate_reservation_hours(
+                sports_ground, start_time, end_time, event_date)
+        return self.cleaned_data
+
+
+class ImportForm(forms.Form):
+    file = forms.FileField()
+    format = forms.ChoiceField(choices=ExportForm.FORMAT_CHOICES)
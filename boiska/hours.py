@@ -0,0 +1,141 @@
+"""
+Opening hours of sports grounds.
+
+A sports ground is open from opening_time to closing_time every day of its
+season, from start_season_date to end_season_date if they are set.
+WeeklyHours replace the hours of a weekday, HoursException those of a single
+date, for example a holiday. Empty hours mean that it is closed.
+
+Weekly hours and exceptions are compiled into SportsGround.schedule whenever
+they change, so everything that reads sports grounds gets them without
+extra queries. opening_hours() turns the columns in FIELDS into OpeningHours,
+which answers for any date with two dictionary lookups. Parsed schedules
+are kept in memory, there are few of them and they rarely change.
+"""
+
+import datetime
+import functools
+import json
+
+from .models import SportsGround
+from .slots import to_minutes
+
+
+# columns of SportsGround which opening_hours() takes
+FIELDS = ('opening_time', 'closing_time', 'start_season_date',
+    'end_season_date', 'schedule')
+
+
+def to_time(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def hours_in_minutes(opening_time, closing_time):
+    """
+    (opening, closing) in minutes since midnight, None if closed.
+    """
+    if opening_time is None or closing_time is None or opening_time >= closing_time:
+        return None
+    return to_minutes(opening_time), to_minutes(closing_time)
+
+
+class OpeningHours:
+    """
+    Opening hours of one sports ground on every date.
+    """
+
+    def __init__(self, hours, season_start, season_end, weekdays, dates):
+        self.season_start = season_start
+        self.season_end = season_end
+        self.week = [weekdays.get(weekday, hours) for weekday in range(7)]
+        self.dates = dates
+
+    def on(self, date):
+        """
+        (opening, closing) in minutes since midnight on date, None if closed.
+        """
+        if self.season_start is not None and date < self.season_start:
+            return None
+        if self.season_end is not None and date > self.season_end:
+            return None
+        if self.dates and date in self.dates:
+            return self.dates[date]
+        return self.week[date.weekday()]
+
+    def times_on(self, date):
+        """
+        Opening and closing time on date, None if closed.
+        """
+        hours = self.on(date)
+        if hours is None:
+            return None
+        return to_time(hours[0]), to_time(hours[1])
+
+    def open_minutes(self, date):
+        hours = self.on(date)
+        if hours is None:
+            return 0
+        return hours[1] - hours[0]
+
+
+def compile_schedule(weekly_hours, exceptions):
+    """
+    Compact form of (weekday, opening time, closing time)
+    and (date, opening time, closing time) rules kept in SportsGround.schedule.
+    """
+    weekly_hours = list(weekly_hours)
+    exceptions = list(exceptions)
+    if not weekly_hours and not exceptions:
+        return ''
+    return json.dumps({
+        'weekdays': {
+            str(weekday): hours_in_minutes(opening_time, closing_time)
+            for weekday, opening_time, closing_time in weekly_hours
+        },
+        'dates': {
+            date.isoformat(): hours_in_minutes(opening_time, closing_time)
+            for date, opening_time, closing_time in exceptions
+        },
+    }, sort_keys=True, separators=(',', ':'))
+
+
+@functools.lru_cache(maxsize=4096)
+def opening_hours(opening_time, closing_time, start_season_date,
+        end_season_date, schedule):
+    """
+    OpeningHours from values of FIELDS of a sports ground.
+    """
+    rules = json.loads(schedule) if schedule else {}
+    return OpeningHours(
+        hours_in_minutes(opening_time, closing_time),
+        start_season_date,
+        end_season_date,
+        weekdays={
+            int(weekday): tuple(hours) if hours else None
+            for weekday, hours in rules.get('weekdays', {}).items()
+        },
+        dates={
+            datetime.datetime.strptime(date, '%Y-%m-%d').date():
+                tuple(hours) if hours else None
+            for date, hours in rules.get('dates', {}).items()
+        }
+    )
+
+
+def for_sports_ground(sports_ground):
+    return opening_hours(*[getattr(sports_ground, field) for field in FIELDS])
+
+
+def update_schedule(sports_ground):
+    """
+    Compile rules of a sports ground after they have changed.
+    """
+    sports_ground.schedule = compile_schedule(
+        sports_ground.weekly_hours.values_list(
+            'weekday', 'opening_time', 'closing_time'),
+        sports_ground.hours_exceptions.values_list(
+            'date', 'opening_time', 'closing_time')
+    )
+    SportsGround.objects.filter(id=sports_ground.id).update(
+        schedule=sports_ground.schedule
+    )
@@ -0,0 +1,153 @@
+"""
+Import of reservations of a place from CSV or newline-delimited JSON files
+with columns written by boiska.export (id and conflict are ignored).
+
+Rows are read one at a time and validated by ImportedReservationForm with
+the same rules of hours as reservation forms, without queries. Valid rows
+are saved in batches: accepted reservations of a batch are checked against
+each other and accepted reservations in the database with a ReservationIndex
+loaded by one query, then the batch is written with bulk_create in one
+transaction. Rows which can't be imported are reported with line numbers.
+"""
+
+import csv
+import json
+
+from django.db import transaction
+
+from . import availability, conflicts, locks, routers
+from .forms import ImportedReservationForm
+from .intervals import ReservationIndex
+from .models import Reservation
+
+
+BATCH_SIZE = 1000
+
+
+def read_csv(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson(lines):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+# format: function yielding (line number, row) pairs from lines of text
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+def decode_lines(lines, encoding='utf-8-sig'):
+    """
+    Lines of an uploaded file are bytes, readers need text.
+    """
+    for line in lines:
+        yield line.decode(encoding)
+
+
+def error_message(form):
+    messages = []
+    for field, errors in form.errors.items():
+        if field == '__all__':
+            messages.extend(errors)
+        else:
+            messages.append('%s: %s' % (field, ' '.join(errors)))
+    return ' '.join(messages)
+
+
+class ReservationImport:
+    """
+    Import of rows into reservations of a place. After run() imported is
+    the number of saved reservations and errors is a list of
+    (line number, message) pairs of rejected rows.
+    """
+
+    def __init__(self, place, batch_size=BATCH_SIZE):
+        self.place = place
+        self.batch_size = batch_size
+        self.sports_grounds = {
+            sports_ground.local_name(): sports_ground
+            for sports_ground in place.sports_grounds.all()
+        }
+        self.form = ImportedReservationForm(self.sports_grounds)
+        self.imported = 0
+        self.errors = []
+
+    def run(self, rows):
+        batch = []
+        for line_number, row in rows:
+            reservation = self.validate(line_number, row)
+            if reservation is None:
+                continue
+            batch.append((line_number, reservation))
+            if len(batch) >= self.batch_size:
+                self.save_batch(batch)
+                batch = []
+        self.save_batch(batch)
+        self.errors.sort()
+
+    def validate(self, line_number, row):
+        """
+        Reservation built from a row or None if the row is invalid.
+        """
+        if not isinstance(row, dict):
+            self.errors.append((line_number, 'Nieprawidłowy wiersz.'))
+            return None
+        if not self.form.validate_row(row):
+            self.errors.append((line_number, error_message(self.form)))
+            return None
+        data = self.form.cleaned_data
+        return Reservation(
+            sports_ground=data['sports_ground'],
+            event_date=data['event_date'],
+            start_time=data['start_time'],
+            end_time=data['end_time'],
+            email=data['email'],
+            surname=data['surname'],
+            is_accepted=data['is_accepted']
+        )
+
+    def save_batch(self, batch):
+        if not batch:
+            return
+        accepted = [reservation for _, reservation in batch if reservation.is_accepted]
+        saved = []
+        with transaction.atomic(using=routers.place_database()):
+            locks.lock_days(availability.occupancy_key(reservation)
+                for reservation in accepted)
+            index = ReservationIndex(accepted)
+            for line_number, reservation in batch:
+                if reservation.is_accepted:
+                    if index.overlaps(reservation):
+                        self.errors.append(
+                            (line_number, 'Rezerwacja nachodzi na zaakceptowaną.')
+                        )
+                        continue
+                    index.add(reservation)
+                saved.append(reservation)
+            Reservation.objects.bulk_create(saved)
+        self.imported += len(saved)
+        # bulk_create() doesn't send post_save signals
+        availability.reservations_changed(
+            availability.occupancy_key(reservation)
+            for reservation in saved if reservation.is_accepted
+        )
+        conflicts.classify_days(
+            availability.occupancy_key(reservation) for reservation in saved
+        )
+
+
+def write_errors(errors, output):
+    writer = csv.writer(output)
+    writer.writerow(('line', 'error'))
+    writer.writerows(errors)
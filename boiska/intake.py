@@ -0,0 +1,206 @@
+"""
+Intake of new reservations during bursts of traffic.
+
+Web workers only validate reservations and put them on a queue. A background
+thread saves queued reservations in batches, one transaction per batch,
+and records the result of every reservation in the cache under a token,
+so that the client can check it later.
+
+The queue lives in memory of the process, so reservations queued shortly
+before the process is killed may be lost, and with several processes
+BOISKA_INTAKE_CACHE has to point at a cache shared by all of them.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, close_old_connections, transaction
+
+from . import conflicts, routers
+from .models import Reservation
+
+
+logger = logging.getLogger('boiska.intake')
+
+QUEUED = 'queued'
+SAVED = 'saved'
+FAILED = 'failed'
+
+entries = queue.Queue()
+worker = None
+worker_lock = threading.Lock()
+# flush() is registered once, however many times the worker is restarted
+flush_registered = False
+
+
+def get_cache():
+    return caches[settings.BOISKA_INTAKE_CACHE]
+
+
+def check_cache():
+    """
+    Statuses written by the thread of one process have to be readable
+    by all processes, which a cache local to the process doesn't allow.
+    """
+    if isinstance(get_cache(), (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            'BOISKA_INTAKE_CACHE %r is local to the process; point it at '
+            'a shared cache or set BOISKA_INTAKE_THREAD to False.'
+            % settings.BOISKA_INTAKE_CACHE
+        )
+
+
+def status_key(token):
+    return 'boiska:intake:' + token
+
+
+def set_status(token, status, **details):
+    details['status'] = status
+    get_cache().set(
+        status_key(token),
+        details,
+        settings.BOISKA_INTAKE_STATUS_TIMEOUT
+    )
+
+
+def get_status(token):
+    return get_cache().get(status_key(token))
+
+
+def enqueue(reservation):
+    """
+    Queue a validated, unsaved reservation. Returns a token used to check
+    whether it has been saved.
+    """
+    token = uuid.uuid4().hex
+    set_status(token, QUEUED)
+    entries.put((token, reservation))
+    if settings.BOISKA_INTAKE_THREAD:
+        start_worker()
+    return token
+
+
+def start_worker():
+    global worker, flush_registered
+    with worker_lock:
+        if worker is None or not worker.is_alive():
+            worker = threading.Thread(
+                target=run_worker,
+                name='boiska-intake',
+                daemon=True
+            )
+            worker.start()
+            if not flush_registered:
+                atexit.register(flush)
+                flush_registered = True
+
+
+def run_worker():
+    while True:
+        batch = next_batch(
+            settings.BOISKA_INTAKE_BATCH_SIZE,
+            settings.BOISKA_INTAKE_BATCH_WAIT
+        )
+        close_old_connections()
+        try:
+            save_batch(batch)
+        except Exception:
+            # the thread has to keep draining the queue
+            logger.exception('Saving %d queued reservations failed.', len(batch))
+            for token, _ in batch:
+                if (get_status(token) or {}).get('status') == QUEUED:
+                    set_status(token, FAILED)
+        finally:
+            close_old_connections()
+
+
+def next_batch(batch_size, wait):
+    """
+    Wait for a queued reservation, then collect others arriving within
+    wait seconds, up to batch_size of them.
+    """
+    batch = [entries.get()]
+    deadline = time.monotonic() + wait
+    while len(batch) < batch_size:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(entries.get(timeout=timeout))
+        except queue.Empty:
+            break
+    return batch
+
+
+def flush():
+    """
+    Save all queued reservations in the calling thread.
+    """
+    while True:
+        batch = []
+        try:
+            while len(batch) < settings.BOISKA_INTAKE_BATCH_SIZE:
+                batch.append(entries.get_nowait())
+        except queue.Empty:
+            pass
+        if not batch:
+            return
+        save_batch(batch)
+
+
+def save_batch(batch):
+    """
+    Save reservations of a batch, in one transaction per database
+    of their places, see boiska.shards.
+    """
+    by_database = {}
+    for token, reservation in batch:
+        # the database which the sports ground has been validated against
+        database = reservation.sports_ground._state.db
+        by_database.setdefault(database, []).append((token, reservation))
+    for database, entries in by_database.items():
+        with routers.using_database(database):
+            save_entries(entries)
+
+
+def save_entries(batch):
+    reservations = [reservation for _, reservation in batch]
+    try:
+        with transaction.atomic(using=routers.place_database()):
+            Reservation.objects.bulk_create(reservations)
+    except DatabaseError:
+        # find out which reservation is broken
+        for token, reservation in batch:
+            save_one(token, reservation)
+        return
+    for token, reservation in batch:
+        # primary keys are known only on backends returning them
+        # from bulk inserts
+        set_status(token, SAVED, reservation=reservation.pk)
+    try:
+        # bulk_create() doesn't send post_save signals
+        conflicts.reclassify(reservations)
+    except DatabaseError:
+        # the reservations are saved, 'manage.py classify_reservations'
+        # classifies them later
+        logger.exception('Classifying %d saved reservations failed.',
+            len(reservations))
+
+
+def save_one(token, reservation):
+    try:
+        with transaction.atomic(using=routers.place_database()):
+            reservation.save()
+    except DatabaseError:
+        set_status(token, FAILED)
+    else:
+        set_status(token, SAVED, reservation=reservation.pk)
@@ -0,0 +1,79 @@
+import bisect
+
+from .availability import occupancy_key
+from .models import Reservation
+
+
+class IntervalIndex:
+    """
+    Time intervals of one sports ground on one day, sorted by start time.
+    Overlap check needs a single bisection: only intervals starting before
+    the end of the checked one can overlap it, and it is enough to know
+    the latest end among them.
+    """
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        self.latest_ends = []
+        for start, end in intervals:
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start, end):
+        position = bisect.bisect_left(self.starts, end)
+        return position > 0 and self.latest_ends[position - 1] > start
+
+    def add(self, start, end):
+        position = bisect.bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.latest_ends.insert(position, end)
+        latest_end = self.latest_ends[position - 1] if position > 0 else end
+        for i in range(position, len(self.latest_ends)):
+            latest_end = max(latest_end, self.ends[i])
+            self.latest_ends[i] = latest_end
+
+
+class ReservationIndex:
+    """
+    IntervalIndex of accepted reservations for every (sports ground, date)
+    pair of given reservations. Accepted reservations are loaded
+    with one query.
+    """
+
+    def __init__(self, reservations):
+        self.indexes = {}
+        keys = {occupancy_key(reservation) for reservation in reservations}
+        if not keys:
+            return
+        accepted_reservations = Reservation.objects.filter(
+            sports_ground__in={sports_ground_id for sports_ground_id, _ in keys},
+            event_date__in={event_date for _, event_date in keys},
+            is_accepted=True
+        ).order_by('start_time').values_list(
+            'sports_ground', 'event_date', 'start_time', 'end_time'
+        )
+        for sports_ground_id, event_date, start_time, end_time in accepted_reservations:
+            key = (sports_ground_id, event_date)
+            if key in keys:
+                self.index(key).add(start_time, end_time)
+
+    def index(self, key):
+        if key not in self.indexes:
+            self.indexes[key] = IntervalIndex()
+        return self.indexes[key]
+
+    def overlaps(self, reservation):
+        return self.index(occupancy_key(reservation)).overlaps(
+            reservation.start_time,
+            reservation.end_time
+        )
+
+    def add(self, reservation):
+        self.index(occupancy_key(reservation)).add(
+            reservation.start_time,
+            reservation.end_time
+        )
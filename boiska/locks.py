@@ -0,0 +1,66 @@
+from django.db import connections
+from django.db.transaction import TransactionManagementError
+from django.db.models import F
+
+from . import routers
+from .models import SportsGround
+
+
+def lock_days(keys):
+    """
+    Lock (sports ground id, date) pairs until the end of the current
+    transaction, so that only one transaction at a time can check
+    and change accepted reservations on them. Call it before reading
+    the reservations.
+
+    PostgreSQL takes an advisory lock per pair. Backends with row locks
+    lock rows of the sports grounds. SQLite has no row locks, but the first
+    write of a transaction takes the lock of the whole database until
+    commit, so a no-op update of the sports grounds is enough there.
+    """
+    connection = connections[routers.place_database()]
+    if not connection.in_atomic_block:
+        raise TransactionManagementError(
+            'lock_days() has to be called inside a transaction.'
+        )
+    # locks are always taken in the same order to avoid deadlocks
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    sports_grounds_ids = sorted({sports_ground_id for sports_ground_id, _ in keys})
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for sports_ground_id, event_date in keys:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(%s, %s)',
+                    [sports_ground_id, event_date.toordinal()]
+                )
+    elif connection.features.has_select_for_update:
+        list(SportsGround.objects.select_for_update().filter(
+            id__in=sports_grounds_ids
+        ).order_by('id').values_list('id', flat=True))
+    else:
+        SportsGround.objects.filter(id__in=sports_grounds_ids).update(
+            local_id=F('local_id')
+        )
+
+
+def lock_reservations(reservations, days=()):
+    """
+    Lock days of reservations and read them under the locks. days
+    are the days the caller expects them in, from a read made outside
+    the transaction. A reservation moved to another day in the meantime
+    is read again after that day is locked too. Returns the reservations.
+    """
+    locked = set()
+    days = set(days)
+    while True:
+        lock_days(days - locked)
+        locked |= days
+        rows = list(reservations.all())
+        days = {
+            (reservation.sports_ground_id, reservation.event_date)
+            for reservation in rows
+        }
+        if days <= locked:
+            return rows
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+import time
+
+from boiska import archive, routers, shards
+
+
+class Command(BaseCommand):
+    help = ('Move accepted reservations older than BOISKA_ARCHIVE_AFTER_DAYS '
+        'to the archive and expire pending reservations of past days, '
+        'once or every --interval seconds.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE,
+            help='Number of reservations moved in one transaction.')
+        parser.add_argument('--interval', type=float, default=0,
+            help='Seconds between runs, run once if 0.')
+
+    def handle(self, *args, **options):
+        while True:
+            archived = expired = 0
+            for database in shards.databases():
+                with routers.using_database(database):
+                    counts = archive.archive_reservations(
+                        batch_size=options['batch_size'])
+                archived += counts[0]
+                expired += counts[1]
+            self.stdout.write('Archived %d reservations, expired %d.' % (
+                archived, expired))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
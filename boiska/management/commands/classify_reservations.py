@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from boiska import routers, shards
+from boiska.conflicts import classify_all
+
+
+class Command(BaseCommand):
+    help = ('Mark pending reservations as free, conflicting with accepted ones '
+        'or superseded by other pending ones.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+            help='Number of days classified at once.')
+
+    def handle(self, *args, **options):
+        days = 0
+        for database in shards.databases():
+            with routers.using_database(database):
+                days += classify_all(batch_size=options['batch_size'])
+        self.stdout.write('Classified pending reservations of %d days.' % days)
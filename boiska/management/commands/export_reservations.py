@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from boiska import export, shards
+from boiska.forms import ExportForm
+from boiska.models import Place
+
+
+class Command(BaseCommand):
+    help = ('Write reservations of a place as CSV or NDJSON, reading them '
+        'from the database in chunks.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('place')
+        parser.add_argument('--date-from')
+        parser.add_argument('--date-to')
+        parser.add_argument('--status', default='all',
+            choices=[status for status, _ in ExportForm.STATUS_CHOICES])
+        parser.add_argument('--format', choices=sorted(export.FORMATS), default='csv')
+        parser.add_argument('--output',
+            help='File to write to, standard output by default.')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE,
+            help='Number of reservations read with one query.')
+
+    def handle(self, *args, **options):
+        try:
+            with shards.using_place(options['place']):
+                place = Place.objects.get(name=options['place'])
+        except Place.DoesNotExist:
+            raise CommandError('Place "%s" does not exist.' % options['place'])
+        export_form = ExportForm({
+            'date_from': options['date_from'],
+            'date_to': options['date_to'],
+            'status': options['status'],
+            'format': options['format'],
+        })
+        if not export_form.is_valid():
+            raise CommandError('Invalid dates.')
+        data = export_form.cleaned_data
+        reservations = export.reservations(
+            place,
+            date_from=data['date_from'],
+            date_to=data['date_to'],
+            status=data['status']
+        )
+        lines = export.export_lines(
+            reservations,
+            data['format'],
+            chunk_size=options['chunk_size']
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,280 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+import datetime
+import multiprocessing
+import random
+
+from boiska.availability import reservations_changed
+from boiska.conflicts import classify_days
+from boiska.models import Place, Reservation, SportsGround
+
+
+SURNAMES = [
+    'Nowak', 'Kowalski', 'Wiśniewski', 'Wójcik', 'Kowalczyk',
+    'Kamiński', 'Lewandowski', 'Dąbrowski', 'Zieliński', 'Szymański',
+    'Woźniak', 'Kozłowski', 'Jankowski', 'Mazur', 'Wojciechowski',
+    'Kwiatkowski', 'Krawczyk', 'Kaczmarek', 'Piotrowski', 'Grabowski',
+    'Zając', 'Pawłowski', 'Michalski', 'Król', 'Nowakowski',
+    'Wieczorek', 'Wróbel', 'Jabłoński', 'Dudek', 'Adamczyk', 'Majewski',
+    'Nowicki', 'Olszewski', 'Stępień', 'Jaworski', 'Malinowski',
+    'Pawlak', 'Górski', 'Witkowski', 'Walczak', 'Sikora', 'Rutkowski',
+    'Baran', 'Michalak', 'Szewczyk', 'Ostrowski', 'Tomaszewski',
+    'Pietrzak', 'Duda', 'Zalewski', 'Wróblewski', 'Jasiński',
+    'Marciniak', 'Bąk', 'Zawadzki', 'Sadowski', 'Jakubowski', 'Wilk',
+    'Włodarczyk', 'Chmielewski', 'Borkowski', 'Sokołowski',
+    'Szczepański', 'Sawicki', 'Lis', 'Kucharski', 'Mazurek',
+    'Kubiak', 'Kalinowski', 'Wysocki', 'Maciejewski', 'Czarnecki',
+    'Kołodziej', 'Urbański', 'Kaźmierczak', 'Sobczak', 'Konieczny',
+    'Głowacki', 'Zakrzewski', 'Krupa', 'Wasilewski', 'Krajewski',
+    'Adamski', 'Sikorski', 'Mróz', 'Laskowski', 'Gajewski',
+    'Ziółkowski', 'Szulc', 'Makowski', 'Czerwiński', 'Baranowski',
+    'Szymczak', 'Brzeziński', 'Kaczmarczyk', 'Przybylski', 'Cieślak',
+    'Borowski', 'Błaszczyk', 'Andrzejewski',
+]
+
+MAIL_NAMES = [
+    'dyzio', 'pogromca222', 'ziutek0', 'buziaczek', 'rycerz666', 'ahoj',
+    '1typowy1', 'kotlet14', 'your.boss', 'super.player', 'thebest1',
+    'professional', 'porkchop', 'pierogi', 'exterminator45', 'kuba92',
+    'pioter22', 'madzia96', 'informatyk7', 'h3ll0', 'andrzej85',
+    'grzes1', 'karol411', 'jp2', 'reeeemonty', 'dzikie_wieprze', 'winatuska',
+    'orgazmator', 'tobylzamach', 'korwinkrol', 'grazyna', 'janusz74',
+    'bozena52',
+]
+
+MAIL_DOMAINS = [
+    'buziaczek.pl', 'gmail.com', 'hotmail.com', 'example.com',
+    'site.com', 'onet.pl', 'interia.pl', 'wp.pl', 'op.pl', 'ba.com',
+]
+
+# Days of one sports ground refreshed at once, SQLite takes at most
+# 999 query parameters.
+DAYS_PER_REFRESH = 400
+
+# Probability that a reservation starts at a given hour.
+DENSITY_CURVES = {
+    # the later the bigger chance for success
+    'linear': lambda hour: hour / 24,
+    'flat': lambda hour: 0.5,
+    'evening': lambda hour: 0.9 if 17 <= hour < 22 else 0.25,
+}
+
+
+def parse_date(value):
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError('Dates should have YYYY-MM-DD format: ' + value)
+
+
+def minutes(time):
+    return time.hour * 60 + time.minute
+
+
+def as_time(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def choose_duration(generator, start_minutes, density):
+    """
+    Return reservation length in minutes or None if there is no reservation
+    starting at this time.
+    """
+    if generator.random() > density(start_minutes // 60):
+        return None
+    duration = 60
+    if generator.random() < 0.50:
+        duration += 60
+    if generator.random() < 0.50:
+        duration += 30
+    return duration
+
+
+RESERVATION_FIELDS = ('sports_ground_id', 'surname', 'email', 'event_date',
+    'start_time', 'end_time', 'is_accepted')
+
+
+def generate_rows(task):
+    """
+    Generate reservations of one sports ground as tuples of field values.
+    It runs in worker processes, so everything it needs is passed in task.
+    """
+    (sports_ground_id, opening_time, closing_time, start_date, end_date,
+        options) = task
+    generator = random.Random(options['seed'] * 1000003 + sports_ground_id)
+    curve = DENSITY_CURVES[options['density']]
+    density = lambda hour: min(1, curve(hour) * options['density_scale'])
+    opening_minutes = minutes(opening_time)
+    closing_minutes = minutes(closing_time)
+    current_day = start_date
+    while current_day <= end_date:
+        current_minutes = opening_minutes
+        while current_minutes <= closing_minutes - 60:
+            duration = choose_duration(generator, current_minutes, density)
+            if duration is None:
+                current_minutes += 60
+                continue
+            end_minutes = min(current_minutes + duration, closing_minutes)
+            yield (
+                sports_ground_id,
+                generator.choice(SURNAMES),
+                generator.choice(MAIL_NAMES) + '@' + generator.choice(MAIL_DOMAINS),
+                current_day,
+                as_time(current_minutes),
+                as_time(end_minutes),
+                generator.random() >= options['pending_ratio'],
+            )
+            current_minutes = end_minutes
+        current_day += datetime.timedelta(days=1)
+
+
+def refresh_days(sports_grounds_ids, start_date, end_date):
+    """
+    Update occupancy and conflicts of pending reservations on the days
+    reservations were generated for. bulk_create doesn't send signals
+    which keep them up to date. Other days aren't read.
+    """
+    dates = [
+        start_date + datetime.timedelta(days=day)
+        for day in range((end_date - start_date).days + 1)
+    ]
+    for sports_ground_id in sports_grounds_ids:
+        for start in range(0, len(dates), DAYS_PER_REFRESH):
+            keys = [
+                (sports_ground_id, event_date)
+                for event_date in dates[start:start + DAYS_PER_REFRESH]
+            ]
+            reservations_changed(keys)
+            classify_days(keys)
+
+
+def collect_rows(task):
+    return list(generate_rows(task))
+
+
+def write_rows(rows, batch_size):
+    """
+    Save reservations given as tuples with bulk_create and return their number.
+    """
+    created = 0
+    batch = []
+    for row in rows:
+        batch.append(Reservation(**dict(zip(RESERVATION_FIELDS, row))))
+        if len(batch) >= batch_size:
+            Reservation.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    Reservation.objects.bulk_create(batch)
+    return created + len(batch)
+
+
+def generate_and_write_rows(task):
+    return write_rows(generate_rows(task), task[-1]['batch_size'])
+
+
+class Command(BaseCommand):
+    help = ('Generate fake places, sports grounds and reservations '
+        'for development and load testing.')
+
+    def add_arguments(self, parser):
+        today = datetime.date.today()
+        parser.add_argument('--start-date', default=str(today))
+        parser.add_argument(
+            '--end-date',
+            default=str(today + datetime.timedelta(days=30))
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--density',
+            choices=sorted(DENSITY_CURVES),
+            default='linear',
+            help='How the chance of a reservation depends on the hour.'
+        )
+        parser.add_argument(
+            '--density-scale',
+            type=float,
+            default=1.0,
+            help='Multiplier of the density curve.'
+        )
+        parser.add_argument(
+            '--pending-ratio',
+            type=float,
+            default=0.0,
+            help='Part of reservations which are not accepted.'
+        )
+        parser.add_argument(
+            '--places',
+            type=int,
+            default=0,
+            help='Number of new places. Existing sports grounds are used if 0.'
+        )
+        parser.add_argument('--sports-grounds', type=int, default=5,
+            help='Number of sports grounds of every new place.')
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        start_date = parse_date(options['start_date'])
+        end_date = parse_date(options['end_date'])
+        if start_date > end_date:
+            raise CommandError('Start date is later than end date.')
+        random.seed(options['seed'])
+        if options['places']:
+            sports_grounds = self.create_places(
+                options['places'],
+                options['sports_grounds']
+            )
+        else:
+            sports_grounds = SportsGround.objects.all()
+        tasks = [
+            (sports_ground.id, sports_ground.opening_time,
+                sports_ground.closing_time, start_date, end_date, options)
+            for sports_ground in sports_grounds
+        ]
+        if options['workers'] > 1:
+            created = self.generate_in_workers(tasks, options)
+        else:
+            created = sum(map(generate_and_write_rows, tasks))
+        self.stdout.write('Created %d reservations.' % created)
+        refresh_days([task[0] for task in tasks], start_date, end_date)
+
+    def generate_in_workers(self, tasks, options):
+        """
+        SQLite allows only one writer at a time, so with SQLite workers
+        only generate rows and this process saves them. Other databases
+        are written by workers directly.
+        """
+        # worker processes must not share the parent's connections
+        connections.close_all()
+        with multiprocessing.Pool(options['workers']) as pool:
+            if connections[DEFAULT_DB_ALIAS].vendor == 'sqlite':
+                return sum(
+                    write_rows(rows, options['batch_size'])
+                    for rows in pool.imap_unordered(collect_rows, tasks)
+                )
+            return sum(pool.imap_unordered(generate_and_write_rows, tasks))
+
+    def create_places(self, places, sports_grounds_per_place):
+        administrator, _ = User.objects.get_or_create(username='generator')
+        first_number = Place.objects.filter(
+            name__startswith='Generated '
+        ).count()
+        new_sports_grounds = []
+        for number in range(first_number, first_number + places):
+            place = Place.objects.create(
+                name='Generated ' + str(number),
+                administrator=administrator,
+                description='Generated place.',
+                phone_number='123321123',
+                city=random.choice(['Poznań', 'Warszawa', 'Kraków', 'Gdańsk']),
+                street='Nowina',
+            )
+            for _ in range(sports_grounds_per_place):
+                opening_hour = random.randint(6, 10)
+                new_sports_grounds.append(place.sports_grounds.create(
+                    opening_time=datetime.time(opening_hour),
+                    closing_time=datetime.time(opening_hour + random.randint(10, 13))
+                ))
+        return new_sports_grounds
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+import os
+
+from boiska import imports, shards
+from boiska.models import Place
+
+
+class Command(BaseCommand):
+    help = ('Import reservations of a place from a CSV or NDJSON file '
+        'with columns of export_reservations.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('place')
+        parser.add_argument('file')
+        parser.add_argument('--format', choices=sorted(imports.READERS),
+            help='Guessed from the extension of the file by default.')
+        parser.add_argument('--batch-size', type=int, default=imports.BATCH_SIZE,
+            help='Number of reservations saved at once.')
+        parser.add_argument('--errors',
+            help='CSV file to write rejected rows to.')
+
+    def handle(self, *args, **options):
+        if shards.is_read_only(options['place']):
+            raise CommandError('Place "%s" is being moved.' % options['place'])
+        with shards.using_place(options['place']):
+            self.import_reservations(options)
+
+    def import_reservations(self, options):
+        try:
+            place = Place.objects.get(name=options['place'])
+        except Place.DoesNotExist:
+            raise CommandError('Place "%s" does not exist.' % options['place'])
+        file_format = options['format']
+        if file_format is None:
+            file_format = os.path.splitext(options['file'])[1].lstrip('.').lower()
+            if file_format not in imports.READERS:
+                raise CommandError('Unknown format, use --format.')
+        reservation_import = imports.ReservationImport(
+            place,
+            batch_size=options['batch_size']
+        )
+        with open(options['file'], encoding='utf-8-sig', newline='') as lines:
+            reservation_import.run(imports.READERS[file_format](lines))
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8', newline='') as output:
+                imports.write_errors(reservation_import.errors, output)
+        else:
+            for line_number, message in reservation_import.errors:
+                self.stderr.write('%d: %s' % (line_number, message))
+        self.stdout.write('Imported %d reservations, rejected %d rows.' % (
+            reservation_import.imported, len(reservation_import.errors)))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from boiska import shards
+from boiska.models import Place
+
+
+class Command(BaseCommand):
+    help = ('Move a place with its sports grounds and reservations to another '
+        'database from BOISKA_SHARDS. The place is read only during the move.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('place')
+        parser.add_argument('database')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+            help='Number of rows copied at once.')
+        parser.add_argument('--grace', type=float, default=5,
+            help='Seconds given to changes started before the move.')
+
+    def handle(self, *args, **options):
+        try:
+            copied = shards.move_place(
+                options['place'],
+                options['database'],
+                chunk_size=options['chunk_size'],
+                grace=options['grace']
+            )
+        except Place.DoesNotExist:
+            raise CommandError('Place "%s" does not exist.' % options['place'])
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            'Moved %s to %s: %d sports grounds, %d reservations, '
+            '%d days of occupancy.' % (
+                options['place'], options['database'], copied['sports_grounds'],
+                copied['reservation'], copied['dailyoccupancy']))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from boiska import routers, shards
+from boiska.availability import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily occupancy of sports grounds from accepted reservations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = 0
+        for database in shards.databases():
+            with routers.using_database(database):
+                created += rebuild_occupancy(batch_size=options['batch_size'])
+        self.stdout.write('Rebuilt occupancy of %d days.' % created)
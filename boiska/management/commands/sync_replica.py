@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+import time
+
+from boiska import routers
+from boiska.replication import copy_database
+
+
+class Command(BaseCommand):
+    help = ('Copy the default SQLite database to the read replica, once '
+        'or every --interval seconds. A local stand-in for replication.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+            help='Seconds between copies, copy once if 0.')
+
+    def handle(self, *args, **options):
+        alias = routers.replica_alias()
+        if alias is None:
+            raise CommandError('No read replica, set BOISKA_REPLICA_DATABASE.')
+        databases = [settings.DATABASES[DEFAULT_DB_ALIAS], settings.DATABASES[alias]]
+        if any(database['ENGINE'] != 'django.db.backends.sqlite3' for database in databases):
+            raise CommandError('Only SQLite databases can be copied.')
+        source, target = [database['NAME'] for database in databases]
+        while True:
+            start = time.perf_counter()
+            # calendars built from the previous copy are cached under
+            # revisions of places in it, see boiska.calendar_cache
+            copy_database(source, target)
+            self.stdout.write('Copied %s to %s in %.0f ms.' % (
+                source, target, (time.perf_counter() - start) * 1000))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from collections import Counter
+import json
+import logging
+
+from . import routers, shards
+from .models import PlaceShard
+
+logger = logging.getLogger('boiska.queries')
+
+
+class QueryStats:
+    """
+    Queries executed while handling one request.
+    """
+
+    def __init__(self, view_name, method, queries):
+        self.view_name = view_name
+        self.count = len(queries)
+        self.time = sum(float(query['time']) for query in queries)
+        statements = Counter(query['sql'] for query in queries)
+        self.duplicates = sum(
+            count - 1 for count in statements.values() if count > 1
+        )
+        # the shard directory is read again only when its cache expires,
+        # so it doesn't count towards budgets of views
+        self.directory_reads = sum(
+            PlaceShard._meta.db_table in query['sql'] for query in queries
+        )
+        self.budget = None
+        if method in ('GET', 'HEAD'):
+            budgets = getattr(settings, 'BOISKA_QUERY_BUDGETS', {})
+            self.budget = budgets.get(view_name)
+
+    def over_budget(self):
+        return (self.budget is not None
+            and self.count - self.directory_reads > self.budget)
+
+    def server_timing(self):
+        return 'db;dur=%.1f;desc="%d queries, %d duplicated"' % (
+            self.time * 1000,
+            self.count,
+            self.duplicates,
+        )
+
+    def as_dict(self):
+        return {
+            'view': self.view_name,
+            'queries': self.count,
+            'db_time_ms': round(self.time * 1000, 1),
+            'duplicates': self.duplicates,
+            'budget': self.budget,
+        }
+
+
+class QueryStatsMiddleware:
+    """
+    Record number of queries, database time and duplicated queries
+    of requests to boiska views. They are sent in the Server-Timing header,
+    logged by the 'boiska.queries' logger if BOISKA_QUERY_LOG is set
+    and attached to the response as query_stats for tests.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # queries of all databases count, reads may go to a replica
+        databases = connections.all()
+        force_debug_cursors = []
+        first_queries = []
+        for database in databases:
+            force_debug_cursors.append(database.force_debug_cursor)
+            first_queries.append(len(database.queries_log))
+            database.force_debug_cursor = True
+        try:
+            response = self.get_response(request)
+        finally:
+            for database, force_debug_cursor in zip(databases, force_debug_cursors):
+                database.force_debug_cursor = force_debug_cursor
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None or resolver_match.app_name != 'boiska':
+            return response
+        queries = []
+        for database, first_query in zip(databases, first_queries):
+            queries += list(database.queries_log)[first_query:]
+        stats = QueryStats(resolver_match.view_name, request.method, queries)
+        response.query_stats = stats
+        response['Server-Timing'] = stats.server_timing()
+        if getattr(settings, 'BOISKA_QUERY_LOG', False):
+            logger.info(json.dumps(dict(stats.as_dict(), path=request.path)))
+        if stats.over_budget():
+            logger.warning(
+                '%s executed %d queries, budget is %d',
+                stats.view_name,
+                stats.count,
+                stats.budget
+            )
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Allow views from BOISKA_REPLICA_VIEWS to read from the read replica
+    during GET and HEAD requests. Any other request sets a cookie which
+    keeps reads of the browser on the default database for
+    BOISKA_REPLICA_STICKY_SECONDS seconds, so that users see their own
+    changes although the replica lags behind. A cookie, unlike the session,
+    costs no query and works for anonymous users.
+    """
+
+    cookie_name = 'boiska_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.state.replica_allowed = False
+        if (routers.replica_alias() is not None
+                and request.method not in ('GET', 'HEAD', 'OPTIONS')):
+            response.set_cookie(
+                self.cookie_name,
+                '1',
+                max_age=settings.BOISKA_REPLICA_STICKY_SECONDS,
+                httponly=True
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if routers.replica_alias() is None or request.method not in ('GET', 'HEAD'):
+            return None
+        if request.resolver_match.view_name not in settings.BOISKA_REPLICA_VIEWS:
+            return None
+        if self.cookie_name in request.COOKIES:
+            return None
+        routers.state.replica_allowed = True
+        return None
+
+
+class ShardMiddleware:
+    """
+    Send queries of views of a place to the database of the place,
+    see boiska.shards. While the place is being moved to another database
+    requests other than GET and HEAD are refused.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            routers.state.database = None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        place_name = view_kwargs.get('place_name')
+        if place_name is None or not shards.enabled():
+            return None
+        if shards.is_read_only(place_name) and request.method not in ('GET', 'HEAD'):
+            return HttpResponse(
+                'Obiekt jest przenoszony, spróbuj ponownie za chwilę.',
+                status=503
+            )
+        routers.state.database = shards.database_for_place(place_name)
+        return None
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 14:18
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0015_auto_20160922_1807'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOccupancy',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_date', models.DateField()),
+                ('booked_minutes', models.PositiveIntegerField(default=0)),
+                ('open_minutes', models.PositiveIntegerField(default=0)),
+                ('sports_ground', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_occupancies', to='boiska.SportsGround')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyoccupancy',
+            unique_together=set([('sports_ground', 'event_date')]),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 14:21
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+PENDING_INDEX_NAME = 'boiska_reservation_pending'
+
+
+def create_pending_index(apps, schema_editor):
+    """
+    Pending reservations are a small part of the table, so a partial index
+    is much smaller than one covering all reservations. SQLite supports
+    partial indexes too, but its planner can't use them for queries with
+    a bound parameter, which is how Django passes is_accepted.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote_name = schema_editor.quote_name
+    schema_editor.execute(
+        'CREATE INDEX %s ON %s (%s, %s) WHERE NOT %s' % (
+            quote_name(PENDING_INDEX_NAME),
+            quote_name('boiska_reservation'),
+            quote_name('sports_ground_id'),
+            quote_name('event_date'),
+            quote_name('is_accepted'),
+        )
+    )
+
+
+def drop_pending_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX %s' % schema_editor.quote_name(PENDING_INDEX_NAME)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0016_auto_20261018_1618'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='reservation',
+            index_together=set([('sports_ground', 'is_accepted', 'event_date')]),
+        ),
+        migrations.RunPython(create_pending_index, drop_pending_index),
+    ]
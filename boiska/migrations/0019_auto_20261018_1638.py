@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 14:38
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+OVERLAP_CONSTRAINT_NAME = 'boiska_reservation_no_overlap'
+
+
+def create_overlap_constraint(apps, schema_editor):
+    """
+    Accepted reservations of a sports ground must not overlap. Views check
+    it under a lock, the exclusion constraint makes the database refuse
+    overlapping rows written by any other code. Only PostgreSQL supports
+    exclusion constraints; btree_gist is needed to compare sports grounds
+    in a GiST index.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote_name = schema_editor.quote_name
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        'ALTER TABLE %s ADD CONSTRAINT %s EXCLUDE USING gist '
+        '(%s WITH =, tsrange(%s + %s, %s + %s) WITH &&) WHERE (%s)' % (
+            quote_name('boiska_reservation'),
+            quote_name(OVERLAP_CONSTRAINT_NAME),
+            quote_name('sports_ground_id'),
+            quote_name('event_date'),
+            quote_name('start_time'),
+            quote_name('event_date'),
+            quote_name('end_time'),
+            quote_name('is_accepted'),
+        )
+    )
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE %s DROP CONSTRAINT %s' % (
+        schema_editor.quote_name('boiska_reservation'),
+        schema_editor.quote_name(OVERLAP_CONSTRAINT_NAME),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0018_auto_20261018_1631'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_overlap_constraint, drop_overlap_constraint),
+    ]
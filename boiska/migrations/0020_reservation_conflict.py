@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 14:41
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0019_auto_20261018_1638'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='conflict',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Niesprawdzona'), (1, 'Wolna'), (2, 'Nachodzi na zaakceptowaną'), (3, 'Nachodzi na wcześniejszą oczekującą')], default=0, editable=False),
+        ),
+    ]
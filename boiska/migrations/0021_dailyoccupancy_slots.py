@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 14:43
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from boiska import slots
+
+
+def fill_slots(apps, schema_editor):
+    """
+    Compute bitmaps of existing occupancy rows from accepted reservations.
+    """
+    DailyOccupancy = apps.get_model('boiska', 'DailyOccupancy')
+    Reservation = apps.get_model('boiska', 'Reservation')
+    # every shard is migrated separately
+    database = schema_editor.connection.alias
+    bitmaps = {}
+    accepted = Reservation.objects.using(database).filter(is_accepted=True).values_list(
+        'sports_ground', 'event_date', 'start_time', 'end_time'
+    )
+    for sports_ground_id, event_date, start_time, end_time in accepted.iterator():
+        key = (sports_ground_id, event_date)
+        bitmaps[key] = bitmaps.get(key, 0) | slots.time_mask(start_time, end_time)
+    for occupancy in DailyOccupancy.objects.using(database).iterator():
+        bitmap = bitmaps.get((occupancy.sports_ground_id, occupancy.event_date), 0)
+        occupancy.slots = slots.to_bytes(bitmap)
+        occupancy.save(using=database, update_fields=['slots'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0020_reservation_conflict'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyoccupancy',
+            name='slots',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(fill_slots, migrations.RunPython.noop),
+    ]
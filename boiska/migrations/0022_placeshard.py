@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 15:02
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0021_dailyoccupancy_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceShard',
+            fields=[
+                ('place_name', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('database', models.CharField(max_length=30)),
+                ('read_only', models.BooleanField(default=False)),
+            ],
+        ),
+    ]
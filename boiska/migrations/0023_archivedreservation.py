@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 15:08
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0022_placeshard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReservation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('surname', models.CharField(max_length=40)),
+                ('event_date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('is_accepted', models.BooleanField(default=False)),
+                ('archived', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('sports_ground', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reservations', to='boiska.SportsGround')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='archivedreservation',
+            index_together=set([('sports_ground', 'event_date')]),
+        ),
+    ]
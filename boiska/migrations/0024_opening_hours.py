@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 15:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0023_archivedreservation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HoursException',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('opening_time', models.TimeField(blank=True, null=True)),
+                ('closing_time', models.TimeField(blank=True, null=True)),
+                ('description', models.CharField(blank=True, max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WeeklyHours',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Poniedziałek'), (1, 'Wtorek'), (2, 'Środa'), (3, 'Czwartek'), (4, 'Piątek'), (5, 'Sobota'), (6, 'Niedziela')])),
+                ('opening_time', models.TimeField(blank=True, null=True)),
+                ('closing_time', models.TimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='sportsground',
+            name='schedule',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='weeklyhours',
+            name='sports_ground',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_hours', to='boiska.SportsGround'),
+        ),
+        migrations.AddField(
+            model_name='hoursexception',
+            name='sports_ground',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hours_exceptions', to='boiska.SportsGround'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='weeklyhours',
+            unique_together=set([('sports_ground', 'weekday')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='hoursexception',
+            unique_together=set([('sports_ground', 'date')]),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 15:31
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0024_opening_hours'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dailyoccupancy',
+            name='open_minutes',
+        ),
+    ]
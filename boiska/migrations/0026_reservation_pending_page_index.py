@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 15:52
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0025_remove_dailyoccupancy_open_minutes'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='reservation',
+            index_together=set([('sports_ground', 'is_accepted', 'event_date'), ('is_accepted', 'event_date', 'start_time', 'id')]),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10.8 on 2026-10-18 15:56
+from __future__ import unicode_literals
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boiska', '0026_reservation_pending_page_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='place',
+            name='name',
+            field=models.CharField(max_length=40, primary_key=True, serialize=False, validators=[django.core.validators.RegexValidator(message='Name may contain only letters, numbers, underscores and spaces.', regex='[\\w ]+'), django.core.validators.RegexValidator(inverse_match=True, message='Name api is reserved.', regex='^api$')]),
+        ),
+    ]
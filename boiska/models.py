@@ -1,6 +1,18 @@
 from django.contrib.auth.models import User
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
+
+
+class PlaceQuerySet(models.QuerySet):
+    def touch(self):
+        """
+        Mark availability of places as changed.
+        """
+        return self.update(
+            revision=models.F('revision') + 1,
+            modified=timezone.now()
+        )
 
 
 class Place(models.Model):
@@ -15,7 +27,13 @@ class Place(models.Model):
             RegexValidator(
                 regex='[\w ]+',
                 message='Name may contain only letters, numbers, underscores and spaces.'
-            )
+            ),
+            # URLs of the API start with /api/
+            RegexValidator(
+                regex='^api$',
+                inverse_match=True,
+                message='Name api is reserved.'
+            ),
         ]
     )
     administrator = models.ForeignKey(
@@ -26,6 +44,30 @@ class Place(models.Model):
     phone_number = models.CharField(max_length=20, default=None)
     city = models.CharField(max_length=30)
     street = models.CharField(max_length=50)
+    # Changed whenever sports grounds or accepted reservations
+    # of the place change. Used in ETags of the API.
+    revision = models.PositiveIntegerField(default=0, editable=False)
+    modified = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = PlaceQuerySet.as_manager()
+
+    # changed only by PlaceQuerySet.touch()
+    TOUCHED_FIELDS = ('revision', 'modified')
+
+    def save(self, *args, **kwargs):
+        """
+        Saving a place which has been loaded before doesn't write revision
+        and modification time back, so changes made by touch() in the
+        meantime aren't lost.
+        """
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.TOUCHED_FIELDS
+            ]
+        super(Place, self).save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -60,6 +102,8 @@ class SportsGround(models.Model):
         null=True,
         default=None
     )
+    # WeeklyHours and HoursExceptions compiled by boiska.hours
+    schedule = models.TextField(blank=True, default='', editable=False)
     
     class Meta:
         unique_together = ('place', 'name_prefix', 'local_id')
@@ -92,6 +136,59 @@ class SportsGround(models.Model):
         return result
 
 
+class WeeklyHours(models.Model):
+    """
+    Opening hours of a SportsGround on a weekday, replacing its opening
+    and closing time. Empty hours mean that it is closed on that weekday.
+    """
+    WEEKDAY_CHOICES = (
+        (0, 'Poniedziałek'),
+        (1, 'Wtorek'),
+        (2, 'Środa'),
+        (3, 'Czwartek'),
+        (4, 'Piątek'),
+        (5, 'Sobota'),
+        (6, 'Niedziela'),
+    )
+
+    sports_ground = models.ForeignKey(
+        SportsGround,
+        on_delete=models.CASCADE,
+        related_name='weekly_hours'
+    )
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    opening_time = models.TimeField(blank=True, null=True)
+    closing_time = models.TimeField(blank=True, null=True)
+
+    class Meta:
+        unique_together = ('sports_ground', 'weekday')
+
+    def __str__(self):
+        return str(self.sports_ground) + ', ' + self.get_weekday_display()
+
+
+class HoursException(models.Model):
+    """
+    Opening hours of a SportsGround on a particular date, for example
+    a holiday. Empty hours mean that it is closed on that date.
+    """
+    sports_ground = models.ForeignKey(
+        SportsGround,
+        on_delete=models.CASCADE,
+        related_name='hours_exceptions'
+    )
+    date = models.DateField()
+    opening_time = models.TimeField(blank=True, null=True)
+    closing_time = models.TimeField(blank=True, null=True)
+    description = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        unique_together = ('sports_ground', 'date')
+
+    def __str__(self):
+        return str(self.sports_ground) + ', ' + str(self.date)
+
+
 class Reservation(models.Model):
     """
     Reservation of a specific SportsGround.
@@ -109,6 +206,33 @@ class Reservation(models.Model):
     start_time = models.TimeField()
     end_time = models.TimeField()
     is_accepted = models.BooleanField(blank=True, default=False)
+
+    # Pending reservations are classified against accepted ones
+    # whenever reservations of their day change, see boiska.conflicts.
+    UNCLASSIFIED = 0
+    FREE = 1
+    CONFLICTING = 2
+    SUPERSEDED = 3
+    CONFLICT_CHOICES = (
+        (UNCLASSIFIED, 'Niesprawdzona'),
+        (FREE, 'Wolna'),
+        (CONFLICTING, 'Nachodzi na zaakceptowaną'),
+        (SUPERSEDED, 'Nachodzi na wcześniejszą oczekującą'),
+    )
+    conflict = models.PositiveSmallIntegerField(
+        choices=CONFLICT_CHOICES,
+        default=UNCLASSIFIED,
+        editable=False
+    )
+    
+    class Meta:
+        # Day view, overlap checks and occupancy refresh filter reservations
+        # by sports ground, status and date. Pending list pages through
+        # reservations in the order of the second index.
+        index_together = [
+            ('sports_ground', 'is_accepted', 'event_date'),
+            ('is_accepted', 'event_date', 'start_time', 'id'),
+        ]
     
     ACCEPT = 1
     DELETE = 2
@@ -122,3 +246,72 @@ class Reservation(models.Model):
             + ' - ' + self.end_time.strftime('%H:%M'))
         when = str(self.event_date) + ', ' + event_time
         return str(self.sports_ground) + ', ' + when
+
+
+class ArchivedReservation(models.Model):
+    """
+    Reservation moved out of Reservation by boiska.archive: an accepted one
+    older than BOISKA_ARCHIVE_AFTER_DAYS, or a pending one whose day has
+    passed (expired). Occupancy of archived days stays in DailyOccupancy.
+    """
+    sports_ground = models.ForeignKey(
+        SportsGround,
+        on_delete=models.CASCADE,
+        related_name='archived_reservations'
+    )
+    email = models.EmailField()
+    surname = models.CharField(max_length=40)
+    event_date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    is_accepted = models.BooleanField(default=False)
+    archived = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        # reports and rebuilds of occupancy read archived days by date
+        index_together = [
+            ('sports_ground', 'event_date'),
+        ]
+
+    def __str__(self):
+        return str(self.sports_ground) + ', ' + str(self.event_date)
+
+
+class DailyOccupancy(models.Model):
+    """
+    Time reserved on a SportsGround during a particular day.
+    It is kept up to date when reservations are accepted, edited or deleted
+    so that availability calendar doesn't have to sum reservations.
+    """
+    sports_ground = models.ForeignKey(
+        SportsGround,
+        on_delete=models.CASCADE,
+        related_name='daily_occupancies'
+    )
+    event_date = models.DateField()
+    booked_minutes = models.PositiveIntegerField(default=0)
+    # Bitmap of reserved time slots, see boiska.slots.
+    slots = models.BinaryField(default=b'')
+
+    class Meta:
+        unique_together = ('sports_ground', 'event_date')
+
+    def __str__(self):
+        return (str(self.sports_ground) + ', ' + str(self.event_date) + ', '
+            + str(self.booked_minutes))
+
+
+class PlaceShard(models.Model):
+    """
+    Database holding a Place with its sports grounds and reservations,
+    when several databases are used, see boiska.shards. Places without
+    a PlaceShard are kept in the default database. The table itself is
+    always in the default database.
+    """
+    place_name = models.CharField(max_length=40, primary_key=True)
+    database = models.CharField(max_length=30)
+    # set while the place is being moved to another database
+    read_only = models.BooleanField(default=False)
+
+    def __str__(self):
+        return self.place_name + ' -> ' + self.database
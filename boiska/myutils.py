@@ -76,3 +76,16 @@ def create_sports_grounds(place, quantity=3):
             )
         )
     return new_sports_grounds
+
+
+class QueryBudgetTestMixin:
+    """
+    Mixin for test cases checking responses of boiska views against
+    query budgets from settings.BOISKA_QUERY_BUDGETS.
+    """
+
+    def assertWithinQueryBudget(self, response):
+        stats = response.query_stats
+        if stats.over_budget():
+            self.fail('%s executed %d queries, budget is %d' % (
+                stats.view_name, stats.count, stats.budget))
@@ -0,0 +1,48 @@
+"""
+Local stand-in for replication of the database: a read replica which is
+an SQLite file refreshed with consistent copies of the default database.
+"""
+
+import os
+import sqlite3
+import tempfile
+
+
+def copy_database(source, target):
+    """
+    Copy SQLite database from file source to file target while other
+    processes may write to the source. Uses the online backup API if Python
+    has it (3.7+) and VACUUM INTO (SQLite 3.27+) otherwise.
+    """
+    source_connection = sqlite3.connect(source)
+    try:
+        if hasattr(source_connection, 'backup'):
+            target_connection = sqlite3.connect(target)
+            try:
+                source_connection.backup(target_connection)
+            finally:
+                target_connection.close()
+        else:
+            vacuum_into(source_connection, target)
+    finally:
+        source_connection.close()
+
+
+def vacuum_into(source_connection, target):
+    # write a new file next to the target and swap it in at once, so that
+    # readers of the replica never see a half written copy
+    handle, copy = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(target)),
+        suffix='.sqlite3'
+    )
+    os.close(handle)
+    try:
+        source_connection.execute('VACUUM INTO ?', [copy])
+        os.replace(copy, target)
+    except BaseException:
+        os.remove(copy)
+        raise
+    # the log of the previous copy doesn't belong to the new one
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(target + suffix):
+            os.remove(target + suffix)
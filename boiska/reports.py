@@ -0,0 +1,213 @@
+"""
+Utilization reports of sports grounds of a place.
+
+Accepted reservations are counted by the database and read with one
+values_list() query into NumPy arrays (one more for periods reaching archived
+days, see boiska.archive), then reserved minutes are summed per
+sports ground, weekday and hour of day with vectorized operations.
+NumPy is optional: without it reports are unavailable and NUMPY_AVAILABLE
+is False.
+"""
+
+import datetime
+import itertools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from django.db.models import Count
+from django.db.models.functions import ExtractWeekDay
+
+from . import archive, hours
+from .models import ArchivedReservation, Reservation
+from .slots import to_minutes
+
+
+NUMPY_AVAILABLE = np is not None
+
+WEEKDAYS = (
+    'Poniedziałek', 'Wtorek', 'Środa', 'Czwartek', 'Piątek', 'Sobota', 'Niedziela',
+)
+HOURS = 24
+
+
+def default_period(sports_grounds, today=None):
+    """
+    Season of the sports grounds if all of them have one, the last year
+    otherwise.
+    """
+    starts = [sports_ground.start_season_date for sports_ground in sports_grounds]
+    ends = [sports_ground.end_season_date for sports_ground in sports_grounds]
+    if starts and None not in starts and None not in ends:
+        return min(starts), max(ends)
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=364), today
+
+
+def weekday_counts(date_from, date_to):
+    """
+    Number of Mondays, Tuesdays, ... between two dates inclusive.
+    """
+    if date_to < date_from:
+        return np.zeros(7)
+    ordinals = np.arange(date_from.toordinal(), date_to.toordinal() + 1)
+    # ordinal 1 is Monday
+    return np.bincount((ordinals - 1) % 7, minlength=7)
+
+
+def minutes_per_hour(starts, ends):
+    """
+    Minutes of every hour of the day covered by periods from starts to ends
+    (arrays of minutes since midnight). Returns array of shape (n, 24).
+    """
+    hour_starts = np.arange(HOURS) * 60
+    covered = (np.minimum(ends[:, None], hour_starts + 60)
+        - np.maximum(starts[:, None], hour_starts))
+    return np.clip(covered, 0, None)
+
+
+class UtilizationReport:
+    """
+    Reserved and open minutes of sports grounds of a place per sports ground,
+    weekday and hour of day between date_from and date_to. Sports grounds
+    are open only during their season, if it is set.
+    """
+
+    def __init__(self, place, date_from, date_to):
+        self.place = place
+        self.date_from = date_from
+        self.date_to = date_to
+        self.sports_grounds = list(place.sports_grounds.all())
+        shape = (len(self.sports_grounds), 7, HOURS)
+        self.booked = np.zeros(shape)
+        self.open = np.zeros(shape)
+        self.count_open_minutes()
+        self.count_booked_minutes()
+
+    def count_open_minutes(self):
+        """
+        Opening hours of every day of the period come from boiska.hours,
+        so seasons, weekly hours and exceptions are taken into account.
+        """
+        dates = [
+            self.date_from + datetime.timedelta(days=day)
+            for day in range((self.date_to - self.date_from).days + 1)
+        ]
+        weekdays = np.array([date.weekday() for date in dates], dtype=int)
+        for index, sports_ground in enumerate(self.sports_grounds):
+            opening_hours = hours.for_sports_ground(sports_ground)
+            day_hours = [opening_hours.on(date) for date in dates]
+            open_days = [day for day, period in enumerate(day_hours) if period]
+            if not open_days:
+                continue
+            covered = minutes_per_hour(
+                np.array([day_hours[day][0] for day in open_days]),
+                np.array([day_hours[day][1] for day in open_days])
+            )
+            np.add.at(self.open[index], weekdays[open_days], covered)
+
+    def count_booked_minutes(self):
+        """
+        The database counts reservations with the same sports ground, weekday
+        and hours, so the number of rows doesn't grow with the length
+        of the period. Django numbers weekdays from Sunday = 1.
+        """
+        models = [Reservation]
+        if self.date_from < archive.archived_before():
+            models.append(ArchivedReservation)
+        rows = itertools.chain.from_iterable(
+            model.objects.filter(
+                sports_ground__in=[sports_ground.id for sports_ground in self.sports_grounds],
+                event_date__range=(self.date_from, self.date_to),
+                is_accepted=True
+            ).annotate(
+                weekday=ExtractWeekDay('event_date')
+            ).values(
+                'sports_ground', 'weekday', 'start_time', 'end_time'
+            ).annotate(
+                reservations=Count('id')
+            ).values_list(
+                'sports_ground', 'weekday', 'start_time', 'end_time', 'reservations'
+            )
+            for model in models
+        )
+        position = {
+            sports_ground.id: index
+            for index, sports_ground in enumerate(self.sports_grounds)
+        }
+        columns = [[], [], [], [], []]
+        for sports_ground_id, weekday, start_time, end_time, reservations in rows:
+            columns[0].append(position[sports_ground_id])
+            columns[1].append(weekday)
+            columns[2].append(to_minutes(start_time))
+            columns[3].append(to_minutes(end_time))
+            columns[4].append(reservations)
+        if not columns[0]:
+            return
+        positions, weekdays, starts, ends, counts = map(np.array, columns)
+        cells = positions * 7 + (weekdays + 5) % 7
+        covered = minutes_per_hour(starts, ends) * counts[:, None]
+        booked = self.booked.reshape(-1, HOURS)
+        for hour in range(HOURS):
+            booked[:, hour] = np.bincount(
+                cells,
+                weights=covered[:, hour],
+                minlength=booked.shape[0]
+            )
+
+    @staticmethod
+    def ratio(booked, available):
+        return np.divide(
+            booked,
+            available,
+            out=np.zeros_like(booked),
+            where=available > 0
+        )
+
+    def hours(self):
+        """
+        Hours during which any of sports grounds is open.
+        """
+        return [hour for hour in range(HOURS) if self.open[:, :, hour].any()]
+
+    def heatmap(self):
+        """
+        Utilization of all sports grounds as rows of weekdays with
+        a ratio for every open hour.
+        """
+        utilization = self.ratio(self.booked.sum(axis=0), self.open.sum(axis=0))
+        hours = self.hours()
+        return [
+            (weekday, [utilization[index, hour] for hour in hours])
+            for index, weekday in enumerate(WEEKDAYS)
+        ]
+
+    def by_sports_ground(self):
+        booked = self.booked.sum(axis=(1, 2))
+        available = self.open.sum(axis=(1, 2))
+        utilization = self.ratio(booked, available)
+        return [
+            (sports_ground, booked[index], available[index], utilization[index])
+            for index, sports_ground in enumerate(self.sports_grounds)
+        ]
+
+    def csv_rows(self):
+        """
+        Header and a row for every sports ground, weekday and open hour.
+        """
+        yield ('sports_ground', 'weekday', 'hour', 'booked_minutes',
+            'open_minutes', 'utilization')
+        utilization = self.ratio(self.booked, self.open)
+        for index, sports_ground in enumerate(self.sports_grounds):
+            for weekday in range(7):
+                for hour in np.flatnonzero(self.open[index, weekday]):
+                    yield (
+                        sports_ground.local_name(),
+                        WEEKDAYS[weekday],
+                        hour,
+                        int(self.booked[index, weekday, hour]),
+                        int(self.open[index, weekday, hour]),
+                        round(float(utilization[index, weekday, hour]), 4),
+                    )
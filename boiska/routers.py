@@ -0,0 +1,124 @@
+"""
+Routing of queries to shards and to a read replica.
+
+ShardRouter sends all queries of boiska models to the database of the place
+which the current thread works on, see boiska.shards and using_database().
+Places in the default database are left to ReplicaRouter.
+
+Models of boiska are read from the database alias BOISKA_READ_REPLICA only
+while ReplicaMiddleware allows it: during GET and HEAD requests to views
+listed in BOISKA_REPLICA_VIEWS, outside transactions and unless the session
+has changed something in the last BOISKA_REPLICA_STICKY_SECONDS seconds.
+Everything else uses the default database: writes, the administration
+panel, accepting reservations (reads and writes in one transaction),
+and other applications, for example sessions.
+"""
+
+from contextlib import contextmanager
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+state = threading.local()
+
+
+def replica_alias():
+    return getattr(settings, 'BOISKA_READ_REPLICA', None)
+
+
+def replica_allowed():
+    return getattr(state, 'replica_allowed', False)
+
+
+def current_database():
+    return getattr(state, 'database', None)
+
+
+def place_database():
+    """
+    Alias of the database of the place which the current thread works on,
+    for transactions and locks around writes of boiska models.
+    """
+    return current_database() or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def using_database(alias):
+    """
+    Send queries of boiska models of the current thread to database alias
+    inside the block.
+    """
+    previous = current_database()
+    state.database = alias
+    try:
+        yield
+    finally:
+        state.database = previous
+
+
+@contextmanager
+def reading_from_replica():
+    """
+    Let reads of the current thread go to the replica inside the block.
+    """
+    previous = replica_allowed()
+    state.replica_allowed = True
+    try:
+        yield
+    finally:
+        state.replica_allowed = previous
+
+
+class ShardRouter:
+
+    def database_for(self, model):
+        if model._meta.app_label != 'boiska':
+            return None
+        if model._meta.model_name == 'placeshard':
+            # never read from the replica, it may not know about a move yet
+            return DEFAULT_DB_ALIAS
+        database = current_database()
+        if database == DEFAULT_DB_ALIAS:
+            return None
+        return database
+
+    def db_for_read(self, model, **hints):
+        return self.database_for(model)
+
+    def db_for_write(self, model, **hints):
+        return self.database_for(model)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if model_name == 'placeshard':
+            return db == DEFAULT_DB_ALIAS
+        return None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if (alias is None or model._meta.app_label != 'boiska'
+                or not replica_allowed()
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica is a copy of the default database, relations
+        # with shards are left to other routers and Django's default
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets tables together with data from the default database
+        if db == replica_alias():
+            return False
+        return None
@@ -0,0 +1,102 @@
+import datetime
+
+from . import hours, slots
+from .models import DailyOccupancy, SportsGround
+
+
+def free_periods(opening, closing, busy, min_length):
+    """
+    Gaps of at least min_length minutes between opening and closing
+    (in minutes since midnight) not covered by busy periods.
+    Busy periods must be sorted by start.
+    """
+    free_from = opening
+    for start, end in busy:
+        if start - free_from >= min_length:
+            yield free_from, start
+        free_from = max(free_from, end)
+        if free_from >= closing:
+            return
+    if closing - free_from >= min_length:
+        yield free_from, closing
+
+
+def free_slots(date_from, date_to=None, city=None, start_time=None,
+        end_time=None, min_duration=datetime.timedelta(hours=1),
+        database=None, excluded_places=()):
+    """
+    Free time on sports grounds of all places (or places in a city)
+    between date_from and date_to inclusive, limited to hours between
+    start_time and end_time and at least min_duration long.
+    Yields dicts ordered by date, place and sports ground.
+
+    Sports grounds and their bitmaps of reserved slots are fetched with
+    two queries no matter how many places there are; gaps are found
+    in Python. Opening hours of every day come from boiska.hours.
+    Reserved time is rounded to whole slots, see boiska.slots.
+    database and excluded_places select a shard, see boiska.shards.
+    """
+    if date_to is None:
+        date_to = date_from
+    min_length = max(int(min_duration.total_seconds() // 60), 1)
+    sports_grounds = SportsGround.objects.using(database).order_by(
+        'place', 'name_prefix', 'local_id'
+    )
+    occupancies = DailyOccupancy.objects.using(database).filter(
+        event_date__range=(date_from, date_to)
+    )
+    if excluded_places:
+        sports_grounds = sports_grounds.exclude(place__in=excluded_places)
+        occupancies = occupancies.exclude(
+            sports_ground__place__in=excluded_places
+        )
+    if city:
+        sports_grounds = sports_grounds.filter(place__city__iexact=city)
+        occupancies = occupancies.filter(
+            sports_ground__place__city__iexact=city
+        )
+
+    sports_grounds = [
+        (sports_ground_id, place_name, name_prefix + ' ' + str(local_id),
+            hours.opening_hours(*hours_fields))
+        for sports_ground_id, place_name, name_prefix, local_id, *hours_fields
+        in sports_grounds.values_list(
+            'id', 'place', 'name_prefix', 'local_id', *hours.FIELDS
+        )
+    ]
+    earliest = slots.to_minutes(start_time) if start_time else 0
+    latest = slots.to_minutes(end_time) if end_time else 24 * 60
+    busy = {
+        (sports_ground_id, event_date): list(
+            slots.busy_periods(slots.from_bytes(bitmap))
+        )
+        for sports_ground_id, event_date, bitmap in occupancies.values_list(
+            'sports_ground', 'event_date', 'slots')
+    }
+
+    event_date = date_from
+    while event_date <= date_to:
+        for sports_ground_id, place_name, name, opening_hours in sports_grounds:
+            day_hours = opening_hours.on(event_date)
+            if day_hours is None:
+                continue
+            opening = max(day_hours[0], earliest)
+            closing = min(day_hours[1], latest)
+            if opening >= closing:
+                continue
+            periods = free_periods(
+                opening,
+                closing,
+                busy.get((sports_ground_id, event_date), ()),
+                min_length
+            )
+            for start, end in periods:
+                yield {
+                    'place': place_name,
+                    'sports_ground': sports_ground_id,
+                    'sports_ground_name': name,
+                    'date': event_date,
+                    'start_time': hours.to_time(start),
+                    'end_time': hours.to_time(end),
+                }
+        event_date += datetime.timedelta(days=1)
@@ -0,0 +1,254 @@
+"""
+Sharding of places between several databases.
+
+Every place is kept together with its sports grounds, reservations
+and occupancy in one of the databases listed in settings.BOISKA_SHARDS.
+Places without an entry in the directory (PlaceShard) are in the default
+database; the directory is cached in BOISKA_SHARD_CACHE. Views of a place
+run inside using_place() (see ShardMiddleware), so their queries go
+to the database of the place. Views of all places query every database
+in use and merge the results.
+
+The cached directory expires after BOISKA_SHARD_DIRECTORY_TIMEOUT seconds,
+so processes with their own caches see changes made by other processes
+within that time. move_place() moves a place to another database while
+the site is running. The place is read only during the move: it is copied,
+the directory is switched to the copy and only then the old rows are
+deleted. Before the copy and before the deletion it waits until every
+process has read the changed directory.
+"""
+
+import heapq
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from . import routers, search
+from .models import (ArchivedReservation, DailyOccupancy, HoursException, Place,
+    PlaceShard, Reservation, SportsGround, WeeklyHours)
+
+
+DIRECTORY_KEY = 'boiska:shards:directory'
+
+# rows of sports grounds, moved together with them
+SPORTS_GROUND_ROWS = (Reservation, ArchivedReservation, DailyOccupancy,
+    WeeklyHours, HoursException)
+
+
+def databases():
+    return list(getattr(settings, 'BOISKA_SHARDS', [DEFAULT_DB_ALIAS]))
+
+
+def enabled():
+    return len(databases()) > 1
+
+
+def get_cache():
+    return caches[settings.BOISKA_SHARD_CACHE]
+
+
+def directory_timeout():
+    return settings.BOISKA_SHARD_DIRECTORY_TIMEOUT
+
+
+def load_directory():
+    return {
+        place_name: (database, read_only)
+        for place_name, database, read_only in PlaceShard.objects.values_list(
+            'place_name', 'database', 'read_only')
+    }
+
+
+def directory():
+    """
+    {place name: (database, read only)} of places with a PlaceShard.
+    """
+    if not enabled():
+        return {}
+    entries = get_cache().get(DIRECTORY_KEY)
+    if entries is None:
+        entries = load_directory()
+        get_cache().set(DIRECTORY_KEY, entries, directory_timeout())
+    return entries
+
+
+def set_directory_entry(place_name, database, read_only=False):
+    PlaceShard.objects.update_or_create(
+        place_name=place_name,
+        defaults={'database': database, 'read_only': read_only}
+    )
+    get_cache().set(DIRECTORY_KEY, load_directory(), directory_timeout())
+
+
+def database_for_place(place_name):
+    return directory().get(place_name, (DEFAULT_DB_ALIAS, False))[0]
+
+
+def is_read_only(place_name):
+    return directory().get(place_name, (DEFAULT_DB_ALIAS, False))[1]
+
+
+def using_place(place_name):
+    """
+    Send queries of the current thread to the database of a place
+    inside the block.
+    """
+    return routers.using_database(database_for_place(place_name))
+
+
+def databases_in_use():
+    used = {DEFAULT_DB_ALIAS}
+    used.update(database for database, _ in directory().values())
+    return [database for database in databases() if database in used]
+
+
+def stray_places(database):
+    """
+    Names of places which may have rows in database although they belong
+    to another one: copies being made or left behind by a failed move.
+    """
+    return sorted(
+        place_name
+        for place_name, (place_database, _) in directory().items()
+        if place_database != database
+    )
+
+
+def all_places():
+    """
+    Places from all databases, ordered by name.
+    """
+    places = []
+    for database in databases_in_use():
+        # the default database is left to the routers, see free_slots()
+        places += Place.objects.using(
+            None if database == DEFAULT_DB_ALIAS else database
+        ).exclude(
+            name__in=stray_places(database)
+        )
+    return sorted(places, key=lambda place: place.name)
+
+
+def free_slots(**arguments):
+    """
+    search.free_slots() of places in all databases, in the same order.
+    """
+    used = databases_in_use()
+    if used == [DEFAULT_DB_ALIAS]:
+        return search.free_slots(**arguments)
+    return heapq.merge(
+        *[
+            search.free_slots(
+                # the default database is left to the routers,
+                # it may be read from the replica
+                database=None if database == DEFAULT_DB_ALIAS else database,
+                excluded_places=stray_places(database),
+                **arguments
+            )
+            for database in used
+        ],
+        key=lambda slot: (slot['date'], slot['place'])
+    )
+
+
+def move_place(place_name, target, chunk_size=1000, grace=5):
+    """
+    Move a place with its sports grounds, reservations and occupancy
+    to database target. Requests changing the place are refused from
+    the start of the move, once processes have read the directory;
+    grace seconds are given to changes which have already started.
+    Reads are served by the old database until the copy is complete.
+    Sports grounds and reservations get new ids.
+    Returns numbers of copied rows by model name.
+    """
+    if target not in databases():
+        raise ValueError('Unknown database %s.' % target)
+    source = database_for_place(place_name)
+    if source == target:
+        raise ValueError('Place %s is already in %s.' % (place_name, target))
+    place = Place.objects.using(source).get(name=place_name)
+    set_directory_entry(place_name, source, read_only=True)
+    try:
+        time.sleep(directory_timeout() + grace)
+        with routers.using_database(target), transaction.atomic(using=target):
+            copied = copy_place(place, source, target, chunk_size)
+    except BaseException:
+        set_directory_entry(place_name, source)
+        raise
+    set_directory_entry(place_name, target)
+    # processes which haven't read the directory yet still read the source
+    time.sleep(directory_timeout())
+    delete_place(place_name, source)
+    with routers.using_database(target):
+        Place.objects.filter(name=place_name).touch()
+    return copied
+
+
+def copy_place(place, source, target, chunk_size):
+    # rows left by an earlier failed move
+    delete_place(place.name, target)
+    place.save(using=target, force_insert=True)
+    sports_grounds_ids = {}
+    for sports_ground in SportsGround.objects.using(source).filter(
+            place=place.name).order_by('id'):
+        source_id = sports_ground.id
+        sports_ground.id = None
+        sports_ground.save(using=target, force_insert=True)
+        sports_grounds_ids[source_id] = sports_ground.id
+    copied = {'sports_grounds': len(sports_grounds_ids)}
+    for model in SPORTS_GROUND_ROWS:
+        copied[model._meta.model_name] = copy_rows(
+            model, source, target, sports_grounds_ids, chunk_size
+        )
+        count = model.objects.using(target).filter(
+            sports_ground__in=sports_grounds_ids.values()
+        ).count()
+        if count != copied[model._meta.model_name]:
+            raise RuntimeError('Copied %d rows of %s, found %d.' % (
+                copied[model._meta.model_name], model._meta.model_name, count))
+    return copied
+
+
+def copy_rows(model, source, target, sports_grounds_ids, chunk_size):
+    """
+    Copy rows of sports grounds in chunks of consecutive ids.
+    bulk_create() sends no signals, occupancy and compiled opening hours
+    are copied as they are.
+    """
+    rows = model.objects.using(source).filter(
+        sports_ground__in=list(sports_grounds_ids)
+    ).order_by('id')
+    last_id = 0
+    copied = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return copied
+        last_id = chunk[-1].id
+        for row in chunk:
+            row.id = None
+            row.sports_ground_id = sports_grounds_ids[row.sports_ground_id]
+        model.objects.using(target).bulk_create(chunk)
+        copied += len(chunk)
+
+
+def delete_place(place_name, database):
+    """
+    Delete a place with its rows from database. Plain DELETE statements
+    are used, deleting objects one by one would send a signal for every
+    reservation.
+    """
+    connection = connections[database]
+    quote = connection.ops.quote_name
+    sports_grounds = 'SELECT id FROM %s WHERE %s = %%s' % (
+        quote(SportsGround._meta.db_table), quote('place_id'))
+    with transaction.atomic(using=database), connection.cursor() as cursor:
+        for model in SPORTS_GROUND_ROWS:
+            cursor.execute('DELETE FROM %s WHERE %s IN (%s)' % (
+                quote(model._meta.db_table), quote('sports_ground_id'),
+                sports_grounds), [place_name])
+        for model, column in ((SportsGround, 'place_id'), (Place, 'name')):
+            cursor.execute('DELETE FROM %s WHERE %s = %%s' % (
+                quote(model._meta.db_table), quote(column)), [place_name])
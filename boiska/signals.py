@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import conflicts
+from .availability import occupancy_key, reservations_changed
+from .hours import update_schedule
+from .models import HoursException, Place, Reservation, SportsGround, WeeklyHours
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_saved(sender, instance, created, **kwargs):
+    conflicts.reclassify([instance])
+    if created and not instance.is_accepted:
+        return
+    reservations_changed([occupancy_key(instance)])
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, **kwargs):
+    conflicts.reclassify([instance])
+    if instance.is_accepted:
+        reservations_changed([occupancy_key(instance)])
+
+
+@receiver(post_save, sender=SportsGround)
+def update_opening_hours(sender, instance, created, **kwargs):
+    if not created:
+        # the instance may have been loaded before its rules changed
+        update_schedule(instance)
+
+
+@receiver(post_save, sender=SportsGround)
+@receiver(post_delete, sender=SportsGround)
+def sports_grounds_changed(sender, instance, **kwargs):
+    Place.objects.filter(name=instance.place_id).touch()
+
+
+@receiver(post_save, sender=WeeklyHours)
+@receiver(post_delete, sender=WeeklyHours)
+@receiver(post_save, sender=HoursException)
+@receiver(post_delete, sender=HoursException)
+def opening_hours_changed(sender, instance, **kwargs):
+    sports_ground = instance.sports_ground
+    update_schedule(sports_ground)
+    Place.objects.filter(name=sports_ground.place_id).touch()
@@ -0,0 +1,63 @@
+"""
+Occupancy of a sports ground during a day as a bitmap of time slots.
+
+A day is divided into slots of settings.BOISKA_SLOT_MINUTES minutes and bit
+number i of the bitmap is set when anything is reserved during slot i.
+Reservations not aligned to slots occupy all slots they touch, so a bitmap
+may show a little more busy time than there is, never less. Bitmaps are
+Python ints in memory and little-endian bytes in DailyOccupancy.slots.
+"""
+
+from django.conf import settings
+
+
+def slot_minutes():
+    return settings.BOISKA_SLOT_MINUTES
+
+
+def slots_per_day():
+    return -(-24 * 60 // slot_minutes())
+
+
+def to_minutes(time):
+    return time.hour * 60 + time.minute
+
+
+def mask(start, end):
+    """
+    Bitmap of slots touched by period from start to end, given in minutes
+    since midnight.
+    """
+    first = start // slot_minutes()
+    last = -(-end // slot_minutes())
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def time_mask(start_time, end_time):
+    return mask(to_minutes(start_time), to_minutes(end_time))
+
+
+def busy_periods(bitmap):
+    """
+    Yield (start, end) minutes of runs of busy slots in order of time.
+    """
+    offset = 0
+    while bitmap:
+        # skip free slots, then measure the run of busy ones
+        free_slots = (bitmap & -bitmap).bit_length() - 1
+        bitmap >>= free_slots
+        offset += free_slots
+        busy_slots = (~bitmap & (bitmap + 1)).bit_length() - 1
+        bitmap >>= busy_slots
+        yield offset * slot_minutes(), (offset + busy_slots) * slot_minutes()
+        offset += busy_slots
+
+
+def to_bytes(bitmap):
+    return bitmap.to_bytes(-(-slots_per_day() // 8), 'little')
+
+
+def from_bytes(data):
+    return int.from_bytes(bytes(data or b''), 'little')
@@ -0,0 +1,52 @@
+"""
+Tuning of SQLite connections.
+
+Every new SQLite connection runs PRAGMAs from settings.BOISKA_SQLITE_PRAGMAS.
+They are executed on the DB-API connection, so they don't show up in query
+logs and query budgets of requests which happen to open a connection.
+journal_mode is stored in the database file, the others last as long
+as the connection.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(str(value)):
+            raise ImproperlyConfigured(
+                'Invalid SQLite PRAGMA %s = %s.' % (name, value)
+            )
+        statements.append('PRAGMA %s = %s' % (name, value))
+    return statements
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    Receiver of the connection_created signal.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'BOISKA_SQLITE_PRAGMAS', {})
+    for statement in pragma_statements(pragmas):
+        connection.connection.execute(statement)
+
+
+def current_pragmas(connection, names):
+    """
+    Values of PRAGMAs of a connection, for checks and benchmarks.
+    """
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute('PRAGMA %s' % name)
+            values[name] = cursor.fetchone()[0]
+    return values
@@ -8,7 +8,14 @@ def sort_by(query_set, order):
 
 @register.filter
 def filter_day(query_set, my_date):
-    date_obj = datetime.datetime.strptime(my_date, "%Y/%m/%d").date()
+    """
+    Fallback for templates without a precomputed timeline.
+    PlaceDayView passes reservations already filtered by day.
+    """
+    if isinstance(my_date, datetime.date):
+        date_obj = my_date
+    else:
+        date_obj = datetime.datetime.strptime(my_date, "%Y/%m/%d").date()
     return query_set.filter(event_date=date_obj)
 
 @register.filter
@@ -0,0 +1,78 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from io import StringIO
+import datetime
+import unittest
+
+from boiska import archive, availability, calendar_cache, reports
+from boiska.models import ArchivedReservation, DailyOccupancy, Place, Reservation
+from boiska.myutils import create_place, create_reservations, create_sports_ground
+
+TODAY = datetime.date(2016, 9, 20)
+
+
+@override_settings(BOISKA_ARCHIVE_AFTER_DAYS=10)
+class ArchiveTest(TestCase):
+
+    def setUp(self):
+        calendar_cache.clear()
+        self.place = create_place()
+        self.sports_ground = create_sports_ground(self.place)
+        # archived: older than 10 days
+        self.old_accepted = self.create_accepted(datetime.date(2016, 9, 5))
+        # kept: within the retention window
+        self.recent_accepted = self.create_accepted(datetime.date(2016, 9, 15))
+        # expired: pending and in the past
+        create_reservations(self.sports_ground, quantity=3, date=datetime.date(2016, 9, 5))
+        create_reservations(self.sports_ground, quantity=2, date=datetime.date(2016, 9, 19))
+        # kept: pending for today and later
+        create_reservations(self.sports_ground, quantity=2, date=TODAY)
+
+    def create_accepted(self, event_date):
+        return Reservation.objects.create(
+            sports_ground=self.sports_ground,
+            email='mail@site.com',
+            surname='Surname',
+            event_date=event_date,
+            start_time=datetime.time(10),
+            end_time=datetime.time(12),
+            is_accepted=True
+        )
+
+    def test_old_and_expired_reservations_are_archived(self):
+        archived, expired = archive.archive_reservations(today=TODAY, batch_size=2)
+        self.assertEqual((archived, expired), (1, 5))
+        self.assertEqual(
+            sorted(Reservation.objects.values_list('event_date', 'is_accepted')),
+            [(datetime.date(2016, 9, 15), True), (TODAY, False), (TODAY, False)]
+        )
+        self.assertEqual(ArchivedReservation.objects.filter(is_accepted=True).count(), 1)
+        self.assertEqual(ArchivedReservation.objects.filter(is_accepted=False).count(), 5)
+        # the next run has nothing to do
+        self.assertEqual(archive.archive_reservations(today=TODAY), (0, 0))
+
+    def test_occupancy_of_archived_days_is_kept(self):
+        revision = Place.objects.get().revision
+        calendar = availability.month_availability(self.place, 2016, 9)
+        archive.archive_reservations(today=TODAY)
+        self.assertEqual(DailyOccupancy.objects.count(), 2)
+        self.assertGreater(Place.objects.get().revision, revision)
+        self.assertEqual(availability.month_availability(self.place, 2016, 9), calendar)
+        availability.rebuild_occupancy()
+        occupancy = DailyOccupancy.objects.get(event_date=datetime.date(2016, 9, 5))
+        self.assertEqual(occupancy.booked_minutes, 120)
+
+    @unittest.skipIf(not reports.NUMPY_AVAILABLE, 'NumPy is not installed')
+    def test_reports_count_archived_reservations(self):
+        archive.archive_reservations(today=TODAY)
+        report = reports.UtilizationReport(
+            self.place, datetime.date(2016, 9, 1), datetime.date(2016, 9, 30))
+        self.assertEqual(report.booked.sum(), 2 * 120)
+
+    def test_command(self):
+        output = StringIO()
+        call_command('archive_reservations', stdout=output)
+        # all test reservations are in the past
+        self.assertEqual(output.getvalue(), 'Archived 2 reservations, expired 7.\n')
+        self.assertFalse(Reservation.objects.exists())
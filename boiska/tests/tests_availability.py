@@ -0,0 +1,76 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+import datetime
+from io import StringIO
+
+from boiska import slots
+from boiska.models import DailyOccupancy, Reservation
+from boiska.myutils import (create_place, create_sports_ground,
+    create_sports_grounds, create_reservation)
+
+
+class DailyOccupancyTest(TestCase):
+
+    def setUp(self):
+        self.place = create_place()
+        self.sports_ground = create_sports_ground(self.place)
+        self.event_date = datetime.date(2016, 9, 23)
+        self.reservation = self.sports_ground.reservations.create(
+            start_time=datetime.time(10),
+            end_time=datetime.time(11, 30),
+            event_date=self.event_date,
+            email='poprawny@strona.pl',
+            surname='Testowy',
+        )
+        self.admin_url = '/' + self.place.name + '/admin'
+
+    def accept(self, reservation):
+        self.client.post(self.admin_url, {
+            'action': Reservation.ACCEPT,
+            'reservations': [reservation.id],
+        })
+
+    def test_pending_reservation_is_not_counted(self):
+        self.assertFalse(DailyOccupancy.objects.exists())
+
+    def test_accepted_reservation_is_counted(self):
+        self.accept(self.reservation)
+        occupancy = DailyOccupancy.objects.get()
+        self.assertEqual(occupancy.sports_ground, self.sports_ground)
+        self.assertEqual(occupancy.event_date, self.event_date)
+        self.assertEqual(occupancy.booked_minutes, 90)
+
+    def test_reserved_slots_are_stored(self):
+        self.accept(self.reservation)
+        bitmap = slots.from_bytes(DailyOccupancy.objects.get().slots)
+        self.assertEqual(
+            list(slots.busy_periods(bitmap)),
+            [(10 * 60, 11 * 60 + 30)]
+        )
+
+    def test_deleted_reservation_is_not_counted(self):
+        self.accept(self.reservation)
+        Reservation.objects.get(id=self.reservation.id).delete()
+        self.assertFalse(DailyOccupancy.objects.exists())
+
+    def test_edited_reservation_is_moved_to_another_sports_ground(self):
+        self.accept(self.reservation)
+        other_sports_ground = create_sports_ground(self.place)
+        url = self.admin_url + '/edit_reservation/' + str(self.reservation.id)
+        self.client.post(url, {
+            'sports_ground': other_sports_ground.pk,
+            'start_time': '10:00',
+            'end_time': '12:00',
+            'is_accepted': True,
+        })
+        occupancy = DailyOccupancy.objects.get()
+        self.assertEqual(occupancy.sports_ground, other_sports_ground)
+        self.assertEqual(occupancy.booked_minutes, 120)
+
+    def test_rebuild_occupancy_command(self):
+        for sports_ground in create_sports_grounds(self.place):
+            reservation = create_reservation(sports_ground, date=self.event_date)
+            Reservation.objects.filter(id=reservation.id).update(is_accepted=True)
+        call_command('rebuild_occupancy', stdout=StringIO())
+        self.assertEqual(DailyOccupancy.objects.count(), 3)
@@ -0,0 +1,68 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from io import StringIO
+
+from boiska.availability import rebuild_occupancy
+from boiska.conflicts import classify_all
+from boiska.models import DailyOccupancy, Place, Reservation, SportsGround
+
+
+class GenerateReservationsCommandTest(TestCase):
+
+    def generate(self, **options):
+        arguments = {
+            'start_date': '2016-09-01',
+            'end_date': '2016-09-07',
+            'places': 2,
+            'sports_grounds': 3,
+            'seed': 7,
+            'stdout': StringIO(),
+        }
+        arguments.update(options)
+        call_command('generate_reservations', **arguments)
+
+    def test_places_and_sports_grounds_are_created(self):
+        self.generate()
+        self.assertEqual(Place.objects.count(), 2)
+        self.assertEqual(SportsGround.objects.count(), 6)
+
+    def test_reservations_fit_in_opening_hours(self):
+        self.generate(density_scale=2)
+        self.assertTrue(Reservation.objects.exists())
+        for reservation in Reservation.objects.select_related('sports_ground'):
+            sports_ground = reservation.sports_ground
+            self.assertGreaterEqual(reservation.start_time, sports_ground.opening_time)
+            self.assertLessEqual(reservation.end_time, sports_ground.closing_time)
+            self.assertLess(reservation.start_time, reservation.end_time)
+
+    def test_same_seed_gives_same_reservations(self):
+        self.generate()
+        reservations = Reservation.objects.values_list(
+            'sports_ground', 'event_date', 'start_time', 'end_time', 'surname'
+        ).order_by('sports_ground', 'event_date', 'start_time')
+        first_reservations = list(reservations)
+        Reservation.objects.all().delete()
+        self.generate(places=0)
+        self.assertEqual(list(reservations), first_reservations)
+
+    def test_occupancy_is_rebuilt(self):
+        self.generate(pending_ratio=0)
+        self.assertTrue(DailyOccupancy.objects.exists())
+
+    def test_occupancy_and_conflicts_of_generated_days(self):
+        self.generate(pending_ratio=0.5)
+        self.generate(places=0, start_date='2016-09-05', end_date='2016-09-10',
+            pending_ratio=0.5, seed=8)
+        occupancy = list(DailyOccupancy.objects.order_by(
+            'sports_ground', 'event_date').values_list(
+            'sports_ground', 'event_date', 'booked_minutes', 'slots'))
+        conflicts = list(Reservation.objects.order_by('id').values_list('conflict'))
+        rebuild_occupancy()
+        classify_all()
+        self.assertEqual(list(DailyOccupancy.objects.order_by(
+            'sports_ground', 'event_date').values_list(
+            'sports_ground', 'event_date', 'booked_minutes', 'slots')), occupancy)
+        self.assertEqual(
+            list(Reservation.objects.order_by('id').values_list('conflict')),
+            conflicts)
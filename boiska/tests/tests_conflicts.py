@@ -0,0 +1,73 @@
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+import datetime
+from io import StringIO
+
+from boiska.conflicts import classify, deferred
+from boiska.models import Reservation
+from boiska.myutils import create_place, create_sports_ground
+
+
+class ClassifyTest(SimpleTestCase):
+
+    def test_sweep_over_pending_reservations(self):
+        accepted = [(10, 12)]
+        pending = [(8, 9), (8, 10), (9, 11), (12, 14), (13, 15), (14, 16)]
+        self.assertEqual(classify(accepted, pending), [
+            Reservation.FREE,
+            Reservation.SUPERSEDED,
+            Reservation.CONFLICTING,
+            Reservation.FREE,
+            Reservation.SUPERSEDED,
+            Reservation.FREE,
+        ])
+
+
+class ConflictTest(TestCase):
+
+    def setUp(self):
+        self.sports_ground = create_sports_ground(create_place())
+        self.event_date = datetime.date(2016, 9, 23)
+
+    def reserve(self, start_hour, end_hour, is_accepted=False):
+        return self.sports_ground.reservations.create(
+            start_time=datetime.time(start_hour),
+            end_time=datetime.time(end_hour),
+            event_date=self.event_date,
+            email='poprawny@strona.pl',
+            surname='Testowy',
+            is_accepted=is_accepted,
+        )
+
+    def assertConflict(self, reservation, conflict):
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.conflict, conflict)
+
+    def test_new_reservations_are_classified(self):
+        first = self.reserve(10, 12)
+        second = self.reserve(11, 13)
+        self.assertConflict(first, Reservation.FREE)
+        self.assertConflict(second, Reservation.SUPERSEDED)
+
+    def test_accepting_reservation_marks_overlapping_ones_as_conflicting(self):
+        first = self.reserve(10, 12)
+        second = self.reserve(11, 13)
+        first.is_accepted = True
+        first.save()
+        self.assertConflict(second, Reservation.CONFLICTING)
+
+    def test_deleting_reservation_frees_superseded_ones(self):
+        first = self.reserve(10, 12)
+        second = self.reserve(11, 13)
+        with deferred():
+            first.delete()
+            self.assertConflict(second, Reservation.SUPERSEDED)
+        self.assertConflict(second, Reservation.FREE)
+
+    def test_command_classifies_all_pending_reservations(self):
+        reservations = [self.reserve(10, 12), self.reserve(11, 13)]
+        Reservation.objects.update(conflict=Reservation.UNCLASSIFIED)
+        call_command('classify_reservations', stdout=StringIO())
+        self.assertConflict(reservations[0], Reservation.FREE)
+        self.assertConflict(reservations[1], Reservation.SUPERSEDED)
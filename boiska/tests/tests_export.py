@@ -0,0 +1,96 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from io import StringIO
+import csv
+import datetime
+import json
+import os
+import tempfile
+
+from boiska import export
+from boiska.myutils import (create_place, create_reservations,
+    create_sports_ground, QueryBudgetTestMixin)
+
+
+class ExportTest(TestCase, QueryBudgetTestMixin):
+
+    def setUp(self):
+        self.place = create_place()
+        self.sports_ground = create_sports_ground(self.place)
+        create_reservations(self.sports_ground, quantity=4,
+            date=datetime.date(2016, 9, 5))
+        accepted = create_reservations(self.sports_ground, quantity=3,
+            date=datetime.date(2016, 9, 6))
+        for reservation in accepted:
+            reservation.is_accepted = True
+            reservation.save()
+        other_place = create_place('Other', place_administrator=self.place.administrator)
+        create_reservations(create_sports_ground(other_place), quantity=2,
+            date=datetime.date(2016, 9, 5))
+        self.url = '/' + self.place.name + '/admin/export'
+
+    def test_rows_are_read_in_chunks(self):
+        reservations = export.reservations(self.place)
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(export.iter_rows(reservations, chunk_size=3))
+            queries_count = len(queries)
+        self.assertEqual(queries_count, 3)
+        self.assertEqual(len(rows), 7)
+        ids = [row['id'] for row in rows]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(list(rows[0]), list(export.FIELDS))
+        self.assertEqual(rows[0]['sports_ground'], 'Boisko nr 1')
+        self.assertEqual(rows[0]['event_date'], '2016-09-05')
+
+    def test_filters(self):
+        self.assertEqual(export.reservations(self.place, status='accepted').count(), 3)
+        self.assertEqual(export.reservations(self.place, status='pending').count(), 4)
+        self.assertEqual(export.reservations(
+            self.place,
+            date_from=datetime.date(2016, 9, 6),
+            date_to=datetime.date(2016, 9, 6)
+        ).count(), 3)
+
+    def test_csv_response_is_streamed(self):
+        response = self.client.get(self.url, {'status': 'pending'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertWithinQueryBudget(response)
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(content.splitlines()))
+        self.assertEqual(rows[0], list(export.FIELDS))
+        self.assertEqual(len(rows), 1 + 4)
+        self.assertTrue(all(row[7] == 'False' for row in rows[1:]))
+
+    def test_ndjson_response(self):
+        response = self.client.get(self.url, {
+            'format': 'ndjson',
+            'date_from': '2016-09-06',
+        })
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        reservations = [json.loads(line) for line in lines]
+        self.assertEqual(len(reservations), 3)
+        self.assertTrue(all(reservation['is_accepted'] for reservation in reservations))
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {
+            'date_from': '2016-09-06',
+            'date_to': '2016-09-05',
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('export_reservations', self.place.name, format='ndjson',
+            status='accepted', chunk_size=2, stdout=stdout)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reservations.csv')
+            call_command('export_reservations', self.place.name, output=path)
+            with open(path, encoding='utf-8', newline='') as output:
+                self.assertEqual(len(list(csv.reader(output))), 1 + 7)
@@ -1,8 +1,9 @@
+from django.forms import modelform_factory
 from django.test import TestCase
 
 import datetime
 
-from boiska.models import Reservation
+from boiska.models import Place, Reservation
 from boiska.myutils import (create_user, create_place,
     create_sports_ground, create_sports_grounds,
     create_reservation, create_reservations)
@@ -91,3 +92,27 @@ class ManageReservationFormTest(TestCase):
             correct_reservations_queryset,
             self.manage_reservations_form.fields['reservations'].queryset
         )
+
+
+class PlaceFormTest(TestCase):
+
+    def setUp(self):
+        self.form_class = modelform_factory(Place, fields=[
+            'name', 'administrator', 'description', 'phone_number',
+            'city', 'street'
+        ])
+        self.data = {
+            'administrator': create_user().pk,
+            'description': 'Example description.',
+            'phone_number': '123321123',
+            'city': 'Poznań',
+            'street': 'Nowina',
+        }
+
+    def test_name_of_api_is_rejected(self):
+        form = self.form_class(dict(self.data, name='api'))
+        self.assertIn('name', form.errors)
+
+    def test_name_starting_with_api_is_accepted(self):
+        form = self.form_class(dict(self.data, name='api Rataje'))
+        self.assertTrue(form.is_valid(), form.errors)
@@ -0,0 +1,136 @@
+from django.test import TestCase
+
+import datetime
+import unittest
+
+from boiska import availability, calendar_cache, hours, reports, search
+from boiska.forms import NewReservationForm
+from boiska.models import HoursException, Place, Reservation, WeeklyHours
+from boiska.myutils import (create_place, create_sports_ground,
+    QueryBudgetTestMixin)
+
+MONDAY = datetime.date(2016, 9, 5)
+SATURDAY = datetime.date(2016, 9, 10)
+SUNDAY = datetime.date(2016, 9, 11)
+HOLIDAY = datetime.date(2016, 9, 7)
+
+
+class OpeningHoursTest(TestCase, QueryBudgetTestMixin):
+
+    def setUp(self):
+        calendar_cache.clear()
+        self.place = create_place()
+        # open from 8 to 20
+        self.sports_ground = create_sports_ground(self.place)
+        self.sports_ground.end_season_date = datetime.date(2016, 9, 30)
+        self.sports_ground.save()
+        WeeklyHours.objects.create(
+            sports_ground=self.sports_ground,
+            weekday=5,
+            opening_time=datetime.time(10),
+            closing_time=datetime.time(14)
+        )
+        WeeklyHours.objects.create(sports_ground=self.sports_ground, weekday=6)
+        HoursException.objects.create(
+            sports_ground=self.sports_ground,
+            date=HOLIDAY,
+            description='Święto'
+        )
+        self.sports_ground.refresh_from_db()
+
+    def test_hours_of_dates(self):
+        opening_hours = hours.for_sports_ground(self.sports_ground)
+        self.assertEqual(opening_hours.on(MONDAY), (8 * 60, 20 * 60))
+        self.assertEqual(opening_hours.on(SATURDAY), (10 * 60, 14 * 60))
+        self.assertIsNone(opening_hours.on(SUNDAY))
+        self.assertIsNone(opening_hours.on(HOLIDAY))
+        # after the season
+        self.assertIsNone(opening_hours.on(datetime.date(2016, 10, 3)))
+        self.assertEqual(opening_hours.times_on(SATURDAY),
+            (datetime.time(10), datetime.time(14)))
+        self.assertEqual(opening_hours.open_minutes(SATURDAY), 4 * 60)
+
+    def test_schedule_is_compiled_when_rules_change(self):
+        HoursException.objects.create(
+            sports_ground=self.sports_ground,
+            date=MONDAY,
+            opening_time=datetime.time(12),
+            closing_time=datetime.time(16)
+        )
+        self.sports_ground.refresh_from_db()
+        self.assertEqual(hours.for_sports_ground(self.sports_ground).on(MONDAY),
+            (12 * 60, 16 * 60))
+        WeeklyHours.objects.filter(weekday=6).delete()
+        self.sports_ground.refresh_from_db()
+        self.assertEqual(hours.for_sports_ground(self.sports_ground).on(SUNDAY),
+            (8 * 60, 20 * 60))
+
+    def test_calendar_follows_rules(self):
+        Reservation.objects.create(
+            sports_ground=self.sports_ground,
+            email='mail@site.com',
+            surname='Surname',
+            event_date=SATURDAY,
+            start_time=datetime.time(10),
+            end_time=datetime.time(12),
+            is_accepted=True
+        )
+        calendar = availability.month_availability(self.place, 2016, 9)
+        self.assertEqual(calendar[SATURDAY.day], availability.BUSY)
+        revision = Place.objects.get().revision
+        WeeklyHours.objects.filter(weekday=5).update(closing_time=datetime.time(18))
+        WeeklyHours.objects.get(weekday=5).save()
+        self.assertGreater(Place.objects.get().revision, revision)
+        calendar = availability.month_availability(self.place, 2016, 9)
+        self.assertEqual(calendar[SATURDAY.day], availability.EMPTY)
+
+    def test_calendar_shows_closed_days(self):
+        calendar = availability.month_availability(self.place, 2016, 9)
+        self.assertEqual(calendar[MONDAY.day], availability.EMPTY)
+        self.assertEqual(calendar[SUNDAY.day], availability.CLOSED)
+        self.assertEqual(calendar[HOLIDAY.day], availability.CLOSED)
+
+    def test_reservations_have_to_fit_hours_of_their_day(self):
+        data = {
+            'sports_ground': self.sports_ground.id,
+            'start_time': '15:00',
+            'end_time': '16:00',
+            'email': 'mail@site.com',
+            'surname': 'Surname',
+        }
+        self.assertTrue(NewReservationForm(
+            self.place, data=data, event_date=MONDAY).is_valid())
+        self.assertFalse(NewReservationForm(
+            self.place, data=data, event_date=SATURDAY).is_valid())
+        form = NewReservationForm(self.place, data=data, event_date=HOLIDAY)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.non_field_errors(), ['Boisko jest nieczynne w tym dniu.'])
+
+    def test_search_skips_closed_days(self):
+        slots = list(search.free_slots(MONDAY, SUNDAY))
+        self.assertEqual(
+            [(slot['date'], slot['start_time'], slot['end_time']) for slot in slots],
+            [
+                (MONDAY, datetime.time(8), datetime.time(20)),
+                (datetime.date(2016, 9, 6), datetime.time(8), datetime.time(20)),
+                (datetime.date(2016, 9, 8), datetime.time(8), datetime.time(20)),
+                (datetime.date(2016, 9, 9), datetime.time(8), datetime.time(20)),
+                (SATURDAY, datetime.time(10), datetime.time(14)),
+            ]
+        )
+
+    def test_day_api_shows_hours_of_the_day(self):
+        response = self.client.get('/api/%s/2016/9/10' % self.place.name)
+        sports_ground = response.json()['sports_grounds'][0]
+        self.assertEqual((sports_ground['opening_time'], sports_ground['closing_time']),
+            ('10:00', '14:00'))
+        self.assertWithinQueryBudget(response)
+        response = self.client.get('/api/%s/2016/9/11' % self.place.name)
+        self.assertIsNone(response.json()['sports_grounds'][0]['opening_time'])
+
+    @unittest.skipIf(not reports.NUMPY_AVAILABLE, 'NumPy is not installed')
+    def test_reports_count_open_time_of_every_day(self):
+        report = reports.UtilizationReport(self.place, MONDAY, SUNDAY)
+        # Monday, Tuesday, Thursday and Friday 12 hours, Saturday 4 hours
+        self.assertEqual(report.open.sum(), (4 * 12 + 4) * 60)
+        self.assertEqual(report.open[0, 2].sum(), 0)
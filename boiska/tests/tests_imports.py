@@ -0,0 +1,146 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from io import StringIO
+import csv
+import datetime
+import json
+import os
+import tempfile
+
+from boiska import calendar_cache, export, imports
+from boiska.models import DailyOccupancy, Reservation
+from boiska.myutils import create_place, create_sports_ground
+
+
+def csv_lines(*rows):
+    header = 'sports_ground,event_date,start_time,end_time,surname,email,is_accepted'
+    return [header] + list(rows)
+
+
+class ReservationImportTest(TestCase):
+
+    def setUp(self):
+        calendar_cache.clear()
+        self.place = create_place()
+        self.sports_ground = create_sports_ground(self.place)
+        self.sports_ground.reservations.create(
+            start_time=datetime.time(10),
+            end_time=datetime.time(12),
+            event_date=datetime.date(2016, 9, 5),
+            email='poprawny@strona.pl',
+            surname='Testowy',
+            is_accepted=True,
+        )
+
+    def run_import(self, lines, batch_size=imports.BATCH_SIZE):
+        reservation_import = imports.ReservationImport(self.place, batch_size=batch_size)
+        reservation_import.run(imports.read_csv(lines))
+        return reservation_import
+
+    def test_valid_rows_are_saved(self):
+        reservation_import = self.run_import(csv_lines(
+            'Boisko nr 1,2016-09-05,12:00,13:00,Nowak,nowak@strona.pl,True',
+            'Boisko nr 1,2016-09-06,08:00,09:30,Kowalski,kowalski@strona.pl,False',
+        ))
+        self.assertEqual(reservation_import.imported, 2)
+        self.assertEqual(reservation_import.errors, [])
+        self.assertEqual(self.sports_ground.reservations.count(), 3)
+        occupancy = DailyOccupancy.objects.get(event_date=datetime.date(2016, 9, 5))
+        self.assertEqual(occupancy.booked_minutes, 180)
+        pending = Reservation.objects.get(surname='Kowalski')
+        self.assertEqual(pending.conflict, Reservation.FREE)
+
+    def test_invalid_rows_are_reported(self):
+        reservation_import = self.run_import(csv_lines(
+            'Boisko nr 2,2016-09-05,12:00,13:00,Nowak,nowak@strona.pl,True',
+            'Boisko nr 1,2016-09-05,13:00,12:00,Nowak,nowak@strona.pl,False',
+            'Boisko nr 1,2016-09-05,19:00,21:00,Nowak,nowak@strona.pl,False',
+            'Boisko nr 1,2016-09-05,12:00,13:00,Nowak,niepoprawny,False',
+            'Boisko nr 1,2016-09-05,11:00,13:00,Nowak,nowak@strona.pl,True',
+            'Boisko nr 1,2016-09-05,11:00,13:00,Nowak,nowak@strona.pl,False',
+        ))
+        self.assertEqual(reservation_import.imported, 1)
+        self.assertEqual(
+            [line_number for line_number, _ in reservation_import.errors],
+            [2, 3, 4, 5, 6]
+        )
+        self.assertEqual(reservation_import.errors[4][1],
+            'Rezerwacja nachodzi na zaakceptowaną.')
+        # the pending one may overlap, it is classified
+        pending = Reservation.objects.get(surname='Nowak')
+        self.assertEqual(pending.conflict, Reservation.CONFLICTING)
+
+    def test_overlaps_between_batches(self):
+        reservation_import = self.run_import(csv_lines(
+            'Boisko nr 1,2016-09-06,12:00,14:00,Nowak,nowak@strona.pl,True',
+            'Boisko nr 1,2016-09-06,13:00,15:00,Nowak,nowak@strona.pl,True',
+            'Boisko nr 1,2016-09-06,14:00,15:00,Nowak,nowak@strona.pl,True',
+        ), batch_size=1)
+        self.assertEqual(reservation_import.imported, 2)
+        self.assertEqual([line_number for line_number, _ in reservation_import.errors], [3])
+
+    def test_queries_do_not_depend_on_number_of_rows(self):
+        def count_queries(quantity):
+            rows = [
+                'Boisko nr 1,2016-10-%02d,08:00,09:00,Nowak,nowak@strona.pl,True' % day
+                for day in range(1, quantity + 1)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                self.run_import(csv_lines(*rows))
+                return len(queries)
+        self.assertEqual(count_queries(3), count_queries(20))
+
+    def test_exported_reservations_can_be_imported(self):
+        other_place = create_place('Other', place_administrator=self.place.administrator)
+        create_sports_ground(other_place)
+        content = ''.join(export.export_lines(export.reservations(self.place), 'ndjson'))
+        reservation_import = imports.ReservationImport(other_place)
+        reservation_import.run(imports.read_ndjson(content.splitlines()))
+        self.assertEqual(reservation_import.imported, 1)
+        reservation = Reservation.objects.get(sports_ground__place=other_place)
+        self.assertTrue(reservation.is_accepted)
+        self.assertEqual(reservation.start_time, datetime.time(10))
+
+    def test_invalid_json_line(self):
+        reservation_import = imports.ReservationImport(self.place)
+        reservation_import.run(imports.read_ndjson(['{', '', json.dumps([1])]))
+        self.assertEqual(reservation_import.errors, [
+            (1, 'Nieprawidłowy wiersz.'),
+            (3, 'Nieprawidłowy wiersz.'),
+        ])
+
+    def test_upload(self):
+        url = '/' + self.place.name + '/admin/import'
+        content = '\n'.join(csv_lines(
+            'Boisko nr 1,2016-09-06,12:00,14:00,Żółw,zolw@strona.pl,True',
+            'Boisko nr 1,2016-09-06,12:00,14:00,Żółw,zolw@strona.pl,True',
+        ))
+        response = self.client.post(url, {
+            'format': 'csv',
+            'file': SimpleUploadedFile('reservations.csv', content.encode()),
+        })
+        self.assertEqual(response.context['reservation_import'].imported, 1)
+        self.assertEqual(len(response.context['errors']), 1)
+        self.assertTrue(Reservation.objects.filter(surname='Żółw').exists())
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reservations.csv')
+            errors_path = os.path.join(directory, 'errors.csv')
+            with open(path, 'w', encoding='utf-8') as output:
+                output.write('\n'.join(csv_lines(
+                    'Boisko nr 1,2016-09-06,12:00,14:00,Nowak,nowak@strona.pl,True',
+                    'Boisko nr 9,2016-09-06,12:00,14:00,Nowak,nowak@strona.pl,True',
+                )))
+            stdout = StringIO()
+            call_command('import_reservations', self.place.name, path,
+                errors=errors_path, stdout=stdout)
+            self.assertIn('Imported 1 reservations, rejected 1 rows.', stdout.getvalue())
+            with open(errors_path, encoding='utf-8', newline='') as errors:
+                rows = list(csv.reader(errors))
+            self.assertEqual(rows[0], ['line', 'error'])
+            self.assertEqual(rows[1][0], '3')
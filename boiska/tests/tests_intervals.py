@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase
+
+import datetime
+
+from boiska.intervals import IntervalIndex
+
+
+class IntervalIndexTest(SimpleTestCase):
+
+    def setUp(self):
+        self.index = IntervalIndex([
+            (datetime.time(10), datetime.time(11)),
+            (datetime.time(8), datetime.time(9)),
+        ])
+
+    def test_intervals_are_sorted_by_start(self):
+        self.assertEqual(
+            self.index.starts,
+            [datetime.time(8), datetime.time(10)]
+        )
+
+    def test_overlapping_interval(self):
+        self.assertTrue(
+            self.index.overlaps(datetime.time(10, 30), datetime.time(12))
+        )
+        self.assertTrue(
+            self.index.overlaps(datetime.time(7), datetime.time(8, 30))
+        )
+
+    def test_interval_in_gap_does_not_overlap(self):
+        self.assertFalse(
+            self.index.overlaps(datetime.time(9), datetime.time(10))
+        )
+
+    def test_interval_covering_others_overlaps(self):
+        self.assertTrue(
+            self.index.overlaps(datetime.time(7), datetime.time(12))
+        )
+
+    def test_long_interval_is_found_behind_shorter_ones(self):
+        self.index.add(datetime.time(6), datetime.time(20))
+        self.assertTrue(
+            self.index.overlaps(datetime.time(18), datetime.time(19))
+        )
+
+    def test_added_interval_is_checked(self):
+        self.index.add(datetime.time(12), datetime.time(13))
+        self.assertTrue(
+            self.index.overlaps(datetime.time(12, 30), datetime.time(14))
+        )
@@ -0,0 +1,112 @@
+from django.db import transaction
+from django.db.transaction import TransactionManagementError
+from django.test import SimpleTestCase, TestCase
+
+import datetime
+from unittest import mock
+
+from boiska import locks
+from boiska.locks import lock_days, lock_reservations
+from boiska.models import Reservation
+from boiska.myutils import create_place, create_sports_ground, create_sports_grounds
+
+EVENT_DATE = datetime.date(2016, 9, 23)
+
+
+class LockDaysOutsideTransactionTest(SimpleTestCase):
+
+    def test_lock_needs_transaction(self):
+        with self.assertRaises(TransactionManagementError):
+            lock_days([(1, datetime.date(2016, 9, 23))])
+
+
+class LockDaysTest(TestCase):
+
+    def setUp(self):
+        self.sports_ground = create_sports_ground(create_place())
+        self.key = (self.sports_ground.id, datetime.date(2016, 9, 23))
+
+    def test_lock_inside_transaction(self):
+        with transaction.atomic():
+            lock_days([self.key, self.key])
+        self.sports_ground.refresh_from_db()
+        self.assertEqual(self.sports_ground.local_id, 1)
+
+    def test_no_keys_need_no_queries(self):
+        with transaction.atomic(), self.assertNumQueries(0):
+            lock_days([])
+
+
+class ConcurrentChangeTest(TestCase):
+    """
+    Another transaction changes a reservation between the read made
+    before the lock and the lock itself.
+    """
+
+    def setUp(self):
+        self.place = create_place()
+        self.sports_ground, self.other_sports_ground = create_sports_grounds(
+            self.place, quantity=2)
+        self.accepted = self.create_reservation(14, is_accepted=True)
+        self.pending = self.create_reservation(10)
+        self.locked = []
+
+    def create_reservation(self, start_hour, is_accepted=False):
+        return Reservation.objects.create(
+            sports_ground=self.sports_ground,
+            email='mail@site.com',
+            surname='Surname',
+            event_date=EVENT_DATE,
+            start_time=datetime.time(start_hour),
+            end_time=datetime.time(start_hour + 1),
+            is_accepted=is_accepted
+        )
+
+    def change_before_lock(self, **changes):
+        """
+        Patch lock_days() to apply changes to the pending reservation
+        when it is called for the first time.
+        """
+        def lock(keys):
+            keys = list(keys)
+            if keys and not self.locked:
+                Reservation.objects.filter(id=self.pending.id).update(**changes)
+            self.locked += keys
+            lock_days(keys)
+        return mock.patch.object(locks, 'lock_days', lock)
+
+    def test_moved_reservations_are_read_again(self):
+        with self.change_before_lock(sports_ground=self.other_sports_ground):
+            with transaction.atomic():
+                reservations = lock_reservations(
+                    Reservation.objects.filter(id=self.pending.id),
+                    [(self.sports_ground.id, EVENT_DATE)]
+                )
+        self.assertEqual(reservations[0].sports_ground_id, self.other_sports_ground.id)
+        self.assertIn((self.other_sports_ground.id, EVENT_DATE), self.locked)
+
+    def test_reservation_moved_onto_accepted_one_is_not_accepted(self):
+        url = '/%s/admin' % self.place.name
+        with self.change_before_lock(start_time=datetime.time(14),
+                end_time=datetime.time(15)):
+            self.client.post(url, {
+                'action': Reservation.ACCEPT,
+                'reservations': [self.pending.id],
+            })
+        self.assertTrue(self.locked)
+        self.pending.refresh_from_db()
+        self.assertFalse(self.pending.is_accepted)
+
+    def test_edition_locks_day_the_reservation_was_moved_to(self):
+        url = '/%s/admin/edit_reservation/%d' % (self.place.name, self.pending.id)
+        with self.change_before_lock(sports_ground=self.other_sports_ground):
+            response = self.client.post(url, {
+                'sports_ground': self.sports_ground.id,
+                'start_time': '14:00',
+                'end_time': '15:00',
+                'is_accepted': True,
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn((self.other_sports_ground.id, EVENT_DATE), self.locked)
+        self.pending.refresh_from_db()
+        self.assertFalse(self.pending.is_accepted)
@@ -0,0 +1,132 @@
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+
+import os
+import sqlite3
+import tempfile
+
+from boiska import routers
+from boiska.middleware import ReplicaMiddleware
+from boiska.models import Place
+from boiska.replication import copy_database
+
+
+@override_settings(BOISKA_READ_REPLICA='replica')
+class ReplicaRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+
+    def test_reads_go_to_replica_only_when_allowed(self):
+        self.assertEqual(self.router.db_for_read(Place), 'default')
+        with routers.reading_from_replica():
+            self.assertEqual(self.router.db_for_read(Place), 'replica')
+            # sessions, users and other applications stay on the default database
+            self.assertEqual(self.router.db_for_read(User), 'default')
+            self.assertEqual(self.router.db_for_write(Place), 'default')
+        self.assertEqual(self.router.db_for_read(Place), 'default')
+
+    @override_settings(BOISKA_READ_REPLICA=None)
+    def test_without_replica(self):
+        with routers.reading_from_replica():
+            self.assertEqual(self.router.db_for_read(Place), 'default')
+
+    def test_replica_is_not_migrated(self):
+        self.assertIs(self.router.allow_migrate('replica', 'boiska'), False)
+        self.assertIsNone(self.router.allow_migrate('default', 'boiska'))
+
+    def test_relations_only_within_primary_and_replica(self):
+        place, other_place = Place(), Place()
+        place._state.db, other_place._state.db = 'default', 'replica'
+        self.assertIs(self.router.allow_relation(place, other_place), True)
+        other_place._state.db = 'shard1'
+        self.assertIsNone(self.router.allow_relation(place, other_place))
+
+
+@override_settings(BOISKA_READ_REPLICA='replica')
+class ReplicaRouterTransactionTest(TestCase):
+
+    def test_reads_in_transactions_go_to_default(self):
+        # every test of TestCase runs in a transaction
+        with routers.reading_from_replica():
+            self.assertEqual(routers.ReplicaRouter().db_for_read(Place), 'default')
+
+
+@override_settings(
+    BOISKA_READ_REPLICA='replica',
+    BOISKA_REPLICA_VIEWS=('boiska:index',),
+    BOISKA_REPLICA_STICKY_SECONDS=60
+)
+class ReplicaMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.cookies = {}
+        self.allowed = []
+
+        def get_response(request):
+            self.allowed.append(routers.replica_allowed())
+            return HttpResponse()
+
+        self.middleware = ReplicaMiddleware(get_response)
+
+    def send(self, method, path):
+        request = getattr(self.factory, method)(path)
+        request.COOKIES = self.cookies
+        request.resolver_match = resolve(path)
+        self.middleware.process_view(request, None, (), {})
+        response = self.middleware(request)
+        self.assertFalse(routers.replica_allowed())
+        return response
+
+    def test_listed_views_read_from_replica(self):
+        self.send('get', '/')
+        self.send('get', '/Poznań/admin')
+        self.assertEqual(self.allowed, [True, False])
+
+    def test_reads_stick_to_default_after_write(self):
+        response = self.send('post', '/Poznań/2016/9/5')
+        cookie = response.cookies[ReplicaMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], 60)
+        self.cookies[ReplicaMiddleware.cookie_name] = cookie.value
+        self.send('get', '/')
+        self.assertEqual(self.allowed, [False, False])
+        # the cookie has expired
+        del self.cookies[ReplicaMiddleware.cookie_name]
+        self.send('get', '/')
+        self.assertEqual(self.allowed[-1], True)
+
+
+class CopyDatabaseTest(SimpleTestCase):
+
+    def test_copy_is_consistent(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'primary.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            primary = sqlite3.connect(source)
+            primary.execute('PRAGMA journal_mode = WAL')
+            primary.execute('CREATE TABLE numbers (number INTEGER)')
+            primary.executemany('INSERT INTO numbers VALUES (?)', [(1,), (2,)])
+            primary.commit()
+            copy_database(source, target)
+            primary.execute('INSERT INTO numbers VALUES (3)')
+            primary.commit()
+            replica = sqlite3.connect(target)
+            self.assertEqual(replica.execute('SELECT SUM(number) FROM numbers').fetchone(), (3,))
+            replica.close()
+            copy_database(source, target)
+            replica = sqlite3.connect(target)
+            self.assertEqual(replica.execute('SELECT SUM(number) FROM numbers').fetchone(), (6,))
+            replica.close()
+            primary.close()
+            # no temporary copies are left behind
+            self.assertFalse([name for name in os.listdir(directory) if name.startswith('tmp')])
+
+    @override_settings(BOISKA_READ_REPLICA=None)
+    def test_command_needs_replica(self):
+        with self.assertRaises(CommandError):
+            call_command('sync_replica')
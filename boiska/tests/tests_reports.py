@@ -0,0 +1,93 @@
+from django.test import TestCase, SimpleTestCase
+
+import csv
+import datetime
+import unittest
+
+from boiska import reports
+from boiska.myutils import create_place, create_sports_ground, QueryBudgetTestMixin
+
+
+@unittest.skipIf(not reports.NUMPY_AVAILABLE, 'NumPy is not installed')
+class WeekdayCountsTest(SimpleTestCase):
+
+    def test_weekdays_between_dates(self):
+        # 2016-09-05 is Monday
+        counts = reports.weekday_counts(
+            datetime.date(2016, 9, 5),
+            datetime.date(2016, 9, 13)
+        )
+        self.assertEqual(list(counts), [2, 2, 1, 1, 1, 1, 1])
+
+    def test_minutes_per_hour(self):
+        covered = reports.minutes_per_hour(
+            reports.np.array([8 * 60 + 30]),
+            reports.np.array([10 * 60])
+        )
+        self.assertEqual(list(covered[0, 7:11]), [0, 30, 60, 0])
+
+
+@unittest.skipIf(not reports.NUMPY_AVAILABLE, 'NumPy is not installed')
+class UtilizationReportTest(TestCase, QueryBudgetTestMixin):
+
+    def setUp(self):
+        self.place = create_place()
+        self.sports_ground = create_sports_ground(self.place)
+        self.sports_ground.start_season_date = datetime.date(2016, 9, 5)
+        self.sports_ground.end_season_date = datetime.date(2016, 9, 11)
+        self.sports_ground.save()
+        # Monday, 10:00 - 11:30
+        self.sports_ground.reservations.create(
+            start_time=datetime.time(10),
+            end_time=datetime.time(11, 30),
+            event_date=datetime.date(2016, 9, 5),
+            email='poprawny@strona.pl',
+            surname='Testowy',
+            is_accepted=True,
+        )
+        self.url = '/' + self.place.name + '/admin/report'
+
+    def test_booked_and_open_minutes(self):
+        report = reports.UtilizationReport(
+            self.place,
+            datetime.date(2016, 9, 1),
+            datetime.date(2016, 9, 30)
+        )
+        monday = report.booked[0, 0]
+        self.assertEqual(list(monday[9:13]), [0, 60, 30, 0])
+        # opened from 8 to 20 on one Monday of the season
+        self.assertEqual(report.open[0, 0].sum(), 12 * 60)
+        self.assertEqual(report.open.sum(), 7 * 12 * 60)
+        sports_ground, booked, available, ratio = report.by_sports_ground()[0]
+        self.assertEqual(booked, 90)
+        self.assertAlmostEqual(ratio, 90 / (7 * 12 * 60))
+
+    def test_default_period_is_season(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['date_from'], datetime.date(2016, 9, 5))
+        self.assertEqual(response.context['date_to'], datetime.date(2016, 9, 11))
+        heatmap = response.context['report'].heatmap()
+        self.assertEqual(heatmap[0][0], 'Poniedziałek')
+        self.assertWithinQueryBudget(response)
+
+    def test_invalid_period_shows_no_report(self):
+        response = self.client.get(self.url, {
+            'date_from': '2016-09-11',
+            'date_to': '2016-09-05',
+        })
+        self.assertIsNone(response.context['report'])
+
+    def test_csv_export(self):
+        response = self.client.get(self.url + '.csv', {
+            'date_from': '2016-09-05',
+            'date_to': '2016-09-11',
+        })
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(response.content.decode().splitlines()))
+        self.assertEqual(rows[0][0], 'sports_ground')
+        # 12 open hours on 7 weekdays
+        self.assertEqual(len(rows), 1 + 7 * 12)
+        self.assertIn(['Boisko nr 1', 'Poniedziałek', '10', '60', '60', '1.0'], rows)
+
+    def test_csv_url_needs_dot(self):
+        self.assertEqual(self.client.get(self.url + 'xcsv').status_code, 404)
@@ -0,0 +1,87 @@
+from django.test import SimpleTestCase, TestCase
+
+import datetime
+
+from boiska.myutils import create_place, create_sports_ground, create_user
+from boiska.search import free_periods, free_slots
+
+
+class FreePeriodsTest(SimpleTestCase):
+
+    def test_whole_day_is_free_without_reservations(self):
+        self.assertEqual(list(free_periods(480, 1200, [], 60)), [(480, 1200)])
+
+    def test_gaps_between_overlapping_reservations(self):
+        busy = [(480, 600), (540, 660), (600, 630), (720, 780)]
+        self.assertEqual(
+            list(free_periods(480, 1200, busy, 30)),
+            [(660, 720), (780, 1200)]
+        )
+
+    def test_short_gaps_are_skipped(self):
+        busy = [(500, 600), (620, 1200)]
+        self.assertEqual(list(free_periods(480, 1200, busy, 30)), [])
+
+
+class FreeSlotsTest(TestCase):
+
+    def setUp(self):
+        self.date = datetime.date(2016, 9, 24)
+        administrator = create_user()
+        self.sports_ground = create_sports_ground(
+            create_place(place_administrator=administrator)
+        )
+        other_place = create_place(
+            place_name='Gniezno',
+            place_administrator=administrator
+        )
+        other_place.city = 'Gniezno'
+        other_place.save()
+        self.other_sports_ground = create_sports_ground(other_place)
+
+    def reserve(self, sports_ground, start_hour, end_hour, is_accepted=True):
+        sports_ground.reservations.create(
+            start_time=datetime.time(start_hour),
+            end_time=datetime.time(end_hour),
+            event_date=self.date,
+            email='poprawny@strona.pl',
+            surname='Testowy',
+            is_accepted=is_accepted,
+        )
+
+    def test_free_time_around_accepted_reservations(self):
+        self.reserve(self.sports_ground, 10, 12)
+        self.reserve(self.sports_ground, 12, 14, is_accepted=False)
+        slots = list(free_slots(self.date, city='Poznań'))
+        self.assertEqual(
+            [(slot['start_time'], slot['end_time']) for slot in slots],
+            [(datetime.time(8), datetime.time(10)),
+                (datetime.time(12), datetime.time(20))]
+        )
+
+    def test_time_window_and_min_duration(self):
+        self.reserve(self.sports_ground, 18, 19)
+        slots = list(free_slots(
+            self.date,
+            start_time=datetime.time(17),
+            end_time=datetime.time(21),
+            min_duration=datetime.timedelta(minutes=90)
+        ))
+        self.assertEqual(len(slots), 1)
+        self.assertEqual(slots[0]['sports_ground'], self.other_sports_ground.id)
+        self.assertEqual(slots[0]['start_time'], datetime.time(17))
+        self.assertEqual(slots[0]['end_time'], datetime.time(20))
+
+    def test_slots_are_ordered_by_date(self):
+        next_date = self.date + datetime.timedelta(days=1)
+        slots = list(free_slots(self.date, next_date))
+        self.assertEqual(
+            [slot['date'] for slot in slots],
+            [self.date, self.date, next_date, next_date]
+        )
+
+    def test_number_of_queries_does_not_depend_on_sports_grounds(self):
+        for _ in range(5):
+            self.reserve(create_sports_ground(self.sports_ground.place), 10, 11)
+        with self.assertNumQueries(2):
+            list(free_slots(self.date, self.date + datetime.timedelta(days=6)))
@@ -0,0 +1,227 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from io import StringIO
+import datetime
+import time
+import unittest
+from unittest import mock
+
+from boiska import calendar_cache, routers, shards
+from boiska.middleware import ShardMiddleware
+from boiska.models import DailyOccupancy, Place, PlaceShard, Reservation, SportsGround
+from boiska.myutils import (create_place, create_reservations,
+    create_sports_ground, create_sports_grounds)
+
+
+class ShardRouterTest(SimpleTestCase):
+
+    def setUp(self):
+        self.router = routers.ShardRouter()
+
+    def test_queries_go_to_current_database(self):
+        self.assertIsNone(self.router.db_for_read(Reservation))
+        with routers.using_database('shard1'):
+            self.assertEqual(self.router.db_for_read(Reservation), 'shard1')
+            self.assertEqual(self.router.db_for_write(Place), 'shard1')
+            self.assertEqual(routers.place_database(), 'shard1')
+            # the directory and other applications stay on the default database
+            self.assertEqual(self.router.db_for_read(PlaceShard), 'default')
+            self.assertIsNone(self.router.db_for_read(User))
+            with routers.using_database('default'):
+                # left to the replica router
+                self.assertIsNone(self.router.db_for_read(Reservation))
+        self.assertEqual(routers.place_database(), 'default')
+
+    def test_directory_is_migrated_only_in_default_database(self):
+        self.assertTrue(self.router.allow_migrate('default', 'boiska', 'placeshard'))
+        self.assertFalse(self.router.allow_migrate('shard1', 'boiska', 'placeshard'))
+        self.assertIsNone(self.router.allow_migrate('shard1', 'boiska', 'reservation'))
+
+
+@override_settings(BOISKA_SHARDS=['default', 'shard1'])
+class ShardMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        shards.get_cache().set(shards.DIRECTORY_KEY, {
+            'Moved': ('shard1', False),
+            'Moving': ('default', True),
+        }, None)
+        self.factory = RequestFactory()
+        self.databases = []
+
+        def get_response(request):
+            self.databases.append(routers.current_database())
+            return HttpResponse()
+
+        self.middleware = ShardMiddleware(get_response)
+
+    def tearDown(self):
+        shards.get_cache().delete(shards.DIRECTORY_KEY)
+
+    def send(self, method, place_name):
+        request = getattr(self.factory, method)('/')
+        response = self.middleware.process_view(
+            request, None, (), {'place_name': place_name})
+        if response is None:
+            response = self.middleware(request)
+        self.assertIsNone(routers.current_database())
+        return response
+
+    def test_views_use_database_of_place(self):
+        self.send('get', 'Moved')
+        self.send('post', 'Poznań')
+        self.assertEqual(self.databases, ['shard1', 'default'])
+
+    def test_moved_place_is_read_only(self):
+        self.assertEqual(self.send('get', 'Moving').status_code, 200)
+        self.assertEqual(self.send('post', 'Moving').status_code, 503)
+        self.assertEqual(self.databases, ['default'])
+
+
+class PlaceScopeTest(TestCase):
+
+    def setUp(self):
+        self.place = create_place()
+        self.other_place = create_place('Other', place_administrator=self.place.administrator)
+        self.other_sports_ground = create_sports_ground(self.other_place)
+
+    def test_reservation_of_other_place_is_not_found(self):
+        reservation = create_reservations(self.other_sports_ground, quantity=1)[0]
+        response = self.client.get(
+            '/%s/admin/edit_reservation/%d' % (self.place.name, reservation.id))
+        self.assertEqual(response.status_code, 404)
+
+    def test_sports_ground_of_other_place_is_rejected(self):
+        create_sports_ground(self.place)
+        self.client.post('/%s/2016/9/5' % self.place.name, {
+            'sports_ground': self.other_sports_ground.id,
+            'start_time': '10:00',
+            'end_time': '11:00',
+            'email': 'mail@site.com',
+            'surname': 'Surname',
+        })
+        self.assertFalse(Reservation.objects.exists())
+
+
+@override_settings(BOISKA_SHARDS=['default', 'shard1'])
+class DirectoryTest(TestCase):
+
+    def setUp(self):
+        shards.get_cache().delete(shards.DIRECTORY_KEY)
+
+    def tearDown(self):
+        shards.get_cache().delete(shards.DIRECTORY_KEY)
+
+    @override_settings(BOISKA_SHARD_DIRECTORY_TIMEOUT=0.1)
+    def test_directory_expires(self):
+        self.assertEqual(shards.database_for_place('Moved'), 'default')
+        # moved by another process, which has its own cache
+        PlaceShard.objects.create(place_name='Moved', database='shard1')
+        self.assertEqual(shards.database_for_place('Moved'), 'default')
+        time.sleep(0.2)
+        self.assertEqual(shards.database_for_place('Moved'), 'shard1')
+
+    def test_places_of_default_database_are_read_through_routers(self):
+        create_place()
+        with mock.patch.object(routers.ReplicaRouter, 'db_for_read',
+                return_value='default') as db_for_read:
+            places = shards.all_places()
+        self.assertEqual([place.name for place in places], ['Poznań Rataje'])
+        self.assertIn(Place, [call[0][0] for call in db_for_read.call_args_list])
+
+
+@unittest.skipUnless('shard1' in settings.DATABASES,
+    'set BOISKA_SHARD_DATABASES to run tests of shards')
+@override_settings(BOISKA_SHARD_DIRECTORY_TIMEOUT=0)
+class MovePlaceTest(TestCase):
+    multi_db = True
+
+    def setUp(self):
+        shards.get_cache().delete(shards.DIRECTORY_KEY)
+        calendar_cache.clear()
+        self.place = create_place()
+        self.sports_grounds = create_sports_grounds(self.place, quantity=2)
+        create_reservations(self.sports_grounds[0], quantity=3,
+            date=datetime.date(2016, 9, 5))
+        Reservation.objects.create(
+            sports_ground=self.sports_grounds[1],
+            email='mail@site.com',
+            surname='Surname',
+            event_date=datetime.date(2016, 9, 5),
+            start_time=datetime.time(10),
+            end_time=datetime.time(12),
+            is_accepted=True
+        )
+        self.other_place = create_place('Other', place_administrator=self.place.administrator)
+        create_sports_ground(self.other_place)
+
+    def tearDown(self):
+        shards.get_cache().delete(shards.DIRECTORY_KEY)
+
+    def test_place_is_moved_with_its_rows(self):
+        copied = shards.move_place(self.place.name, 'shard1', chunk_size=2, grace=0)
+        self.assertEqual(copied, {
+            'sports_grounds': 2,
+            'reservation': 4,
+            'archivedreservation': 0,
+            'dailyoccupancy': 1,
+            'weeklyhours': 0,
+            'hoursexception': 0,
+        })
+        self.assertEqual(shards.database_for_place(self.place.name), 'shard1')
+        self.assertFalse(shards.is_read_only(self.place.name))
+        self.assertFalse(Place.objects.filter(name=self.place.name).exists())
+        self.assertFalse(Reservation.objects.exists() or DailyOccupancy.objects.exists())
+        self.assertEqual(SportsGround.objects.count(), 1)
+        with shards.using_place(self.place.name):
+            self.assertEqual(
+                Reservation.objects.filter(sports_ground__place=self.place.name).count(), 4)
+            occupancy = DailyOccupancy.objects.get()
+            self.assertEqual(occupancy.booked_minutes, 120)
+
+    def test_views_of_moved_place(self):
+        shards.move_place(self.place.name, 'shard1', grace=0)
+        response = self.client.get('/')
+        self.assertEqual(
+            [place.name for place in response.context['place_list']],
+            ['Other', self.place.name])
+        response = self.client.get('/%s/2016/9/5' % self.place.name)
+        self.assertEqual(response.status_code, 200)
+        timeline = response.context['timeline']
+        self.assertEqual([len(day['reservations']) for day in timeline], [0, 1])
+        reservations = Reservation.objects.using('shard1').filter(is_accepted=False)
+        response = self.client.post('/%s/admin' % self.place.name, {
+            'action': Reservation.ACCEPT,
+            'reservations': [reservations[0].id],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Reservation.objects.using('shard1').filter(is_accepted=True).count(), 2)
+
+    def test_search_covers_all_databases(self):
+        shards.move_place(self.place.name, 'shard1', grace=0)
+        response = self.client.get('/api/search', {'date_from': '2016-09-05'})
+        places = [slot['place'] for slot in response.json()['slots']]
+        self.assertEqual(places, sorted(places))
+        self.assertEqual(set(places), {'Other', self.place.name})
+
+    def test_place_is_moved_back(self):
+        shards.move_place(self.place.name, 'shard1', grace=0)
+        output = StringIO()
+        call_command('move_place', self.place.name, 'default', grace=0, stdout=output)
+        self.assertIn('4 reservations', output.getvalue())
+        self.assertEqual(shards.database_for_place(self.place.name), 'default')
+        self.assertEqual(Reservation.objects.count(), 4)
+        self.assertFalse(Place.objects.using('shard1').exists())
+
+    def test_failed_move_leaves_place_in_source(self):
+        with self.assertRaises(ValueError):
+            shards.move_place(self.place.name, 'unknown', grace=0)
+        with self.assertRaises(ValueError):
+            shards.move_place(self.place.name, 'default', grace=0)
+        self.assertEqual(shards.database_for_place(self.place.name), 'default')
+        self.assertEqual(Reservation.objects.count(), 4)
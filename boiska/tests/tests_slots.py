@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase, override_settings
+
+from boiska import slots
+
+
+@override_settings(BOISKA_SLOT_MINUTES=15)
+class SlotsTest(SimpleTestCase):
+
+    def test_mask_covers_touched_slots(self):
+        self.assertEqual(slots.mask(0, 15), 0b1)
+        self.assertEqual(slots.mask(15, 45), 0b110)
+        self.assertEqual(slots.mask(20, 40), 0b110)
+        self.assertEqual(slots.mask(30, 30), 0)
+
+    def test_busy_periods(self):
+        bitmap = slots.mask(0, 30) | slots.mask(600, 660) | slots.mask(660, 690)
+        self.assertEqual(
+            list(slots.busy_periods(bitmap)),
+            [(0, 30), (600, 690)]
+        )
+
+    def test_bytes_round_trip(self):
+        bitmap = slots.mask(0, 15) | slots.mask(23 * 60 + 45, 24 * 60)
+        data = slots.to_bytes(bitmap)
+        self.assertEqual(len(data), 12)
+        self.assertEqual(slots.from_bytes(data), bitmap)
+        self.assertEqual(slots.from_bytes(b''), 0)
+
+    @override_settings(BOISKA_SLOT_MINUTES=10)
+    def test_other_granularity(self):
+        self.assertEqual(slots.slots_per_day(), 144)
+        self.assertEqual(slots.mask(10, 30), 0b110)
@@ -0,0 +1,60 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+import os
+import tempfile
+import unittest
+
+from boiska import sqlite
+
+
+@unittest.skipIf(connection.vendor != 'sqlite', 'SQLite only')
+class SqlitePragmasTest(SimpleTestCase):
+
+    def open_database(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database = DatabaseWrapper(
+            dict(connection.settings_dict, NAME=os.path.join(directory.name, 'test.sqlite3')),
+            alias='tuning'
+        )
+        self.addCleanup(database.close)
+        database.ensure_connection()
+        return database
+
+    @override_settings(BOISKA_SQLITE_PRAGMAS={
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 2500,
+        'cache_size': -1024,
+    })
+    def test_pragmas_of_new_connections(self):
+        database = self.open_database()
+        self.assertEqual(
+            sqlite.current_pragmas(database, [
+                'journal_mode', 'synchronous', 'busy_timeout', 'cache_size'
+            ]),
+            {
+                'journal_mode': 'wal',
+                'synchronous': 1,
+                'busy_timeout': 2500,
+                'cache_size': -1024,
+            }
+        )
+        self.assertEqual(len(database.queries_log), 0)
+
+    @override_settings(BOISKA_SQLITE_PRAGMAS={})
+    def test_defaults_without_settings(self):
+        database = self.open_database()
+        self.assertEqual(
+            sqlite.current_pragmas(database, ['journal_mode'])['journal_mode'],
+            'delete'
+        )
+
+    def test_invalid_pragma(self):
+        with self.assertRaises(ImproperlyConfigured):
+            sqlite.pragma_statements({'cache_size': '1; DROP TABLE boiska_place'})
+        with self.assertRaises(ImproperlyConfigured):
+            sqlite.pragma_statements({'Journal Mode': 'WAL'})
@@ -1,16 +1,23 @@
-from django.test import TestCase
+from django.test import Client, TestCase, override_settings
+from django.core.exceptions import ImproperlyConfigured
 from django.core.urlresolvers import resolve
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
 
 import datetime
+from unittest import mock
 
 import boiska.views as views
+from boiska import calendar_cache, conflicts, intake
+from boiska.forms import EditPlaceForm
+from boiska.middleware import QueryStats
 from boiska.models import Place, Reservation
 from boiska.myutils import (create_user, create_place,
     create_sports_ground, create_sports_grounds,
-    create_reservation, create_reservations)
+    create_reservation, create_reservations, QueryBudgetTestMixin)
 
 
-class BasicViewTest:
+class BasicViewTest(QueryBudgetTestMixin):
 
     def test_url_resolves_to_correct_view(self):
         resolver_match = resolve(self.url)
@@ -25,6 +32,14 @@ class BasicViewTest:
         response = self.client.get(self.url)
         self.assertTemplateUsed(response, 'boiska/base.html')
 
+    def test_view_is_within_query_budget(self):
+        response = self.client.get(self.url)
+        self.assertWithinQueryBudget(response)
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+        self.assertIn('Server-Timing', response)
+
 
 class IndexViewTest(TestCase, BasicViewTest):
 
@@ -38,9 +53,52 @@ class IndexViewTest(TestCase, BasicViewTest):
         self.assertIn('place_list', response.context)
 
 
+class QueryStatsMiddlewareTest(TestCase, QueryBudgetTestMixin):
+
+    def setUp(self):
+        calendar_cache.clear()
+        self.place = create_place()
+        self.url = '/' + self.place.name
+
+    def test_queries_are_counted(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.query_stats.view_name, 'boiska:place')
+        self.assertEqual(response.query_stats.count, 3)
+        self.assertIn('3 queries', response['Server-Timing'])
+
+    def test_duplicated_queries_are_counted(self):
+        queries = [
+            {'sql': 'SELECT 1', 'time': '0.001'},
+            {'sql': 'SELECT 2', 'time': '0.001'},
+            {'sql': 'SELECT 1', 'time': '0.001'},
+        ]
+        stats = QueryStats('boiska:place', 'GET', queries)
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(stats.duplicates, 1)
+
+    @override_settings(BOISKA_QUERY_BUDGETS={'boiska:place': 1})
+    def test_reads_of_shard_directory_are_not_in_budget(self):
+        queries = [
+            {'sql': 'SELECT "boiska_placeshard"."place_name" FROM "boiska_placeshard"',
+                'time': '0.001'},
+            {'sql': 'SELECT 1', 'time': '0.001'},
+        ]
+        stats = QueryStats('boiska:place', 'GET', queries)
+        self.assertEqual(stats.count, 2)
+        self.assertFalse(stats.over_budget())
+
+    @override_settings(BOISKA_QUERY_BUDGETS={'boiska:place': 1})
+    def test_exceeded_budget_fails_test(self):
+        with self.assertLogs('boiska.queries', 'WARNING'):
+            response = self.client.get(self.url)
+        with self.assertRaises(AssertionError):
+            self.assertWithinQueryBudget(response)
+
+
 class PlaceViewTest(TestCase, BasicViewTest):
 
     def setUp(self):
+        calendar_cache.clear()
         self.place_name = 'Kórnik OSIR'
         self.place = create_place(place_name=self.place_name)
         self.EMPTY = views.PlaceView.EMPTY
@@ -117,6 +175,106 @@ class PlaceViewTest(TestCase, BasicViewTest):
                 if day['month_day'] == today.day:
                     self.assertEqual(day['availability'], self.VERY_BUSY)
 
+    def test_availability_when_half_of_time_is_busy(self):
+        sports_grounds = create_sports_grounds(self.place, quantity=2)
+        sports_ground = sports_grounds[0]
+        today = datetime.datetime.today()
+        sports_ground.reservations.create(
+            start_time = sports_ground.opening_time,
+            end_time = sports_ground.closing_time,
+            event_date = today,
+            email = 'poprawny@strona.pl',
+            surname = 'Testowy',
+            is_accepted = True,
+        )
+        response = self.client.get(self.url)
+        calendar = response.context['calendar']
+        for week in calendar:
+            for day in week:
+                if day['month_day'] == today.day:
+                    self.assertEqual(day['availability'], self.BUSY)
+
+    def test_number_of_queries_does_not_depend_on_sports_grounds(self):
+        today = datetime.datetime.today()
+        for sports_ground in create_sports_grounds(self.place, quantity=5):
+            create_reservations(sports_ground, quantity=3, date=today)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    def test_calendar_is_cached(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertIn('calendar', response.context)
+
+    def test_cached_calendar_is_invalidated_by_accepted_reservation(self):
+        sports_ground = create_sports_ground(self.place)
+        self.client.get(self.url)
+        today = datetime.date.today()
+        sports_ground.reservations.create(
+            start_time = sports_ground.opening_time,
+            end_time = sports_ground.closing_time,
+            event_date = today,
+            email = 'poprawny@strona.pl',
+            surname = 'Testowy',
+            is_accepted = True,
+        )
+        response = self.client.get(self.url)
+        for week in response.context['calendar']:
+            for day in week:
+                if day['month_day'] == today.day:
+                    self.assertEqual(day['availability'], self.VERY_BUSY)
+
+    def test_calendar_built_before_change_is_not_served_after_it(self):
+        sports_ground = create_sports_ground(self.place)
+        today = datetime.date.today()
+        # read by a request which builds the calendar until after the commit
+        place = Place.objects.get()
+        sports_ground.reservations.create(
+            start_time = sports_ground.opening_time,
+            end_time = sports_ground.closing_time,
+            event_date = today,
+            email = 'poprawny@strona.pl',
+            surname = 'Testowy',
+            is_accepted = True,
+        )
+        calendar_cache.get_calendar(place, today.year, today.month, lambda: [])
+        response = self.client.get(self.url)
+        for week in response.context['calendar']:
+            for day in week:
+                if day['month_day'] == today.day:
+                    self.assertEqual(day['availability'], self.VERY_BUSY)
+
+    def test_cached_calendar_is_invalidated_by_new_sports_ground(self):
+        sports_ground = create_sports_ground(self.place)
+        today = datetime.date.today()
+        sports_ground.reservations.create(
+            start_time = sports_ground.opening_time,
+            end_time = sports_ground.closing_time,
+            event_date = today,
+            email = 'poprawny@strona.pl',
+            surname = 'Testowy',
+            is_accepted = True,
+        )
+        self.client.get(self.url)
+        create_sports_grounds(self.place, quantity=3)
+        response = self.client.get(self.url)
+        for week in response.context['calendar']:
+            for day in week:
+                if day['month_day'] == today.day:
+                    self.assertEqual(day['availability'], self.EMPTY)
+
+    def test_calendar_of_deleted_place_is_not_served_for_new_one(self):
+        today = datetime.date.today()
+        calendar_cache.get_calendar(self.place, today.year, today.month,
+            lambda: 'calendar of deleted place')
+        self.place.delete()
+        create_place(place_name=self.place_name,
+            place_administrator=self.place.administrator)
+        response = self.client.get(self.url)
+        self.assertNotEqual(response.context['calendar'],
+            'calendar of deleted place')
+
 
 class PlaceAdminViewTest(TestCase, BasicViewTest):
 
@@ -145,6 +303,138 @@ class PlaceAdminViewTest(TestCase, BasicViewTest):
         )
         self.assertEqual(len(reservations_in_context), actual_reservations.count())
 
+    def test_overlapping_reservations_in_one_batch_are_not_accepted(self):
+        sports_ground = create_sports_ground(self.place)
+        reservations = [
+            sports_ground.reservations.create(
+                start_time = datetime.time(start_hour),
+                end_time = datetime.time(start_hour + 2),
+                event_date = datetime.date(2016, 9, 23),
+                email = 'poprawny@strona.pl',
+                surname = 'Testowy',
+            )
+            for start_hour in (10, 11, 12)
+        ]
+        self.client.post(self.url, {
+            'action': Reservation.ACCEPT,
+            'reservations': [reservation.id for reservation in reservations],
+        })
+        accepted_reservations = sports_ground.reservations.filter(
+            is_accepted=True
+        ).order_by('start_time')
+        self.assertQuerysetEqual(
+            accepted_reservations,
+            [reservations[0].id, reservations[2].id],
+            transform=lambda reservation: reservation.id
+        )
+
+
+    def test_number_of_queries_does_not_depend_on_selected_reservations(self):
+        reservations = Reservation.objects.filter(sports_ground__place=self.place)
+        reservations_ids = list(reservations.values_list('id', flat=True))
+        queries_numbers = []
+        # one reservation is left, so that pending reservations of the day
+        # are classified again after both deletions
+        for selected_ids in (reservations_ids[:1], reservations_ids[1:-1]):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(self.url, {
+                    'action': Reservation.DELETE,
+                    'reservations': selected_ids,
+                })
+            queries_numbers.append(len(queries))
+        self.assertEqual(queries_numbers[0], queries_numbers[1])
+
+    def test_pending_reservations_are_paginated(self):
+        self.addCleanup(setattr, views.PlaceAdminView, 'reservations_per_page',
+            views.PlaceAdminView.reservations_per_page)
+        views.PlaceAdminView.reservations_per_page = 20
+        first_page = self.client.get(self.url)
+        self.assertEqual(first_page.context['reservations_not_accepted_count'], 30)
+        self.assertEqual(len(first_page.context['reservations_not_accepted']), 20)
+        next_page_key = first_page.context['next_page_key']
+        second_page = self.client.get(self.url, {'after': next_page_key})
+        self.assertEqual(len(second_page.context['reservations_not_accepted']), 10)
+        self.assertIsNone(second_page.context['next_page_key'])
+        reservations = (first_page.context['reservations_not_accepted']
+            + second_page.context['reservations_not_accepted'])
+        keys = [
+            (reservation.event_date, reservation.start_time, reservation.id)
+            for reservation in reservations
+        ]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), 30)
+
+    def test_pending_reservations_count_is_capped(self):
+        self.addCleanup(setattr, views.PlaceAdminView, 'max_counted_reservations',
+            views.PlaceAdminView.max_counted_reservations)
+        views.PlaceAdminView.max_counted_reservations = 30
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['reservations_not_accepted_count'], 30)
+        self.assertFalse(response.context['reservations_not_accepted_count_capped'])
+        views.PlaceAdminView.max_counted_reservations = 20
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['reservations_not_accepted_count'], 20)
+        self.assertTrue(response.context['reservations_not_accepted_count_capped'])
+        self.assertContains(response, '<span class="badge">20+</span>')
+
+    def test_pending_reservations_are_filtered_by_conflict(self):
+        free = Reservation.objects.filter(
+            sports_ground__place=self.place,
+            conflict=Reservation.FREE
+        )
+        response = self.client.get(self.url, {'conflict': Reservation.FREE})
+        self.assertEqual(
+            {reservation.id for reservation in response.context['reservations_not_accepted']},
+            set(free.values_list('id', flat=True))
+        )
+        self.assertEqual(
+            response.context['reservations_not_accepted_count'],
+            free.count()
+        )
+
+    def test_free_reservations_can_be_accepted_together(self):
+        free_ids = list(Reservation.objects.filter(
+            sports_ground__place=self.place,
+            conflict=Reservation.FREE
+        ).values_list('id', flat=True))
+        self.client.post(self.url, {
+            'action': Reservation.ACCEPT,
+            'reservations': free_ids,
+        })
+        self.assertEqual(
+            Reservation.objects.filter(id__in=free_ids, is_accepted=True).count(),
+            len(free_ids)
+        )
+        self.assertFalse(Reservation.objects.filter(
+            sports_ground__place=self.place,
+            is_accepted=False,
+            conflict=Reservation.FREE
+        ).exists())
+
+    def test_broken_page_key_shows_first_page(self):
+        response = self.client.get(self.url, {'after': 'broken'})
+        self.assertTrue(response.context['is_first_page'])
+
+    def test_number_of_queries_does_not_depend_on_pending_reservations(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        queries_number = len(queries)
+        for sports_ground in create_sports_grounds(self.place):
+            create_reservations(sports_ground, quantity=30)
+        with self.assertNumQueries(queries_number):
+            self.client.get(self.url)
+
+    def test_result_message_for_every_selected_reservation(self):
+        reservations = Reservation.objects.filter(sports_ground__place=self.place)
+        response = self.client.post(self.url, {
+            'action': Reservation.ACCEPT,
+            'reservations': list(reservations.values_list('id', flat=True)),
+        })
+        self.assertEqual(
+            len(response.context['result_messages']),
+            reservations.count()
+        )
+
 
 class PlaceDayViewTest(TestCase, BasicViewTest):
 
@@ -171,6 +461,35 @@ class PlaceDayViewTest(TestCase, BasicViewTest):
         response = self.client.get(self.url)
         self.assertIn('new_reservation_form', response.context)
 
+    def test_timeline_contains_accepted_reservations_of_the_day(self):
+        sports_ground = create_sports_ground(self.place)
+        event_date = datetime.date(2016, 9, 23)
+        for start_hour, is_accepted in ((12, True), (10, True), (14, False)):
+            sports_ground.reservations.create(
+                start_time = datetime.time(start_hour),
+                end_time = datetime.time(start_hour + 1),
+                event_date = event_date,
+                email = 'poprawny@strona.pl',
+                surname = 'Testowy',
+                is_accepted = is_accepted,
+            )
+        create_reservation(sports_ground, date=datetime.date(2016, 9, 24))
+        response = self.client.get(self.url)
+        timeline = response.context['timeline']
+        self.assertEqual(len(timeline), 1)
+        self.assertEqual(timeline[0]['sports_ground'], sports_ground)
+        start_times = [
+            reservation.start_time for reservation in timeline[0]['reservations']
+        ]
+        self.assertEqual(start_times, [datetime.time(10), datetime.time(12)])
+
+    def test_number_of_queries_does_not_depend_on_sports_grounds(self):
+        event_date = datetime.date(2016, 9, 23)
+        for sports_ground in create_sports_grounds(self.place, quantity=5):
+            create_reservations(sports_ground, quantity=3, date=event_date)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
     def test_incorrect_date_in_url_raises_404(self):
         url_with_incorrect_date = '/' + self.place_name + '/2016/02/31'
         response = self.client.get(url_with_incorrect_date)
@@ -202,6 +521,36 @@ class EditReservationViewTest(TestCase, BasicViewTest):
         self.expected_view_name = 'boiska:edit_reservation'
         self.expected_template = 'boiska/edit_reservation.html'
 
+    def test_overlapping_reservation_is_not_accepted(self):
+        accepted = create_reservation(self.sports_ground)
+        accepted.is_accepted = True
+        accepted.start_time = datetime.time(10)
+        accepted.end_time = datetime.time(12)
+        accepted.save()
+        response = self.client.post(self.url, {
+            'sports_ground': self.sports_ground.pk,
+            'start_time': '11:00',
+            'end_time': '13:00',
+            'is_accepted': True,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['edit_reservation_form'].non_field_errors())
+        self.reservation.refresh_from_db()
+        self.assertFalse(self.reservation.is_accepted)
+
+    def test_accepted_reservation_can_be_edited(self):
+        self.reservation.is_accepted = True
+        self.reservation.save()
+        response = self.client.post(self.url, {
+            'sports_ground': self.sports_ground.pk,
+            'start_time': '10:00',
+            'end_time': '11:00',
+            'is_accepted': True,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.start_time, datetime.time(10))
+
 
 class EditPlaceViewTest(TestCase, BasicViewTest):
 
@@ -211,3 +560,226 @@ class EditPlaceViewTest(TestCase, BasicViewTest):
         self.url = '/' + self.place_name + '/admin/edit_place'
         self.expected_view_name = 'boiska:edit_place'
         self.expected_template = 'boiska/edit_place.html'
+
+    def test_edition_keeps_revision_changed_meanwhile(self):
+        place = Place.objects.get()
+        # a reservation accepted while the form is being saved
+        Place.objects.filter(name=self.place_name).touch()
+        modified = Place.objects.get().modified
+        form = EditPlaceForm(instance=place, data={
+            'description': 'Nowy opis.',
+            'phone_number': '123321123',
+            'city': 'Władysławowo',
+            'street': 'Morska',
+        })
+        self.assertTrue(form.is_valid())
+        form.save()
+        place = Place.objects.get()
+        self.assertEqual(place.description, 'Nowy opis.')
+        self.assertEqual((place.revision, place.modified), (1, modified))
+
+
+class PlaceApiViewTest(TestCase, QueryBudgetTestMixin):
+
+    def setUp(self):
+        calendar_cache.clear()
+        self.place_name = 'Mosina'
+        self.place = create_place(place_name=self.place_name)
+        self.sports_ground = create_sports_ground(self.place)
+        self.month_url = '/api/' + self.place_name + '/2016/09'
+        self.day_url = self.month_url + '/23'
+
+    def accept_reservation_on(self, event_date):
+        reservation = create_reservation(self.sports_ground, date=event_date)
+        reservation.is_accepted = True
+        reservation.save()
+        return reservation
+
+    def test_urls_resolve_to_api_views(self):
+        self.assertEqual(resolve(self.month_url).view_name, 'boiska:api_place')
+        self.assertEqual(resolve(self.day_url).view_name, 'boiska:api_place_day')
+
+    def test_month_availability_as_json(self):
+        response = self.client.get(self.month_url)
+        data = response.json()
+        self.assertEqual(data['place'], self.place_name)
+        self.assertEqual((data['year'], data['month']), (2016, 9))
+        self.assertEqual(len(data['days']), 30)
+        self.assertEqual(data['days'][0], {'day': 1, 'availability': 0})
+
+    def test_day_timeline_as_json(self):
+        self.accept_reservation_on(datetime.date(2016, 9, 23))
+        response = self.client.get(self.day_url)
+        data = response.json()
+        self.assertEqual(data['date'], '2016-09-23')
+        self.assertEqual(len(data['sports_grounds']), 1)
+        reservations = data['sports_grounds'][0]['reservations']
+        self.assertEqual(len(reservations), 1)
+        self.assertNotIn('email', reservations[0])
+
+    def test_views_are_within_query_budget(self):
+        for url in (self.month_url, self.day_url):
+            self.assertWithinQueryBudget(self.client.get(url))
+
+    def test_unknown_place_raises_404(self):
+        response = self.client.get('/api/Nieistniejace/2016/09')
+        self.assertEqual(response.status_code, 404)
+
+    def test_day_view_does_not_accept_reservations(self):
+        response = self.client.post(self.day_url, {})
+        self.assertEqual(response.status_code, 405)
+
+    def test_matching_etag_returns_not_modified(self):
+        for url in (self.month_url, self.day_url):
+            response = self.client.get(url)
+            self.assertIn('ETag', response)
+            self.assertIn('Last-Modified', response)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_reservation_is_accepted(self):
+        etag = self.client.get(self.month_url)['ETag']
+        self.accept_reservation_on(datetime.date(2016, 9, 23))
+        response = self.client.get(self.month_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_does_not_change_after_new_pending_reservation(self):
+        etag = self.client.get(self.month_url)['ETag']
+        create_reservation(self.sports_ground, date=datetime.date(2016, 9, 23))
+        response = self.client.get(self.month_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class FreeSlotSearchApiViewTest(TestCase, QueryBudgetTestMixin):
+
+    def setUp(self):
+        self.place = create_place()
+        create_sports_grounds(self.place, quantity=2)
+        self.url = '/api/search'
+
+    def test_url_resolves_to_correct_view(self):
+        self.assertEqual(resolve(self.url).view_name, 'boiska:api_search')
+
+    def test_free_slots_as_json(self):
+        response = self.client.get(self.url, {
+            'city': 'Poznań',
+            'date_from': '2016-09-24',
+            'start_time': '18:00',
+            'end_time': '20:00',
+        })
+        data = response.json()
+        self.assertEqual(len(data['slots']), 2)
+        self.assertEqual(data['slots'][0]['date'], '2016-09-24')
+        self.assertEqual(data['slots'][0]['start_time'], '18:00')
+        self.assertFalse(data['truncated'])
+        self.assertWithinQueryBudget(response)
+
+    def test_results_are_limited(self):
+        response = self.client.get(self.url, {
+            'date_from': '2016-09-24',
+            'date_to': '2016-09-25',
+            'limit': 3,
+        })
+        data = response.json()
+        self.assertEqual(len(data['slots']), 3)
+        self.assertTrue(data['truncated'])
+
+    def test_invalid_query_returns_errors(self):
+        response = self.client.get(self.url, {
+            'date_from': '2016-09-24',
+            'date_to': '2016-09-20',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', response.json())
+
+
+@override_settings(BOISKA_INTAKE_THREAD=False, BOISKA_INTAKE_CACHE='default')
+class ReservationIntakeApiViewTest(TestCase):
+
+    def setUp(self):
+        self.place = create_place()
+        self.sports_ground = create_sports_ground(self.place)
+        self.url = '/api/' + self.place.name + '/2016/09/23/reservations'
+        self.form_data = {
+            'sports_ground': self.sports_ground.pk,
+            'start_time': '10:00',
+            'end_time': '11:00',
+            'email': 'mejl@mail.com',
+            'surname': 'Bananowy',
+        }
+
+    def test_url_resolves_to_correct_view(self):
+        self.assertEqual(resolve(self.url).view_name, 'boiska:api_reservations')
+
+    def test_reservation_is_queued_and_saved_later(self):
+        response = self.client.post(self.url, self.form_data)
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(Reservation.objects.exists())
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).json()['status'], 'queued')
+        intake.flush()
+        reservation = Reservation.objects.get()
+        self.assertEqual(reservation.event_date, datetime.date(2016, 9, 23))
+        self.assertFalse(reservation.is_accepted)
+        self.assertEqual(self.client.get(status_url).json()['status'], 'saved')
+
+    def test_queued_reservations_are_saved_in_one_batch(self):
+        queries_numbers = []
+        for quantity in (1, 5):
+            for _ in range(quantity):
+                self.client.post(self.url, self.form_data)
+            with CaptureQueriesContext(connection) as queries:
+                intake.flush()
+            queries_numbers.append(len(queries))
+        self.assertEqual(queries_numbers[0], queries_numbers[1])
+        self.assertEqual(Reservation.objects.count(), 6)
+
+    def test_failed_classification_leaves_reservations_saved(self):
+        response = self.client.post(self.url, self.form_data)
+        with mock.patch.object(conflicts, 'classify_days',
+                side_effect=DatabaseError), self.assertLogs('boiska.intake'):
+            intake.flush()
+        self.assertTrue(Reservation.objects.exists())
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).json()['status'], 'saved')
+
+    def test_sports_ground_of_other_place_is_rejected(self):
+        other_place = create_place(
+            place_name='Gniezno',
+            place_administrator=self.place.administrator
+        )
+        self.form_data['sports_ground'] = create_sports_ground(other_place).pk
+        response = self.client.post(self.url, self.form_data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('sports_ground', response.json()['errors'])
+
+    def test_api_clients_need_no_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.post(self.url, self.form_data)
+        self.assertEqual(response.status_code, 202)
+        intake.flush()
+
+    def test_get_is_not_allowed(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_unknown_token_raises_404(self):
+        response = self.client.get('/api/intake/' + '0' * 32)
+        self.assertEqual(response.status_code, 404)
+
+    def test_process_local_cache_is_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            intake.check_cache()
+        with self.settings(BOISKA_INTAKE_CACHE='intake'):
+            intake.check_cache()
+
+    @mock.patch.object(intake, 'worker', None)
+    @mock.patch.object(intake, 'flush_registered', False)
+    @mock.patch('boiska.intake.atexit.register')
+    @mock.patch('boiska.intake.threading.Thread')
+    def test_flush_is_registered_once(self, thread, register):
+        thread.return_value.is_alive.return_value = False
+        intake.start_worker()
+        intake.start_worker()
+        self.assertEqual(thread.return_value.start.call_count, 2)
+        register.assert_called_once_with(intake.flush)
@@ -6,6 +6,35 @@ urlpatterns = [
     url(r'^$', views.IndexView.as_view(),
         name='index'
     ),
+    url(r'^api/(?P<place_name>[\w ]+)/'
+        r'(?P<year>\d{4})/'
+        r'(?P<month>\d\d?)/'
+        r'(?P<day>\d\d?)/'
+        r'reservations$',
+        views.ReservationIntakeApiView.as_view(),
+        name='api_reservations'
+    ),
+    url(r'^api/intake/(?P<token>[0-9a-f]{32})$',
+        views.ReservationIntakeStatusApiView.as_view(),
+        name='api_intake_status'
+    ),
+    url(r'^api/search$',
+        views.FreeSlotSearchApiView.as_view(),
+        name='api_search'
+    ),
+    url(r'^api/(?P<place_name>[\w ]+)/'
+        r'(?P<year>\d{4})/'
+        r'(?P<month>\d\d?)$',
+        views.PlaceAvailabilityApiView.as_view(),
+        name='api_place'
+    ),
+    url(r'^api/(?P<place_name>[\w ]+)/'
+        r'(?P<year>\d{4})/'
+        r'(?P<month>\d\d?)/'
+        r'(?P<day>\d\d?)$',
+        views.PlaceDayApiView.as_view(),
+        name='api_place_day'
+    ),
     url(r'^(?P<place_name>[\w ]+)$',
         views.PlaceView.as_view(),
         name='place'
@@ -28,6 +57,26 @@ urlpatterns = [
         views.PlaceAdminView.as_view(),
         name='place_admin'
     ),
+    url(r'(?P<place_name>[\w ]+)/'
+        r'admin/report$',
+        views.PlaceReportView.as_view(),
+        name='place_report'
+    ),
+    url(r'(?P<place_name>[\w ]+)/'
+        r'admin/report\.csv$',
+        views.PlaceReportCsvView.as_view(),
+        name='place_report_csv'
+    ),
+    url(r'(?P<place_name>[\w ]+)/'
+        r'admin/export$',
+        views.PlaceExportView.as_view(),
+        name='place_export'
+    ),
+    url(r'(?P<place_name>[\w ]+)/'
+        r'admin/import$',
+        views.PlaceImportView.as_view(),
+        name='place_import'
+    ),
     url(r'(?P<place_name>[\w ]+)/'
         r'admin/edit_reservation/'
         r'(?P<reservation_id>\d+)$',
@@ -1,15 +1,26 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView
 from django.views import View
-from django.http import Http404
+from django.http import (Http404, HttpResponse, HttpResponseBadRequest,
+    JsonResponse, StreamingHttpResponse)
 from django.urls import reverse
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
 
+import csv
 import datetime
 from calendar import Calendar
 
+from . import (availability, calendar_cache, conflicts, export, hours,
+    imports, intake, locks, reports, routers, shards)
+from .intervals import ReservationIndex
 from .models import Place, Reservation
 from .forms import (NewReservationForm, ManageReservationsForm,
-    EditReservationForm, EditPlaceForm)
+    EditReservationForm, EditPlaceForm, FreeSlotSearchForm, ReportForm,
+    ExportForm, ImportForm)
 
 
 class IndexView(ListView):
@@ -18,6 +29,12 @@ class IndexView(ListView):
     """
     model = Place
     template_name = 'boiska/index.html'
+    context_object_name = 'place_list'
+
+    def get_queryset(self):
+        if shards.enabled():
+            return shards.all_places()
+        return super(IndexView, self).get_queryset()
 
 
 class PlaceView(View):
@@ -26,9 +43,10 @@ class PlaceView(View):
     Calendar showing availability of sports grounds.
     """
 
-    EMPTY = 0
-    BUSY = 1
-    VERY_BUSY = 2
+    EMPTY = availability.EMPTY
+    BUSY = availability.BUSY
+    VERY_BUSY = availability.VERY_BUSY
+    CLOSED = availability.CLOSED
 
     template_name = 'boiska/place.html'
 
@@ -90,7 +108,19 @@ class PlaceView(View):
     def availability_calendar(self):
         """
         Availability calendar returns a list of week lists.
+        Calendars are cached until the revision of the place changes.
         """
+        return calendar_cache.get_calendar(
+            self.place,
+            self.year,
+            self.month,
+            self.build_availability_calendar
+        )
+
+    def build_availability_calendar(self):
+        month_availability = availability.month_availability(
+            self.place, self.year, self.month
+        )
         my_calendar = []
         for day in Calendar().itermonthdays2(self.year, self.month):
             day_dict = {
@@ -101,42 +131,10 @@ class PlaceView(View):
             if day_dict['week_day'] == 0:
                 my_calendar.append([])
             if day_dict['month_day'] != 0:
-                day_dict['availability'] = self.check_availability(day_dict['month_day'])
+                day_dict['availability'] = month_availability[day_dict['month_day']]
             my_calendar[-1].append(day_dict)
         return my_calendar
 
-    def check_availability(self, month_day):
-        """
-        Check availability of place's sports grounds on a particuar day.
-        """
-        event_date = datetime.date(self.year, self.month, month_day)
-        time_sum = datetime.timedelta()
-        total = datetime.timedelta()
-        today = datetime.date.today()
-
-        for sports_ground in self.place.sports_grounds.all():
-            reservations = sports_ground.reservations.filter(
-                event_date=event_date,
-                is_accepted=True
-            )
-            for reservation in reservations:
-                start_time = datetime.datetime.combine(today, reservation.start_time)
-                end_time = datetime.datetime.combine(today, reservation.end_time)
-                time_sum += end_time - start_time
-            opening_time = datetime.datetime.combine(today, sports_ground.opening_time)
-            closing_time = datetime.datetime.combine(today, sports_ground.closing_time)
-            total += closing_time - opening_time
-
-        if total == datetime.timedelta():
-            return self.EMPTY
-        result = time_sum / total
-        if result > 0.6:
-            return self.VERY_BUSY
-        elif result > 0.3:
-            return self.BUSY
-        else:
-            return self.EMPTY
-
 
 class PlaceDayView(View):
     """
@@ -149,23 +147,27 @@ class PlaceDayView(View):
 
     def get(self, request, place_name, year, month, day):
         self.initial_settings(place_name, year, month, day)
-        self.prepare_context()
         if not self.is_date_valid():
             raise Http404
+        self.prepare_context()
         new_reservation_form = NewReservationForm(self.place)
         self.context['new_reservation_form'] = new_reservation_form
         return render(request, self.template_name, self.context)
 
     def post(self, request, place_name, year, month, day):
         self.initial_settings(place_name, year, month, day)
-        self.prepare_context()
         if not self.is_date_valid():
             raise Http404
+        self.prepare_context()
         self.context['result_message'] = None
-        new_reservation_form = NewReservationForm(data=request.POST)
+        new_reservation_form = NewReservationForm(
+            self.place,
+            data=request.POST,
+            event_date=self.event_date
+        )
         if new_reservation_form.is_valid():
             reservation = new_reservation_form.save(commit=False)
-            reservation.event_date = datetime.date(self.year, self.month, self.day)
+            reservation.event_date = self.event_date
             reservation.save()
             self.context['result_message'] = 'Twoja rezerwacja czeka na akceptację.'
         else:
@@ -185,25 +187,234 @@ class PlaceDayView(View):
         self.context = {
             'place_name': self.place_name,
             'date': str(self.year) + '/' + str(self.month) + '/' + str(self.day),
+            'event_date': self.event_date,
             'sports_grounds': self.sports_grounds,
+            'timeline': self.day_timeline(),
             'new_reservation_form': None,
             'result_message': None,
         }
 
+    def day_timeline(self):
+        """
+        List of sports grounds with their accepted reservations sorted
+        by start time. Reservations of all sports grounds are fetched
+        with a single query.
+        """
+        reservations = Reservation.objects.filter(
+            event_date=self.event_date,
+            is_accepted=True
+        ).order_by('start_time')
+        sports_grounds = self.sports_grounds.prefetch_related(
+            Prefetch(
+                'reservations',
+                queryset=reservations,
+                to_attr='day_reservations'
+            )
+        )
+        timeline = []
+        for sports_ground in sports_grounds:
+            opening_hours = hours.for_sports_ground(sports_ground).times_on(
+                self.event_date)
+            timeline.append({
+                'sports_ground': sports_ground,
+                # opening and closing time, None if closed on that day
+                'opening_hours': opening_hours,
+                'reservations': sports_ground.day_reservations,
+            })
+        return timeline
+
     def is_date_valid(self):
         try:
-            datetime.date(self.year, self.month, self.day)
+            self.event_date = datetime.date(self.year, self.month, self.day)
             return True
         except:
             return False
 
 
+def place_revision(request, place_name, **kwargs):
+    """
+    Revision and modification time of a place, fetched once per request.
+    """
+    if not hasattr(request, 'place_revision'):
+        request.place_revision = Place.objects.filter(
+            name=place_name
+        ).values_list('revision', 'modified').first()
+    return request.place_revision
+
+
+def place_etag(request, place_name, **kwargs):
+    revision = place_revision(request, place_name)
+    if revision is not None:
+        revision_number, modified = revision
+        # modification time tells apart places recreated with the same name
+        return '%s-%d' % (modified.strftime('%Y%m%d%H%M%S%f'), revision_number)
+
+
+def place_last_modified(request, place_name, **kwargs):
+    revision = place_revision(request, place_name)
+    if revision is not None:
+        return revision[1]
+
+
+conditional_on_place = method_decorator(
+    condition(etag_func=place_etag, last_modified_func=place_last_modified),
+    name='get'
+)
+
+
+@conditional_on_place
+class PlaceAvailabilityApiView(PlaceView):
+    """
+    Availability of place's sports grounds in a month as JSON.
+    Clients get 304 Not Modified until availability of the place changes.
+    """
+
+    def get(self, request, place_name, year, month):
+        self.place = get_object_or_404(Place, name=place_name)
+        self.place_name = place_name
+        self.year = year
+        self.month = month
+        self.prepare_and_check_year_month()
+        days = [
+            {'day': day['month_day'], 'availability': day['availability']}
+            for week in self.availability_calendar()
+            for day in week
+            if day['month_day'] != 0
+        ]
+        return JsonResponse({
+            'place': self.place.name,
+            'year': self.year,
+            'month': self.month,
+            'days': days,
+        })
+
+
+def format_time(opening_hours, index):
+    if opening_hours is None:
+        return None
+    return opening_hours[index].strftime('%H:%M')
+
+
+@conditional_on_place
+class PlaceDayApiView(PlaceDayView):
+    """
+    Accepted reservations of place's sports grounds on a particular day
+    as JSON. Clients get 304 Not Modified until availability of the place
+    changes.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, place_name, year, month, day):
+        self.initial_settings(place_name, year, month, day)
+        if not self.is_date_valid():
+            raise Http404
+        sports_grounds = [
+            {
+                'id': slot['sports_ground'].id,
+                'name': slot['sports_ground'].local_name(),
+                'opening_time': format_time(slot['opening_hours'], 0),
+                'closing_time': format_time(slot['opening_hours'], 1),
+                'reservations': [
+                    {
+                        'start_time': reservation.start_time.strftime('%H:%M'),
+                        'end_time': reservation.end_time.strftime('%H:%M'),
+                    }
+                    for reservation in slot['reservations']
+                ],
+            }
+            for slot in self.day_timeline()
+        ]
+        return JsonResponse({
+            'place': self.place.name,
+            'date': self.event_date.isoformat(),
+            'sports_grounds': sports_grounds,
+        })
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ReservationIntakeApiView(PlaceDayView):
+    """
+    Reservation of a sports ground on a particular day which is validated
+    and queued without waiting for the database, see boiska.intake.
+    Response contains URL of the reservation status. Posted by clients
+    of the API, which have no CSRF token.
+    """
+
+    http_method_names = ['post', 'options']
+
+    def post(self, request, place_name, year, month, day):
+        self.initial_settings(place_name, year, month, day)
+        if not self.is_date_valid():
+            raise Http404
+        new_reservation_form = NewReservationForm(
+            self.place,
+            data=request.POST,
+            event_date=self.event_date
+        )
+        if not new_reservation_form.is_valid():
+            return JsonResponse({'errors': new_reservation_form.errors}, status=400)
+        reservation = new_reservation_form.save(commit=False)
+        reservation.event_date = self.event_date
+        token = intake.enqueue(reservation)
+        return JsonResponse(
+            {
+                'status': intake.QUEUED,
+                'status_url': reverse('boiska:api_intake_status', args=[token]),
+            },
+            status=202
+        )
+
+
+class ReservationIntakeStatusApiView(View):
+    """
+    Status of a reservation queued by ReservationIntakeApiView.
+    """
+
+    def get(self, request, token):
+        status = intake.get_status(token)
+        if status is None:
+            raise Http404
+        return JsonResponse(status)
+
+
+class FreeSlotSearchApiView(View):
+    """
+    Free time on sports grounds of all places as JSON, for example
+    ?city=Poznań&date_from=2016-09-24&start_time=18:00&end_time=20:00
+    """
+    DEFAULT_LIMIT = 100
+
+    def get(self, request):
+        form = FreeSlotSearchForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        limit = form.cleaned_data['limit'] or self.DEFAULT_LIMIT
+        slots = []
+        truncated = False
+        for slot in shards.free_slots(**form.search_arguments()):
+            if len(slots) == limit:
+                truncated = True
+                break
+            slots.append({
+                'place': slot['place'],
+                'sports_ground': slot['sports_ground'],
+                'sports_ground_name': slot['sports_ground_name'],
+                'date': slot['date'].isoformat(),
+                'start_time': slot['start_time'].strftime('%H:%M'),
+                'end_time': slot['end_time'].strftime('%H:%M'),
+            })
+        return JsonResponse({'slots': slots, 'truncated': truncated})
+
+
 class PlaceAdminView(View):
     """
     Administrative panel for a Place administrator.
     """
 
     template_name = 'boiska/place_admin.html'
+    reservations_per_page = 50
+    max_counted_reservations = 500
 
     def get(self, request, place_name):
         self.initial_settings(place_name)
@@ -216,7 +427,6 @@ class PlaceAdminView(View):
     def post(self, request, place_name):
         self.initial_settings(place_name)
         self.prepare_context()
-        self.prepare_reservations_not_accepted()
         manage_reservations_form = ManageReservationsForm(
             self.place,
             data=request.POST
@@ -229,67 +439,302 @@ class PlaceAdminView(View):
             )
             action = int(request.POST['action'])
             self.apply_action_to_selected_reservations(reservations, action)
+        self.prepare_reservations_not_accepted()
         return render(request, self.template_name, self.context)
 
     def initial_settings(self, place_name):
         self.place = get_object_or_404(Place, name=place_name)
-        self.sports_grounds = self.place.sports_grounds.all()
+        self.sports_grounds = self.place.sports_grounds.select_related('place')
+        self.after = self.parse_page_key(self.request.GET.get('after'))
+        self.conflict = self.parse_conflict(self.request.GET.get('conflict'))
 
     def prepare_context(self):
         self.context = {
             'place': self.place,
             'sports_grounds': self.sports_grounds,
             'reservations_not_accepted': None,
+            'reservations_not_accepted_count': None,
+            'reservations_not_accepted_count_capped': False,
+            'next_page_key': None,
+            'is_first_page': self.after is None,
+            'conflict_filter': self.conflict,
+            'conflict_choices': Reservation.CONFLICT_CHOICES,
             'manage_reservations_form': None,
             'result_messages': None,
         }
 
     def prepare_reservations_not_accepted(self):
-        reservations_not_accepted = []
-        for sports_ground in self.sports_grounds:
-            for reservation in sports_ground.reservations.filter(is_accepted=False):
-                reservations_not_accepted.append(reservation)
-        self.context['reservations_not_accepted'] = reservations_not_accepted
+        """
+        One page of reservations waiting for acceptance, sorted by date.
+        Pages are selected by the key of the last reservation of previous
+        page instead of an offset, so every page costs the same. Counting
+        stops at max_counted_reservations, so a long backlog isn't counted
+        on every page.
+        """
+        reservations = Reservation.objects.filter(
+            sports_ground__place=self.place,
+            is_accepted=False
+        )
+        if self.conflict is not None:
+            reservations = reservations.filter(conflict=self.conflict)
+        page = reservations.select_related('sports_ground__place').order_by(
+            'event_date', 'start_time', 'id'
+        )
+        if self.after is not None:
+            event_date, start_time, reservation_id = self.after
+            page = page.filter(
+                Q(event_date__gt=event_date)
+                | Q(event_date=event_date, start_time__gt=start_time)
+                | Q(event_date=event_date, start_time=start_time,
+                    id__gt=reservation_id)
+            )
+        page = list(page[:self.reservations_per_page + 1])
+        if len(page) > self.reservations_per_page:
+            page = page[:self.reservations_per_page]
+            self.context['next_page_key'] = self.page_key(page[-1])
+        self.context['reservations_not_accepted'] = page
+        count = reservations[:self.max_counted_reservations + 1].count()
+        if count > self.max_counted_reservations:
+            count = self.max_counted_reservations
+            self.context['reservations_not_accepted_count_capped'] = True
+        self.context['reservations_not_accepted_count'] = count
+
+    @staticmethod
+    def page_key(reservation):
+        return '%s_%s_%d' % (
+            reservation.event_date.isoformat(),
+            reservation.start_time.strftime('%H:%M:%S'),
+            reservation.id
+        )
+
+    @staticmethod
+    def parse_page_key(page_key):
+        """
+        Turn key made by page_key() back into (date, time, id).
+        Broken keys point at the first page.
+        """
+        try:
+            event_date, start_time, reservation_id = page_key.split('_')
+            return (
+                datetime.datetime.strptime(event_date, '%Y-%m-%d').date(),
+                datetime.datetime.strptime(start_time, '%H:%M:%S').time(),
+                int(reservation_id),
+            )
+        except (AttributeError, ValueError):
+            return None
+
+    @staticmethod
+    def parse_conflict(conflict):
+        """
+        Conflict status used to filter pending reservations, None shows
+        all of them.
+        """
+        try:
+            conflict = int(conflict)
+        except (TypeError, ValueError):
+            return None
+        if conflict in dict(Reservation.CONFLICT_CHOICES):
+            return conflict
+        return None
 
     def apply_action_to_selected_reservations(self, reservations, action):
+        """
+        Accept or delete selected reservations with one UPDATE or DELETE
+        statement. Sports grounds and places are fetched together with
+        reservations because they are needed for result messages.
+        """
+        reservations = reservations.select_related('sports_ground__place')
+        # days are read before the transaction, SQLite can't take
+        # the write lock in a transaction which has already read
+        days = set(reservations.values_list('sports_ground', 'event_date'))
         result_messages = []
-        for reservation in reservations:
+        with transaction.atomic(using=routers.place_database()):
             if action == Reservation.ACCEPT:
-                overlap = self.reservation_overlap(reservation)
-                if overlap == False:
-                    reservation.is_accepted = True
-                    reservation.save()
-                    result_messages.append(
-                        'Zaakceptowano: ' + str(reservation)
-                    )
-                else:
-                    result_messages.append(
-                        'Rezerwacja nachodzi na inną: ' + str(reservation)
-                    )
+                result_messages = self.accept_reservations(reservations, days)
             elif action == Reservation.DELETE:
-                reservation.delete()
-                result_messages.append('Usunięto: ' + str(reservation))
+                result_messages = self.delete_reservations(list(reservations))
         self.context['result_messages'] = result_messages
 
-    def reservation_overlap(self, reservation):
+    def accept_reservations(self, reservations, days):
+        result_messages = []
+        # reservations accepted or moved concurrently by another
+        # administrator are seen only after the lock is taken
+        reservations = locks.lock_reservations(reservations, days)
+        accepted_reservations = ReservationIndex(reservations)
+        newly_accepted = []
+        for reservation in reservations:
+            overlap = self.reservation_overlap(reservation, accepted_reservations)
+            if overlap == False:
+                reservation.is_accepted = True
+                accepted_reservations.add(reservation)
+                newly_accepted.append(reservation)
+                result_messages.append('Zaakceptowano: ' + str(reservation))
+            else:
+                result_messages.append(
+                    'Rezerwacja nachodzi na inną: ' + str(reservation)
+                )
+        Reservation.objects.filter(
+            id__in=[reservation.id for reservation in newly_accepted]
+        ).update(is_accepted=True)
+        # update() doesn't send post_save signals
+        changed_days = {
+            availability.occupancy_key(reservation)
+            for reservation in newly_accepted
+        }
+        availability.reservations_changed(changed_days)
+        conflicts.classify_days(changed_days)
+        return result_messages
+
+    def delete_reservations(self, reservations):
+        result_messages = [
+            'Usunięto: ' + str(reservation) for reservation in reservations
+        ]
+        with conflicts.deferred():
+            Reservation.objects.filter(
+                id__in=[reservation.id for reservation in reservations]
+            ).delete()
+        return result_messages
+
+    def reservation_overlap(self, reservation, accepted_reservations):
         """
         Check if a reservation can be accepted. If addition of a new reservation
-        causes an overlap, it can't be aaccepted.
+        causes an overlap, it can't be aaccepted. Accepted reservations
+        are given as a ReservationIndex built once for the whole batch.
         """
-        event_date = reservation.event_date
-        accepted_reservations = Reservation.objects.filter(
-            sports_ground=reservation.sports_ground,
-            event_date=event_date,
-            is_accepted=True
+        return accepted_reservations.overlaps(reservation)
+
+
+class PlaceReportView(View):
+    """
+    Utilization of sports grounds of a place per weekday and hour of day
+    for a Place administrator. Reports need NumPy.
+    """
+
+    template_name = 'boiska/place_report.html'
+
+    def get(self, request, place_name):
+        self.place = self.get_place(place_name)
+        self.context = {
+            'place': self.place,
+            'report_form': ReportForm(request.GET or None),
+            'report': None,
+            'numpy_available': reports.NUMPY_AVAILABLE,
+        }
+        if reports.NUMPY_AVAILABLE and self.is_period_valid():
+            self.context['report'] = reports.UtilizationReport(
+                self.place,
+                self.date_from,
+                self.date_to
+            )
+            self.context['date_from'] = self.date_from
+            self.context['date_to'] = self.date_to
+        return render(request, self.template_name, self.context)
+
+    def is_period_valid(self):
+        report_form = self.context['report_form']
+        if report_form.is_bound and not report_form.is_valid():
+            return False
+        default_from, default_to = reports.default_period(
+            self.place.sports_grounds.all()
+        )
+        cleaned_data = report_form.cleaned_data if report_form.is_bound else {}
+        self.date_from = cleaned_data.get('date_from') or default_from
+        self.date_to = cleaned_data.get('date_to') or default_to
+        return self.date_from <= self.date_to
+
+    def get_place(self, place_name):
+        # sports grounds are needed by the default period and by the report
+        return get_object_or_404(
+            Place.objects.prefetch_related('sports_grounds'),
+            name=place_name
+        )
+
+
+class PlaceReportCsvView(PlaceReportView):
+    """
+    Utilization report as a CSV file with a row for every sports ground,
+    weekday and hour of day.
+    """
+
+    def get(self, request, place_name):
+        if not reports.NUMPY_AVAILABLE:
+            return HttpResponse('Raporty wymagają biblioteki NumPy.', status=501)
+        self.place = self.get_place(place_name)
+        self.context = {'report_form': ReportForm(request.GET or None)}
+        if not self.is_period_valid():
+            return HttpResponseBadRequest('Nieprawidłowy zakres dat.')
+        report = reports.UtilizationReport(self.place, self.date_from, self.date_to)
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="report_%s_%s.csv"' % (
+            self.date_from.isoformat(), self.date_to.isoformat())
+        csv.writer(response).writerows(report.csv_rows())
+        return response
+
+
+class PlaceExportView(View):
+    """
+    Reservations of a place as CSV or NDJSON, streamed while they are read
+    from the database.
+    """
+
+    def get(self, request, place_name):
+        place = get_object_or_404(Place, name=place_name)
+        export_form = ExportForm(request.GET)
+        if not export_form.is_valid():
+            return HttpResponseBadRequest('Nieprawidłowe parametry eksportu.')
+        data = export_form.cleaned_data
+        reservations = export.reservations(
+            place,
+            date_from=data['date_from'],
+            date_to=data['date_to'],
+            status=data['status']
+        )
+        content_type = export.FORMATS[data['format']][0]
+        response = StreamingHttpResponse(
+            export.export_lines(reservations, data['format']),
+            content_type=content_type
         )
-        lower_bound_a = reservation.start_time
-        upper_bound_a = reservation.end_time
-        for accepted_reservation in accepted_reservations:
-            lower_bound_b = accepted_reservation.start_time
-            upper_bound_b = accepted_reservation.end_time
-            if lower_bound_a < upper_bound_b and lower_bound_b < upper_bound_a:
-                return True
-        return False
+        response['Content-Disposition'] = (
+            'attachment; filename="reservations.%s"' % data['format'])
+        return response
+
+
+class PlaceImportView(View):
+    """
+    Upload of a CSV or NDJSON file with reservations of a place. Rejected
+    rows are listed with their line numbers, at most shown_errors of them.
+    """
+
+    template_name = 'boiska/place_import.html'
+    shown_errors = 100
+
+    def get(self, request, place_name):
+        place = get_object_or_404(Place, name=place_name)
+        context = {
+            'place': place,
+            'import_form': ImportForm(),
+        }
+        return render(request, self.template_name, context)
+
+    def post(self, request, place_name):
+        place = get_object_or_404(Place, name=place_name)
+        import_form = ImportForm(data=request.POST, files=request.FILES)
+        context = {
+            'place': place,
+            'import_form': import_form,
+        }
+        if import_form.is_valid():
+            reservation_import = imports.ReservationImport(place)
+            read = imports.READERS[import_form.cleaned_data['format']]
+            try:
+                reservation_import.run(
+                    read(imports.decode_lines(import_form.cleaned_data['file']))
+                )
+            except UnicodeDecodeError:
+                import_form.add_error('file', 'Plik musi być zapisany w UTF-8.')
+            context['reservation_import'] = reservation_import
+            context['errors'] = reservation_import.errors[:self.shown_errors]
+        return render(request, self.template_name, context)
 
 
 class EditReservationView(View):
@@ -316,16 +761,72 @@ class EditReservationView(View):
             data=request.POST
         )
         self.prepare_context()
+        previous_day = availability.occupancy_key(self.reservation)
         if self.edit_reservation_form.is_valid():
-            self.edit_reservation_form.save()
+            with transaction.atomic(using=routers.place_database()):
+                current_day = availability.occupancy_key(self.reservation)
+                locked = {previous_day, current_day}
+                # the reservation may have been changed since it was read,
+                # it is read and validated again under the lock
+                reservations = locks.lock_reservations(
+                    self.get_queryset(place_name).filter(id=reservation_id),
+                    locked
+                )
+                if not reservations:
+                    raise Http404
+                self.reservation = reservations[0]
+                previous_day = availability.occupancy_key(self.reservation)
+                self.edit_reservation_form = EditReservationForm(
+                    instance=self.reservation,
+                    place=self.place,
+                    data=request.POST
+                )
+                self.prepare_context()
+                if not self.edit_reservation_form.is_valid():
+                    return render(request, self.template_name, self.context)
+                current_day = availability.occupancy_key(self.reservation)
+                if current_day not in locked | {previous_day}:
+                    locks.lock_days([current_day])
+                if self.reservation.is_accepted and self.overlaps_accepted():
+                    self.edit_reservation_form.add_error(
+                        None,
+                        'Rezerwacja nachodzi na inną.'
+                    )
+                    return render(request, self.template_name, self.context)
+                self.edit_reservation_form.save()
+            if previous_day != current_day:
+                # signals only know the day the reservation was moved to
+                availability.reservations_changed([previous_day])
+                conflicts.classify_days([previous_day])
             return redirect('boiska:place_admin', place_name)
         return render(request, self.template_name, self.context)
 
+    def overlaps_accepted(self):
+        """
+        Check if edited reservation overlaps other accepted reservations.
+        """
+        return Reservation.objects.filter(
+            sports_ground=self.reservation.sports_ground_id,
+            event_date=self.reservation.event_date,
+            is_accepted=True,
+            start_time__lt=self.reservation.end_time,
+            end_time__gt=self.reservation.start_time
+        ).exclude(id=self.reservation.id).exists()
+
     def initial_settings(self, place_name, reservation_id):
-        self.reservation = Reservation.objects.get(id=reservation_id)
+        self.reservation = get_object_or_404(
+            self.get_queryset(place_name),
+            id=reservation_id
+        )
         self.place = self.reservation.sports_ground.place
         self.place_name = place_name
 
+    @staticmethod
+    def get_queryset(place_name):
+        return Reservation.objects.select_related('sports_ground__place').filter(
+            sports_ground__place=place_name
+        )
+
     def prepare_context(self):
         self.context = {
             'edit_reservation_form': self.edit_reservation_form,
@@ -339,7 +840,7 @@ class EditPlaceView(View):
     template_name = 'boiska/edit_place.html'
 
     def get(self, request, place_name):
-        place = Place.objects.get(name=place_name)
+        place = get_object_or_404(Place, name=place_name)
         edit_place_form = EditPlaceForm(instance=place)
         context = {
             'edit_place_form': edit_place_form,
@@ -348,7 +849,7 @@ class EditPlaceView(View):
         return render(request, self.template_name, context)
 
     def post(self, request, place_name):
-        place = Place.objects.get(name=place_name)
+        place = get_object_or_404(Place, name=place_name)
         edit_place_form = EditPlaceForm(instance=place, data=request.POST)
         if edit_place_form.is_valid():
             edit_place_form.save()
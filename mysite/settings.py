@@ -41,17 +41,46 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'boiska.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'boiska.middleware.ReplicaMiddleware',
+    'boiska.middleware.ShardMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'mysite.urls'
 
+# Maximum number of queries of GET requests to boiska views. Requests over
+# the budget are logged and fail tests using QueryBudgetTestMixin.
+# Queries of streaming responses run after the view returns and aren't counted.
+# Views of all places run their queries once for every shard in use.
+# Reads of the shard directory, cached for BOISKA_SHARD_DIRECTORY_TIMEOUT
+# seconds, don't count.
+BOISKA_QUERY_BUDGETS = {
+    'boiska:index': 1,
+    'boiska:place': 3,
+    'boiska:place_day': 4,
+    'boiska:edit_reservation': 4,
+    'boiska:place_admin': 4,
+    'boiska:place_report': 4,
+    'boiska:place_report_csv': 4,
+    'boiska:place_export': 1,
+    'boiska:place_import': 1,
+    'boiska:edit_place': 1,
+    'boiska:api_place': 4,
+    'boiska:api_place_day': 4,
+    'boiska:api_search': 2,
+    'boiska:api_intake_status': 0,
+}
+
+# Log queries statistics of every request as JSON
+BOISKA_QUERY_LOG = False
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -81,6 +110,119 @@ DATABASES = {
     }
 }
 
+# Optional read replica, a copy of the database which may lag behind it.
+# Locally it can be a second SQLite file refreshed with
+# 'manage.py sync_replica --interval 5'. Public views listed
+# in BOISKA_REPLICA_VIEWS read from it, see boiska.routers.
+if os.environ.get('BOISKA_REPLICA_DATABASE'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BOISKA_REPLICA_DATABASE'],
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+    BOISKA_READ_REPLICA = 'replica'
+else:
+    BOISKA_READ_REPLICA = None
+
+# Optional shards, databases holding places together with their sports
+# grounds and reservations, see boiska.shards. Places are created in the
+# default database and moved with 'manage.py move_place'. Locally shards
+# can be SQLite files, for example
+# BOISKA_SHARD_DATABASES=/tmp/shard1.sqlite3,/tmp/shard2.sqlite3
+BOISKA_SHARDS = ['default']
+for number, name in enumerate(
+        filter(None, os.environ.get('BOISKA_SHARD_DATABASES', '').split(',')), 1):
+    alias = 'shard%d' % number
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+    }
+    BOISKA_SHARDS.append(alias)
+
+DATABASE_ROUTERS = [
+    'boiska.routers.ShardRouter',
+    'boiska.routers.ReplicaRouter',
+]
+
+BOISKA_REPLICA_VIEWS = (
+    'boiska:index',
+    'boiska:place',
+    'boiska:place_day',
+    'boiska:api_place',
+    'boiska:api_place_day',
+    'boiska:api_search',
+)
+BOISKA_REPLICA_STICKY_SECONDS = 15
+
+# PRAGMAs run on every new SQLite connection, see boiska.sqlite.
+# In WAL mode readers don't wait for the writer and NORMAL synchronous mode
+# syncs the disk only at checkpoints. Writers wait busy_timeout ms for
+# the lock instead of failing with "database is locked". Negative
+# cache_size is in KiB, mmap_size in bytes. Set to {} to use SQLite defaults.
+BOISKA_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10000,
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/1.10/topics/cache/
+
+# Availability calendars may be kept in any cache backend, for example
+# 'django.core.cache.backends.filebased.FileBasedCache' or a Redis backend.
+# It doesn't have to be shared by processes, keys contain revisions
+# of places; the timeout only limits how long unused entries are kept.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'calendar': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'calendar',
+        'TIMEOUT': 10 * 60,
+    },
+    'intake': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'intake'),
+    },
+}
+
+BOISKA_CALENDAR_CACHE = 'calendar'
+
+# Length of time slots in bitmaps of reserved time kept in DailyOccupancy.
+# Run 'manage.py rebuild_occupancy' after changing it.
+BOISKA_SLOT_MINUTES = 15
+
+# Reservations posted to the intake API are saved by a background thread
+# in batches of up to BATCH_SIZE collected within BATCH_WAIT seconds.
+# Their statuses are kept in BOISKA_INTAKE_CACHE, which has to be shared
+# by all processes serving the site; the site doesn't start with the thread
+# enabled and a cache local to the process. The file based cache is shared
+# by processes of one host, use memcached or Redis for several hosts.
+BOISKA_INTAKE_THREAD = True
+BOISKA_INTAKE_BATCH_SIZE = 200
+BOISKA_INTAKE_BATCH_WAIT = 0.05
+BOISKA_INTAKE_CACHE = 'intake'
+BOISKA_INTAKE_STATUS_TIMEOUT = 60 * 60
+
+# Accepted reservations older than BOISKA_ARCHIVE_AFTER_DAYS days are moved
+# to the archive by 'manage.py archive_reservations', which also expires
+# pending reservations of past days, see boiska.archive. Reports of the last
+# year, the default period, don't have to read the archive.
+BOISKA_ARCHIVE_AFTER_DAYS = 400
+
+# The directory of places moved to shards is cached in BOISKA_SHARD_CACHE
+# for BOISKA_SHARD_DIRECTORY_TIMEOUT seconds. The cache doesn't have to be
+# shared, 'manage.py move_place' waits until every process has read
+# the changed directory.
+BOISKA_SHARD_CACHE = 'default'
+BOISKA_SHARD_DIRECTORY_TIMEOUT = 2
+
 
 # Password validation
 # https://docs.djangoproject.com/en/1.10/ref/settings/#auth-password-validators